@@ -0,0 +1,125 @@
+"""Generate a synthetic archive in the NYT JSON format used by the importer.
+
+Puzzles follow the shape of grid_wit.utils.sample_data: one file per day under
+YEAR/MONTH/, with grid, gridnums, numbered clues and answers. Grids are
+15x15 with a fixed block pattern, and every seventh puzzle is a 21x21 Sunday.
+Letters are random, so the corpus exercises parsing, storage and search
+rather than word quality. Output is deterministic for a given count and seed.
+
+    python benchmarks/corpus.py --out /tmp/corpus-15k --puzzles 15000
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import random
+from datetime import date, timedelta
+from grid_wit.utils.grid_geometry import GridGeometry, BLACK_SQUARE
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCALES = {'1k': 1000, '15k': 15000, '100k': 100000}
+FIRST_DATE = date(1942, 2, 15)
+
+BLOCKS_15 = [
+    "....#.....#....",
+    "....#.....#....",
+    "...............",
+    "...#....#......",
+    "###...#...#....",
+    "......#....#...",
+    "...#.....#.....",
+    "....#.....#....",
+    ".....#.....#...",
+    "...#....#......",
+    "....#...#...###",
+    "......#....#...",
+    "...............",
+    "....#.....#....",
+    "....#.....#....",
+]
+BLOCKS_21 = [
+    ''.join('#' if (r % 5 == 4 and c % 5 == 4) or (r % 7 == 3 and c % 7 == 3) else '.' for c in range(21))
+    for r in range(21)
+]
+
+# Weighted towards common English letters so short answers repeat across puzzles
+LETTERS = 'EEEEEEAAAAARRRRIIIIOOOOTTTTNNNNSSSSLLLCCCUUDDPPMMHHGBFYWKVXZJQ'
+AUTHORS = [
+    'Will Shortz', 'Kyle Mahowald', 'Ann Smith', 'Joel Fagliano', 'Patti Varol',
+    'Sam Ezersky', 'Robyn Weintraub', 'Brendan Emmett Quigley', 'Elizabeth Gorski', 'Patrick Berry',
+]
+CLUE_WORDS = [
+    'river', 'opera', 'singer', 'capital', 'city', 'poet', 'island', 'composer', 'painter', 'actor',
+    'bird', 'tree', 'French', 'Italian', 'Greek', 'ancient', 'modern', 'famous', 'small', 'large',
+    'song', 'novel', 'film', 'sea', 'mountain', 'goddess', 'king', 'queen', 'dance', 'tool',
+]
+
+def make_puzzle(index, seed=0):
+    """Source JSON for the index-th synthetic puzzle"""
+    rnd = random.Random(seed * 1_000_003 + index)
+    blocks = BLOCKS_21 if index % 7 == 6 else BLOCKS_15
+    rows, cols = len(blocks), len(blocks[0])
+    grid = [
+        BLACK_SQUARE if blocks[r][c] == '#' else rnd.choice(LETTERS)
+        for r in range(rows) for c in range(cols)
+    ]
+    geometry = GridGeometry(grid, rows, cols)
+
+    clues, answers = {}, {}
+    for direction, step in (('across', 1), ('down', cols)):
+        clues[direction], answers[direction] = [], []
+        for number, row, col, length in geometry.slots(direction):
+            start = row * cols + col
+            answers[direction].append(''.join(grid[start + i * step] for i in range(length)))
+            words = ' '.join(rnd.sample(CLUE_WORDS, rnd.randint(2, 4)))
+            clues[direction].append(f"{number}. {words[0].upper()}{words[1:]}")
+
+    day = FIRST_DATE + timedelta(days=index)
+    return {
+        "date": f"{day.month}/{day.day}/{day.year}",
+        "author": rnd.choice(AUTHORS),
+        "size": {"rows": rows, "cols": cols},
+        "grid": grid,
+        "gridnums": geometry.numbers.tolist(),
+        "clues": clues,
+        "answers": answers
+    }
+
+def generate_corpus(out_dir, count, seed=0):
+    """Write `count` puzzles under out_dir, skipping the work if a matching corpus is already there"""
+    marker = os.path.join(out_dir, '.corpus.json')
+    spec = {'count': count, 'seed': seed}
+    if os.path.exists(marker):
+        with open(marker) as f:
+            if json.load(f) == spec:
+                logger.info(f"Reusing corpus of {count} puzzles in {out_dir}")
+                return out_dir
+
+    for index in range(count):
+        day = FIRST_DATE + timedelta(days=index)
+        directory = os.path.join(out_dir, str(day.year), f"{day.month:02d}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"{day.isoformat()}.json"), 'w') as f:
+            json.dump(make_puzzle(index, seed), f)
+
+    with open(marker, 'w') as f:
+        json.dump(spec, f)
+    logger.info(f"Generated {count} puzzles in {out_dir}")
+    return out_dir
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--out', required=True)
+    parser.add_argument('--puzzles', default='1k', help="Puzzle count or one of: " + ', '.join(SCALES))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    generate_corpus(args.out, SCALES.get(args.puzzles) or int(args.puzzles), args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""HTTP load test for the API, optionally comparing gunicorn worker classes.
+
+Against a server that is already running:
+
+    python benchmarks/load_test.py --url http://localhost:8080 --concurrency 64 --duration 30
+
+Start gunicorn (with gunicorn.conf.py) once per worker class and compare:
+
+    python benchmarks/load_test.py --serve sync gthread gevent --concurrency 64 --json load.json
+
+--bust-cache adds a unique query argument to every request so the response
+cache is bypassed and each request reaches the database.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import itertools
+import json
+import statistics
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_PATHS = [
+    '/api/puzzles/daily',
+    '/api/puzzles?per_page=20',
+    '/api/puzzles/search?word=ERA&count=capped',
+    '/api/puzzles/search?clue=river',
+    '/api/status',
+]
+
+def latency_summary(latencies_ms):
+    """p50/p90/p99/max/mean of a list of latencies in milliseconds"""
+    if not latencies_ms:
+        return {'p50_ms': None, 'p90_ms': None, 'p99_ms': None, 'max_ms': None, 'mean_ms': None}
+
+    ordered = sorted(latencies_ms)
+
+    def percentile(p):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))], 3)
+
+    return {
+        'p50_ms': percentile(0.50),
+        'p90_ms': percentile(0.90),
+        'p99_ms': percentile(0.99),
+        'max_ms': round(ordered[-1], 3),
+        'mean_ms': round(statistics.fmean(ordered), 3)
+    }
+
+def run_load(base_url, paths, concurrency, duration, bust_cache=False, timeout=30):
+    """Issue requests from `concurrency` threads for `duration` seconds and summarize them"""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    counter = itertools.count()
+    deadline = time.monotonic() + duration
+
+    def worker():
+        local_latencies = []
+        local_errors = 0
+        while time.monotonic() < deadline:
+            n = next(counter)
+            path = paths[n % len(paths)]
+            if bust_cache:
+                path += ('&' if '?' in path else '?') + f'_={n}'
+
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(base_url + path, timeout=timeout) as response:
+                    response.read()
+                local_latencies.append((time.perf_counter() - start) * 1000)
+            except (urllib.error.URLError, OSError):
+                local_errors += 1
+
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 2),
+        **latency_summary(latencies)
+    }
+
+def _wait_for_server(base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(base_url + '/', timeout=2):
+                return
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.25)
+    raise RuntimeError(f"Server at {base_url} did not start within {timeout}s")
+
+def serve_and_load(worker_class, port, app, paths, concurrency, duration, bust_cache):
+    """Start gunicorn with the given worker class, load it, and stop it"""
+    env = dict(os.environ, PORT=str(port), GUNICORN_WORKER_CLASS=worker_class)
+    process = subprocess.Popen(
+        ['gunicorn', '-c', 'gunicorn.conf.py', '--access-logfile', '/dev/null', app],
+        cwd=REPO_ROOT,
+        env=env
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        _wait_for_server(base_url)
+        run_load(base_url, paths, concurrency, min(duration, 3), bust_cache)  # Warm up
+        return run_load(base_url, paths, concurrency, duration, bust_cache)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:8080', help="Server to load when --serve is not given")
+    parser.add_argument('--serve', nargs='+', metavar='WORKER_CLASS', help="Start gunicorn per worker class")
+    parser.add_argument('--app', default='wsgi:app', help="WSGI app for --serve")
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--paths', nargs='+', default=DEFAULT_PATHS)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--bust-cache', action='store_true')
+    parser.add_argument('--json', help="Write results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    if args.serve:
+        for worker_class in args.serve:
+            logger.info(f"Load testing gunicorn with {worker_class} workers...")
+            results[worker_class] = serve_and_load(
+                worker_class, args.port, args.app, args.paths, args.concurrency, args.duration, args.bust_cache
+            )
+    else:
+        results[args.url] = run_load(args.url, args.paths, args.concurrency, args.duration, args.bust_cache)
+
+    for name, result in results.items():
+        logger.info(
+            f"{name:10} {result['throughput_rps']:8.1f} req/s  p50={result['p50_ms']}ms  "
+            f"p99={result['p99_ms']}ms  errors={result['errors']}"
+        )
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Measure clue/answer search latency with and without the search indexes.
+
+The "before" numbers are taken inside a transaction that drops the indexes and
+is rolled back afterwards, so the schema is left untouched. The drop holds an
+exclusive lock on clues while it runs, so point it at a non-production
+database. PostgreSQL only.
+
+    python benchmarks/search_indexes.py --runs 20 --json search.json
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import statistics
+import time
+from sqlalchemy import select, text
+from grid_wit.config.database import get_engine
+from grid_wit.models.puzzle import Clue, text_search_vector, text_search_query
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEXES = ('idx_clue_answer_trgm', 'idx_clue_text_trgm', 'idx_clue_text_fts')
+
+QUERIES = {
+    'answer_substring': lambda term: select(Clue.id).where(Clue.answer.ilike(f'%{term}%')),
+    'clue_substring': lambda term: select(Clue.id).where(Clue.text.ilike(f'%{term}%')),
+    'clue_fulltext': lambda term: select(Clue.id).where(
+        text_search_vector(Clue.text).op('@@')(text_search_query(term))
+    ),
+}
+
+def time_query(conn, stmt, runs):
+    """Return per-run latencies in milliseconds"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        conn.execute(stmt).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        'p50_ms': round(statistics.median(timings), 3),
+        'p99_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 3),
+        'runs': len(timings)
+    }
+
+def run_benchmark(terms, runs):
+    """Time each query shape for each term with the indexes dropped and in place"""
+    results = {}
+    engine = get_engine()
+
+    with engine.connect() as conn:
+        with conn.begin() as trans:
+            for name in SEARCH_INDEXES:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            for query_name, build in QUERIES.items():
+                for term in terms:
+                    results.setdefault(f"{query_name}:{term}", {})['before'] = \
+                        summarize(time_query(conn, build(term), runs))
+            trans.rollback()
+
+        for query_name, build in QUERIES.items():
+            for term in terms:
+                results[f"{query_name}:{term}"]['after'] = summarize(time_query(conn, build(term), runs))
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--terms', nargs='+', default=['OREO', 'ERA', 'river', 'opera singer'])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--json', help="Write results to this file")
+    args = parser.parse_args()
+
+    if get_engine().dialect.name != 'postgresql':
+        raise SystemExit("Search index benchmark requires PostgreSQL")
+
+    results = run_benchmark(args.terms, args.runs)
+    for key, result in results.items():
+        before, after = result['before']['p50_ms'], result['after']['p50_ms']
+        logger.info(f"{key:40} before p50={before:9.2f}ms  after p50={after:9.2f}ms  ({before / max(after, 1e-6):.1f}x)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
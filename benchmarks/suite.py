@@ -0,0 +1,276 @@
+"""Benchmark the importer and the API hot paths against a disposable database.
+
+Seeds the database from a synthetic corpus (benchmarks/corpus.py), times the
+importer, then drives each endpoint in-process from concurrent threads and
+records p50/p90/p99 latency, throughput and SQL queries per request (read from
+the Server-Timing header). Results are written as JSON for comparison across
+commits. THE TARGET DATABASE IS DROPPED AND RECREATED.
+
+    python benchmarks/suite.py --database-url postgresql://localhost/gridwit_bench --scale 15k
+    python benchmarks/suite.py --compare benchmarks/results/abc123-15k-postgresql.json results/def456-15k-postgresql.json
+
+Without --database-url a SQLite file stands in; its numbers are only useful
+for comparing commits with each other.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import re
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCHMARKS_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def _query_count():
+    """SQL statements executed so far in this process"""
+    from grid_wit.api.instrumentation import QUERY_LATENCY
+    return QUERY_LATENCY.snapshot().get((), {}).get('count', 0)
+
+def reset_schema():
+    from grid_wit.config.database import Base, get_engine
+    import grid_wit.models.puzzle  # noqa: F401 - register tables on Base
+    import grid_wit.models.user  # noqa: F401
+    import grid_wit.models.stats  # noqa: F401
+    engine = get_engine()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+def time_importer(corpus_dir, workers):
+    """Full bulk import, then a sync that finds nothing to do"""
+    from grid_wit.utils.data_loader import load_puzzles_from_json, sync_puzzles_from_json
+    results = {}
+    for name, run in (
+        ('bulk_import', lambda: load_puzzles_from_json(corpus_dir, bulk=True, workers=workers)),
+        ('sync_unchanged', lambda: sync_puzzles_from_json(corpus_dir, workers=workers)),
+    ):
+        queries = _query_count()
+        start = time.perf_counter()
+        count = run()
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            'seconds': round(elapsed, 3),
+            'puzzles': count,
+            'puzzles_per_s': round(count / elapsed, 1) if count else None,
+            'queries': _query_count() - queries
+        }
+        logger.info(f"{name:16} {elapsed:8.2f}s  {results[name]}")
+    return results
+
+def run_scenario(app, make_request, concurrency, duration):
+    """Call make_request(client, n) from `concurrency` threads for `duration` seconds"""
+    from load_test import latency_summary
+
+    latencies, queries, errors = [], [], []
+    lock = threading.Lock()
+    counter = itertools.count()
+    deadline = time.monotonic() + duration
+
+    def worker():
+        client = app.test_client()
+        local_latencies, local_queries, local_errors = [], [], 0
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            response = make_request(client, next(counter))
+            local_latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                local_errors += 1
+            match = QUERIES_RE.search(response.headers.get('Server-Timing', ''))
+            if match:
+                local_queries.append(int(match.group(1)))
+        with lock:
+            latencies.extend(local_latencies)
+            queries.extend(local_queries)
+            errors.append(local_errors)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        **latency_summary(latencies),
+        'queries_mean': round(sum(queries) / len(queries), 2) if queries else None,
+        'queries_max': max(queries) if queries else None
+    }
+
+def build_scenarios(fixtures, bust_cache):
+    """name -> make_request(client, n) for every benchmarked endpoint"""
+    def get(path):
+        def make_request(client, n):
+            url = path(n) if callable(path) else path
+            if bust_cache:
+                url += ('&' if '?' in url else '?') + f'_={n}'
+            return client.get(url)
+        return make_request
+
+    dates, puzzles, users = fixtures['dates'], fixtures['puzzles'], fixtures['users']
+
+    def put_progress(client, n):
+        puzzle_id, rows, cols = puzzles[n % len(puzzles)]
+        rnd = random.Random(n)
+        cells = ''.join(rnd.choice('ABCDE  ') for _ in range(rows * cols))
+        return client.put(f'/api/users/{users[n % len(users)]}/puzzles/{puzzle_id}', json={'cells': cells})
+
+    def patch_progress(client, n):
+        puzzle_id, rows, cols = puzzles[n % len(puzzles)]
+        rnd = random.Random(n)
+        cells = [{'row': rnd.randrange(rows), 'col': rnd.randrange(cols), 'value': rnd.choice('ABCDE')} for _ in range(3)]
+        return client.patch(f'/api/users/{users[n % len(users)]}/puzzles/{puzzle_id}', json={'cells': cells})
+
+    return {
+        'search_author': get('/api/puzzles/search?author=Shortz'),
+        'search_date': get(lambda n: f'/api/puzzles/search?date={dates[n % len(dates)]}'),
+        'search_word': get('/api/puzzles/search?word=ERA&count=capped'),
+        'search_clue_fulltext': get('/api/puzzles/search?clue=opera%20singer'),
+        'search_clue_substring': get('/api/puzzles/search?clue=river&clue_mode=substring&count=capped'),
+        'daily': get('/api/puzzles/daily'),
+        'status': get('/api/status'),
+        'progress_put': put_progress,
+        'progress_patch': patch_progress,
+    }
+
+def load_fixtures(user_count):
+    """Sample dates and puzzles from the imported corpus and create benchmark users"""
+    from grid_wit.config.database import get_db_session
+    from grid_wit.models.puzzle import Puzzle
+    from grid_wit.models.user import User
+
+    with get_db_session() as session:
+        session.bulk_insert_mappings(User, [
+            {'username': f'bench{i}', 'email': f'bench{i}@example.com'} for i in range(user_count)
+        ])
+        session.commit()
+        users = [user_id for (user_id,) in session.query(User.id).order_by(User.id)]
+        puzzles = [tuple(row) for row in session.query(Puzzle.id, Puzzle.rows, Puzzle.cols).order_by(Puzzle.id).limit(1000)]
+        dates = [date for (date,) in session.query(Puzzle.date_published).order_by(Puzzle.id).limit(1000)]
+    return {'users': users, 'puzzles': puzzles, 'dates': dates}
+
+def run_suite(args):
+    # Keep the importer's similar-clues index out of the working tree
+    os.environ.setdefault('CLUE_INDEX_PATH', os.path.join(tempfile.gettempdir(), 'grid-wit-bench-clue-index'))
+    from grid_wit.config.database import configure_engine, get_engine
+    from corpus import SCALES, generate_corpus
+
+    count = SCALES.get(args.scale) or int(args.scale)
+    corpus_dir = args.corpus_dir or os.path.join(tempfile.gettempdir(), f'grid-wit-corpus-{count}')
+    generate_corpus(corpus_dir, count)
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.gettempdir(), 'grid-wit-bench.db')}"
+    configure_engine(database_url)
+
+    from grid_wit import create_app
+    app = create_app()  # Also installs the query instrumentation the suite reads
+    reset_schema()
+
+    results = {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'scale': count,
+            'dialect': get_engine().dialect.name,
+            'concurrency': args.concurrency,
+            'duration_s': args.duration,
+            'bust_cache': not args.cached,
+            'write_behind': os.getenv('PROGRESS_WRITE_BEHIND', ''),
+            'prerender': os.getenv('IMPORT_PRERENDER', ''),
+            'python': platform.python_version()
+        },
+        'importer': time_importer(corpus_dir, args.workers),
+        'scenarios': {}
+    }
+
+    scenarios = build_scenarios(load_fixtures(args.users), bust_cache=not args.cached)
+    for name, make_request in scenarios.items():
+        if args.only and name not in args.only:
+            continue
+        result = run_scenario(app, make_request, args.concurrency, args.duration)
+        results['scenarios'][name] = result
+        logger.info(
+            f"{name:22} {result['throughput_rps']:8.1f} req/s  p50={result['p50_ms']}ms  p99={result['p99_ms']}ms  "
+            f"queries={result['queries_mean']}  errors={result['errors']}"
+        )
+
+    output = args.json or os.path.join(
+        BENCHMARKS_DIR, 'results', f"{results['meta']['commit']}-{args.scale}-{results['meta']['dialect']}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Wrote {output}")
+    return results
+
+def compare(base_path, new_path, threshold):
+    """Log per-scenario changes between two result files; returns True when something regressed"""
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    regressed = False
+    logger.info(f"{base['meta']['commit']} -> {new['meta']['commit']}")
+    for name, result in new['scenarios'].items():
+        old = base['scenarios'].get(name)
+        if not old or not old['p50_ms'] or not result['p50_ms']:
+            continue
+        p50 = result['p50_ms'] / old['p50_ms'] - 1
+        p99 = result['p99_ms'] / old['p99_ms'] - 1
+        rps = result['throughput_rps'] / old['throughput_rps'] - 1
+        flag = p50 > threshold or p99 > threshold or rps < -threshold or \
+            (result['queries_mean'] or 0) > (old['queries_mean'] or 0)
+        regressed |= flag
+        logger.info(
+            f"{name:22} p50 {p50:+7.1%}  p99 {p99:+7.1%}  rps {rps:+7.1%}  "
+            f"queries {old['queries_mean']} -> {result['queries_mean']}{'  REGRESSION' if flag else ''}"
+        )
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', help="Disposable database to benchmark against (default: a SQLite file)")
+    parser.add_argument('--scale', default='1k', help="Puzzle count or 1k, 15k or 100k")
+    parser.add_argument('--corpus-dir', help="Where to generate (or reuse) the synthetic corpus")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5, help="Seconds per scenario")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Importer parse workers")
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--only', nargs='+', metavar='SCENARIO')
+    parser.add_argument('--cached', action='store_true', help="Let repeated GETs hit the response cache")
+    parser.add_argument('--json', help="Result file (default: benchmarks/results/<commit>-<scale>-<dialect>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help="Compare two result files and exit")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Relative change reported as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+    run_suite(args)
+
+if __name__ == "__main__":
+    main()
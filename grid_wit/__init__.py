@@ -1,18 +1,33 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
 from grid_wit.api.routes import api
+from grid_wit.api import instrumentation
+from grid_wit.config import database
+from grid_wit.utils.answer_index import get_answer_index
 import logging
+import os
+import threading
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def create_app():
+def create_app(database_url=None, **engine_options):
     app = Flask(__name__)
     CORS(app)
     
+    # The engine is created lazily in each worker process, after any fork
+    database.init_app(app, database_url, **engine_options)
+    
+    # Per-route latency, query counts and response sizes, served at /api/metrics
+    instrumentation.init_app(app)
+    
     # Register blueprints
     app.register_blueprint(api, url_prefix='/api')
     
+    # Build in-memory indexes in the background instead of on the first request
+    if os.getenv('WARM_INDEXES', '').lower() in ('1', 'true', 'yes'):
+        threading.Thread(target=get_answer_index, name='warm-indexes', daemon=True).start()
+    
     # Add root route
     @app.route('/')
     def home():
@@ -0,0 +1,178 @@
+import os
+import time
+import hashlib
+import threading
+from urllib.parse import urlencode
+from collections import OrderedDict, namedtuple
+from functools import wraps
+from flask import Response, request
+from grid_wit.utils.corpus import get_corpus_version
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 300))
+
+# ttl is the route's own lifetime, reused when a local cache is refilled from the shared one
+CachedResponse = namedtuple('CachedResponse', ['body', 'etag', 'mimetype', 'ttl'])
+
+class LRUCache:
+    """In-process LRU cache with per-entry TTL and a total size budget in bytes"""
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+
+            expires_at, size, value = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._size -= size
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        size = len(value.body) if isinstance(value, CachedResponse) else len(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+
+            self._entries[key] = (time.monotonic() + ttl, size, value)
+            self._size += size
+
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+class RedisCache:
+    """Shared cache backend on Redis; entries are stored as etag, mimetype, ttl and body"""
+
+    def __init__(self, url, prefix='grid-wit:response:'):
+        import redis  # Optional dependency, only needed for a shared cache
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+
+        etag, mimetype, ttl, body = raw.split(b'\n', 3)
+        return CachedResponse(body, etag.decode(), mimetype.decode(), int(ttl))
+
+    def set(self, key, value, ttl):
+        raw = f"{value.etag}\n{value.mimetype}\n{value.ttl}\n".encode() + value.body
+        self.client.set(self.prefix + key, raw, ex=ttl)
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + '*'):
+            self.client.delete(key)
+
+class ResponseCache:
+    """Two-level response cache: a local LRU in front of an optional shared backend"""
+
+    def __init__(self, local=None, shared=None):
+        self.local = local or LRUCache()
+        self.shared = shared
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            try:
+                value = self.shared.get(key)
+            except Exception as e:
+                logger.warning(f"Shared response cache read failed: {e}")
+                return None
+            if value is not None:
+                self.local.set(key, value, value.ttl)
+        return value
+
+    def set(self, key, value, ttl):
+        self.local.set(key, value, ttl)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value, ttl)
+            except Exception as e:
+                logger.warning(f"Shared response cache write failed: {e}")
+
+    def clear(self):
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+def _default_cache():
+    local = LRUCache(
+        max_entries=int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 1024)),
+        max_bytes=int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    )
+    shared = RedisCache(os.getenv('RESPONSE_CACHE_URL')) if os.getenv('RESPONSE_CACHE_URL') else None
+    return ResponseCache(local, shared)
+
+response_cache = _default_cache()
+
+def configure_response_cache(local=None, shared=None):
+    """Replace the response cache, e.g. with an LRUCache standing in for the shared backend in tests"""
+    global response_cache
+    response_cache = ResponseCache(local, shared)
+    return response_cache
+
+def invalidate_response_cache():
+    """Drop every cached response. Imports bump the corpus version, which does this implicitly."""
+    response_cache.clear()
+
+def _cache_key(extra):
+    # Encoded, so an escaped '&' or '=' inside a value cannot collide with a separate argument
+    args = urlencode(sorted(request.args.items(multi=True)))
+    return f"{request.path}?{args}#v{get_corpus_version()}{'#' + extra() if extra else ''}"
+
+def cached_response(ttl=DEFAULT_TTL, key_extra=None):
+    """Cache successful GET responses by path, query args and corpus version, with ETag/304 support.
+
+    key_extra is an optional callable whose result is added to the key, for
+    responses that vary by something other than the request (e.g. the date).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = _cache_key(key_extra)
+            entry = response_cache.get(key)
+
+            if entry is None:
+                response = view(*args, **kwargs)
+                if not isinstance(response, Response) or response.status_code != 200:
+                    return response
+
+                body = response.get_data()
+                entry = CachedResponse(body, hashlib.sha256(body).hexdigest()[:32], response.mimetype, ttl)
+                response_cache.set(key, entry, ttl)
+
+            if request.if_none_match.contains_weak(entry.etag):
+                response = Response(status=304)
+            else:
+                response = Response(entry.body, mimetype=entry.mimetype)
+
+            response.set_etag(entry.etag)
+            response.cache_control.public = True
+            response.cache_control.max_age = ttl
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,87 @@
+import os
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from grid_wit.utils.metrics import Counter, Histogram
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Queries slower than this are logged with their SQL; 0 turns the log off
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 500))
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+REQUESTS = Counter('http_requests_total', "Requests handled", labels=('method', 'route', 'status'))
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', "Request latency", labels=('method', 'route'))
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries', "Database queries per request", labels=('route',), buckets=QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_TIME = Histogram('http_request_db_seconds', "Database time per request", labels=('route',))
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', "Response body size", labels=('route',), buckets=SIZE_BUCKETS
+)
+QUERY_LATENCY = Histogram('db_query_duration_seconds', "Latency of individual SQL statements")
+SLOW_QUERIES = Counter('db_slow_queries_total', "Statements slower than SLOW_QUERY_MS", labels=('route',))
+
+_installed = False
+
+def _route():
+    rule = request.url_rule
+    return rule.rule if rule is not None else '<unmatched>'
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the statement's own context, which is discarded if the statement fails
+    context._query_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_start
+    QUERY_LATENCY.observe(elapsed)
+
+    route = None
+    if has_request_context():
+        route = _route()
+        g.db_queries = g.get('db_queries', 0) + 1
+        g.db_time = g.get('db_time', 0.0) + elapsed
+
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        SLOW_QUERIES.inc(route=route or '')
+        logger.warning(f"Slow query ({elapsed * 1000:.1f}ms) on {route or 'no request'}: {' '.join(statement.split())}")
+
+def init_app(app):
+    """Record latency, query count, DB time and response size for every request"""
+    global _installed
+
+    # Listening on the Engine class covers the lazily created per-process engines
+    if not _installed:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _installed = True
+
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+        g.db_queries = 0
+        g.db_time = 0.0
+
+    @app.after_request
+    def record_request(response):
+        start = g.get('request_start')
+        if start is None:
+            return response
+
+        route = _route()
+        elapsed = time.perf_counter() - start
+        REQUESTS.inc(method=request.method, route=route, status=response.status_code)
+        REQUEST_LATENCY.observe(elapsed, method=request.method, route=route)
+        REQUEST_QUERIES.observe(g.db_queries, route=route)
+        REQUEST_DB_TIME.observe(g.db_time, route=route)
+        if not response.is_streamed:
+            RESPONSE_SIZE.observe(response.calculate_content_length() or 0, route=route)
+
+        response.headers['Server-Timing'] = (
+            f'db;dur={g.db_time * 1000:.1f};desc="{g.db_queries} queries", app;dur={elapsed * 1000:.1f}'
+        )
+        return response
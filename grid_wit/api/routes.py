@@ -1,15 +1,55 @@
-from flask import Blueprint, jsonify, request, g
+from flask import Blueprint, Response, jsonify, request, g, stream_with_context
 from grid_wit.config.database import get_db_session
-from grid_wit.models.puzzle import Puzzle, Clue
+from grid_wit.config.pool import pool_status
+from grid_wit.utils.metrics import render_prometheus
+from grid_wit.utils.corpus import get_corpus_stats
+from grid_wit.models.puzzle import Puzzle, Clue, text_search_vector, text_search_query
 from grid_wit.models.user import User, SavedPuzzle, DailyPuzzleHistory
-from sqlalchemy import or_, func, desc
-from datetime import datetime, timedelta
+from grid_wit.models.stats import AnswerStat, AnswerYearStat, AuthorStat
+from grid_wit.api.pagination import encode_cursor, decode_cursor, get_per_page
+from grid_wit.utils.answer_index import AnswerIndex, get_answer_index
+from grid_wit.utils.clue_index import get_clue_index
+from grid_wit.utils.generator import DEFAULT_TIME_BUDGET, submit_generation, get_generation_job
+from grid_wit.utils.daily import get_daily_payload, utc_today
+from grid_wit.api.cache import cached_response
+from grid_wit.utils.grid_codec import GRID_FORMATS
+from grid_wit.utils.serializers import (
+    PUZZLE_COLUMNS, SEARCH_CLUE_COLUMNS, SEARCH_CLUE_FIELDS, json_response, puzzle_dict, load_clues, load_puzzle_body
+)
+from grid_wit.utils.progress_buffer import get_progress_buffer
+from grid_wit.utils.export import iter_ndjson, parse_export_date
+from grid_wit.utils.progress import (
+    get_puzzle_shape, progress_from_request, decode_cells, parse_cell_deltas, save_progress, patch_progress
+)
+from sqlalchemy import or_, func, desc, tuple_, text
+from datetime import date, datetime, timedelta
+import os
 import random
 import logging
 
 api = Blueprint('api', __name__)
 logger = logging.getLogger(__name__)
 
+# Total-count strategies for /puzzles/search
+COUNT_MODES = ('exact', 'capped', 'estimate', 'none')
+COUNT_CAP = 1000
+
+# Clue-text matching for /puzzles/search; fulltext falls back to substring off PostgreSQL
+CLUE_MODES = ('fulltext', 'substring')
+
+# Filters for a user's library
+LIBRARY_STATUSES = ('all', 'completed', 'in_progress')
+
+# statement_timeout for the readiness probe's SELECT 1
+READINESS_TIMEOUT_MS = int(os.getenv('READINESS_TIMEOUT_MS', 1000))
+
+def _get_grid_format():
+    """Requested grid_format, raising ValueError for unknown formats"""
+    grid_format = request.args.get('grid_format', 'legacy')
+    if grid_format not in GRID_FORMATS:
+        raise ValueError(f"grid_format must be one of {', '.join(GRID_FORMATS)}")
+    return grid_format
+
 @api.route('/')
 def root():
     """Root endpoint with API documentation"""
@@ -19,86 +59,319 @@ def root():
         "documentation": {
             "endpoints": {
                 "GET /": "This documentation",
-                "GET /api/puzzles": "List all puzzles (supports page and per_page params)",
+                "GET /api/puzzles": "List puzzles newest first (supports per_page, cursor and order=asc|desc params)",
                 "GET /api/puzzles/<id>": "Get specific puzzle",
-                "GET /api/puzzles/daily": "Get daily puzzle (randomly selected)",
+                "GET /api/puzzles/daily": "Get today's puzzle (one per UTC day, no repeats within a cycle)",
                 "GET /api/puzzles/search": "Search puzzles by author, date, or content",
+                "GET /api/export/puzzles": "Stream puzzles with clues as NDJSON (params: start, end, grid_format; "
+                                           "default compact)",
+                "GET /api/answers/match": "Answers matching a pattern such as C?T?? (params: pattern, limit)",
+                "GET /api/clues/<id>/similar": "Past clues for the same answer and clues with similar wording (param: limit)",
+                "GET /api/puzzles/<id>/clues/<direction>/<number>/similar": "Same as above, by clue position",
+                "POST /api/generate": "Start filling a grid template from historical answers: {\"template\": [rows, '.' "
+                                      "or '#' black, '?' empty, letters prefilled], \"time_budget\", \"seed\", "
+                                      "\"min_uses\"}; returns a job_id (202)",
+                "GET /api/generate/<job_id>": "Generation job status (queued, running, done or failed) and the filled, "
+                                              "clued grid when done",
                 "GET /api/status": "Get API and database status",
+                "GET /api/stats": "Corpus statistics (puzzle and clue counts, date range), refreshed on import",
+                "GET /api/stats/answers": "Most common answers (params: limit, length, year)",
+                "GET /api/stats/answers/<answer>": "Uses per year and clues for one answer (param: limit)",
+                "GET /api/stats/authors": "Authors with the most puzzles (param: limit)",
+                "GET /api/health/live": "Liveness probe, no database access",
+                "GET /api/health/ready": "Readiness probe, checks the database with a short timeout",
+                "GET /api/metrics": "Prometheus metrics (request latency, queries per request, pool) for this worker",
+                "GET /api/metrics/pool": "Connection pool metrics for the worker serving the request",
                 "POST /api/users": "Create new user",
-                "GET /api/users/<id>/puzzles": "Get user's saved puzzles",
+                "GET /api/users/<id>/puzzles": "Get user's saved puzzles, most recently played first "
+                                               "(supports per_page, cursor and status=all|completed|in_progress)",
                 "POST /api/users/<id>/puzzles": "Save puzzle progress",
-                "PUT /api/users/<id>/puzzles/<puzzle_id>": "Update puzzle progress"
+                "PUT /api/users/<id>/puzzles/<puzzle_id>": "Save full puzzle progress (progress grid or cells string)",
+                "PATCH /api/users/<id>/puzzles/<puzzle_id>": "Set individual cells: {\"cells\": [{\"row\", \"col\", \"value\"}]}"
             },
             "search_params": {
                 "author": "Search by author name",
                 "date": "Search by date (YYYY-MM-DD)",
                 "word": "Search for word in answers",
-                "clue": "Search in clue text"
+                "clue": "Search in clue text (full-text, ranked by relevance)",
+                "clue_mode": "fulltext (default) or substring",
+                "page": "Page number (default 1)",
+                "per_page": "Results per page (max 50)",
+                "count": "Total count mode: exact (default), capped, estimate or none"
+            },
+            "grid_params": {
+                "grid_format": "legacy (default, grid as a JSON string), array (list of cells) or "
+                               "compact (one character per cell, '.' for black); array and compact include gridnums"
             }
         }
     })
 
 @api.route('/status')
 def get_status():
-    """Get API status"""
+    """Get API status from cached corpus statistics, without counting tables"""
     try:
-        with get_db_session() as session:
-            # Check database connection by making a simple query
-            puzzle_count = session.query(Puzzle).count()
-            
-            return jsonify({
-                "status": "healthy",
-                "database": "connected",
-                "puzzle_count": puzzle_count,
-                "clue_count": session.query(Clue).count(),
-                "timestamp": datetime.utcnow().isoformat()
-            })
+        stats = get_corpus_stats()
+        return jsonify({
+            "status": "healthy",
+            "database": "connected",
+            "puzzle_count": stats["puzzle_count"],
+            "clue_count": stats["clue_count"],
+            "pool": pool_status(),
+            "timestamp": datetime.utcnow().isoformat()
+        })
     except Exception as e:
         logger.error(f"Error checking API status: {e}")
         return jsonify({
             "status": "unhealthy",
             "database": "disconnected",
             "error": str(e),
+            "pool": pool_status(),
             "timestamp": datetime.utcnow().isoformat()
         }), 500
 
+@api.route('/health/live')
+def liveness():
+    """Liveness probe: the process is serving requests. Does no database work."""
+    return jsonify({"status": "ok"})
+
+@api.route('/health/ready')
+def readiness():
+    """Readiness probe: the database answers a trivial query within READINESS_TIMEOUT_MS"""
+    try:
+        with get_db_session() as session:
+            if session.get_bind().dialect.name == 'postgresql':
+                session.execute(text(f"SET LOCAL statement_timeout = {READINESS_TIMEOUT_MS}"))
+            session.execute(text("SELECT 1"))
+        return jsonify({"status": "ready"})
+    except Exception as e:
+        logger.error(f"Readiness check failed: {e}")
+        return jsonify({"status": "unavailable", "error": str(e)}), 503
+
+@api.route('/stats')
+@cached_response()
+def get_stats():
+    """Corpus statistics recorded by the last import (or planner estimates before the first one)"""
+    try:
+        return jsonify(get_corpus_stats())
+    except Exception as e:
+        logger.error(f"Error getting corpus stats: {e}")
+        return jsonify({"error": str(e)}), 500
+
+def _get_limit(default=50, maximum=500):
+    """Read limit from query args, clamped to [1, maximum]"""
+    return max(1, min(request.args.get('limit', default, type=int), maximum))
+
+@api.route('/stats/answers')
+@cached_response()
+def get_top_answers():
+    """Most common answers overall, or in one year, optionally of one length"""
+    try:
+        limit = _get_limit()
+        length = request.args.get('length', type=int)
+        year = request.args.get('year', type=int)
+        
+        with get_db_session() as session:
+            if year is not None:
+                query = session.query(AnswerYearStat.answer, AnswerYearStat.uses).filter(AnswerYearStat.year == year)
+                if length is not None:
+                    query = query.filter(AnswerYearStat.length == length)
+                query = query.order_by(AnswerYearStat.uses.desc(), AnswerYearStat.answer)
+            else:
+                query = session.query(AnswerStat.answer, AnswerStat.uses)
+                if length is not None:
+                    query = query.filter(AnswerStat.length == length)
+                query = query.order_by(AnswerStat.uses.desc(), AnswerStat.answer)
+            
+            return jsonify({
+                "answers": [{"answer": row.answer, "uses": row.uses} for row in query.limit(limit)],
+                "year": year,
+                "length": length
+            })
+    except Exception as e:
+        logger.error(f"Error getting answer statistics: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/stats/answers/<answer>')
+@cached_response()
+def get_answer_stats(answer):
+    """Usage of one answer: totals, uses per year and the clues it has been given"""
+    try:
+        answer = answer.upper()
+        limit = _get_limit()
+        
+        with get_db_session() as session:
+            summary = session.query(
+                AnswerStat.uses, AnswerStat.first_date, AnswerStat.last_date
+            ).filter(AnswerStat.answer == answer).one_or_none()
+            if summary is None:
+                return jsonify({"error": "Answer not found"}), 404
+            
+            years = session.query(AnswerYearStat.year, AnswerYearStat.uses).filter(
+                AnswerYearStat.answer == answer
+            ).order_by(AnswerYearStat.year)
+            
+            last_used = func.max(Puzzle.date_published)
+            clues = session.query(Clue.text, func.count().label('uses'), last_used.label('last_used')).join(
+                Puzzle, Puzzle.id == Clue.puzzle_id
+            ).filter(Clue.answer == answer).group_by(Clue.text).order_by(
+                desc('uses'), last_used.desc()
+            ).limit(limit)
+            
+            return jsonify({
+                "answer": answer,
+                "uses": summary.uses,
+                "first_date": summary.first_date,
+                "last_date": summary.last_date,
+                "by_year": [{"year": row.year, "uses": row.uses} for row in years],
+                "clues": [{"text": row.text, "uses": row.uses, "last_used": row.last_used} for row in clues]
+            })
+    except Exception as e:
+        logger.error(f"Error getting statistics for answer {answer}: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/stats/authors')
+@cached_response()
+def get_top_authors():
+    """Authors with the most puzzles"""
+    try:
+        limit = _get_limit()
+        with get_db_session() as session:
+            rows = session.query(
+                AuthorStat.author, AuthorStat.puzzle_count, AuthorStat.first_date, AuthorStat.last_date
+            ).order_by(AuthorStat.puzzle_count.desc(), AuthorStat.author).limit(limit)
+            
+            return jsonify({
+                "authors": [{
+                    "author": row.author,
+                    "puzzle_count": row.puzzle_count,
+                    "first_date": row.first_date,
+                    "last_date": row.last_date
+                } for row in rows]
+            })
+    except Exception as e:
+        logger.error(f"Error getting author statistics: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/metrics')
+def get_metrics():
+    """Request, query and pool metrics for this worker in Prometheus text format"""
+    return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@api.route('/metrics/pool')
+def get_pool_metrics():
+    """Connection pool occupancy, checkout wait times and pre-ping failures for this worker"""
+    return jsonify({"pid": os.getpid(), **pool_status()})
+
 @api.route('/puzzles/daily')
+@cached_response(ttl=300, key_extra=lambda: utc_today().isoformat())
 def get_daily_puzzle():
-    """Get a random puzzle for today"""
+    """Get today's puzzle: one per UTC day, without repeats until every puzzle has been served"""
+    try:
+        try:
+            grid_format = _get_grid_format()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        body = get_daily_payload(
+            lambda session, puzzle_id: load_puzzle_body(session, puzzle_id, grid_format),
+            variant=grid_format
+        )
+        if body is None:
+            return jsonify({"error": "No puzzles found"}), 404
+        
+        return json_response(body)
+    except Exception as e:
+        logger.error(f"Error getting daily puzzle: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/puzzles')
+@cached_response()
+def list_puzzles():
+    """List puzzle summaries with keyset pagination on (date_published, id)"""
     try:
+        per_page = get_per_page(request.args)
+        descending = request.args.get('order', 'desc') != 'asc'
+        
         with get_db_session() as session:
-            puzzle = session.query(Puzzle).order_by(func.random()).first()
-            if not puzzle:
-                return jsonify({"error": "No puzzles found"}), 404
+            sort_key = tuple_(Puzzle.date_published, Puzzle.id)
+            query = session.query(Puzzle.id, Puzzle.date_published, Puzzle.author)
+            
+            if cursor := request.args.get('cursor'):
+                try:
+                    last_date, last_id = decode_cursor(cursor, 2)
+                    if not isinstance(last_id, int) or isinstance(last_id, bool) or \
+                            date.fromisoformat(last_date).isoformat() != last_date:
+                        raise ValueError("Invalid cursor")
+                except (TypeError, ValueError):
+                    return jsonify({"error": "Invalid cursor"}), 400
+                last_key = tuple_(last_date, last_id)
+                query = query.filter(sort_key < last_key if descending else sort_key > last_key)
             
-            # Get only clues for this puzzle
-            clues = session.query(Clue).filter(
-                Clue.puzzle_id == puzzle.id
-            ).order_by(Clue.number).all()
+            if descending:
+                query = query.order_by(Puzzle.date_published.desc(), Puzzle.id.desc())
+            else:
+                query = query.order_by(Puzzle.date_published, Puzzle.id)
+            
+            # Fetch one extra row to learn whether another page exists
+            rows = query.limit(per_page + 1).all()
+            has_more = len(rows) > per_page
+            rows = rows[:per_page]
             
             return jsonify({
-                "id": puzzle.id,
-                "date_published": puzzle.date_published,
-                "author": puzzle.author,
-                "grid": puzzle.grid,
-                "clues": [{
-                    "number": clue.number,
-                    "direction": clue.direction,
-                    "text": clue.text,
-                    "answer": clue.answer,
-                    "row": clue.row,
-                    "column": clue.column
-                } for clue in clues]
+                "puzzles": [{
+                    "id": row.id,
+                    "date_published": row.date_published,
+                    "author": row.author
+                } for row in rows],
+                "per_page": per_page,
+                "next_cursor": encode_cursor((rows[-1].date_published, rows[-1].id)) if has_more else None
             })
+            
     except Exception as e:
-        logger.error(f"Error getting daily puzzle: {e}")
+        logger.error(f"Error listing puzzles: {e}")
+        return jsonify({"error": "Could not list puzzles"}), 500
+
+@api.route('/puzzles/<int:puzzle_id>')
+@cached_response()
+def get_puzzle(puzzle_id):
+    """Get a puzzle and all of its clues, from its pre-rendered body or a single joined query"""
+    try:
+        try:
+            grid_format = _get_grid_format()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        with get_db_session() as session:
+            body = load_puzzle_body(session, puzzle_id, grid_format)
+            
+            if body is None:
+                return jsonify({"error": "Puzzle not found"}), 404
+            
+            return json_response(body)
+    except Exception as e:
+        logger.error(f"Error getting puzzle {puzzle_id}: {e}")
         return jsonify({"error": str(e)}), 500
 
 @api.route('/puzzles/search')
+@cached_response()
 def search_puzzles():
+    """Search puzzles; a page costs one query for puzzles, one for their clues and one for the count"""
     try:
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = get_per_page(request.args)
+        count_mode = request.args.get('count', 'exact')
+        if count_mode not in COUNT_MODES:
+            return jsonify({"error": f"count must be one of {', '.join(COUNT_MODES)}"}), 400
+        clue_mode = request.args.get('clue_mode', 'fulltext')
+        if clue_mode not in CLUE_MODES:
+            return jsonify({"error": f"clue_mode must be one of {', '.join(CLUE_MODES)}"}), 400
+        try:
+            grid_format = _get_grid_format()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
         with get_db_session() as session:
-            query = session.query(Puzzle)
+            query = session.query(*PUZZLE_COLUMNS)
             
             # Search by author
             if author := request.args.get('author'):
@@ -108,44 +381,222 @@ def search_puzzles():
             if date := request.args.get('date'):
                 query = query.filter(Puzzle.date_published == date)
             
+            # Clue filters are semi-joins so a puzzle with many matching clues is returned once
             # Search by word in answers
             if word := request.args.get('word'):
-                query = query.join(Clue).filter(Clue.answer.ilike(f'%{word}%'))
+                query = query.filter(Puzzle.clues.any(Clue.answer.ilike(f'%{word}%')))
             
-            # Search in clue text
+            # Search in clue text: ranked full-text search on PostgreSQL, substring match otherwise
+            rank = None
             if clue_text := request.args.get('clue'):
-                query = query.join(Clue).filter(Clue.text.ilike(f'%{clue_text}%'))
+                if clue_mode == 'fulltext' and session.get_bind().dialect.name == 'postgresql':
+                    tsquery = text_search_query(clue_text)
+                    match = text_search_vector(Clue.text).op('@@')(tsquery)
+                    query = query.filter(Puzzle.clues.any(match))
+                    
+                    # Rank each puzzle by its best-matching clue
+                    rank = session.query(
+                        func.max(func.ts_rank(text_search_vector(Clue.text), tsquery))
+                    ).filter(Clue.puzzle_id == Puzzle.id, match).correlate(Puzzle).scalar_subquery()
+                else:
+                    query = query.filter(Puzzle.clues.any(Clue.text.ilike(f'%{clue_text}%')))
             
-            # Paginate results
-            page = request.args.get('page', 1, type=int)
-            per_page = min(request.args.get('per_page', 10, type=int), 50)
+            total, total_exact = _count_search_results(session, query, count_mode)
             
-            total = query.count()
-            puzzles = query.offset((page - 1) * per_page).limit(per_page).all()
+            order = (Puzzle.date_published.desc(), Puzzle.id.desc())
+            if rank is not None:
+                order = (rank.desc(),) + order
             
-            return jsonify({
-                "puzzles": [{
-                    "id": p.id,
-                    "date_published": p.date_published,
-                    "author": p.author,
-                    "grid": p.grid,
-                    "clues": [{
-                        "number": c.number,
-                        "direction": c.direction,
-                        "text": c.text,
-                        "answer": c.answer
-                    } for c in p.clues]
-                } for p in puzzles],
+            puzzles = query.order_by(*order).offset((page - 1) * per_page).limit(per_page).all()
+            
+            # Load the clues for the whole page at once
+            clues_by_puzzle = load_clues(session, [p.id for p in puzzles], SEARCH_CLUE_COLUMNS)
+            
+            return json_response({
+                "puzzles": [
+                    puzzle_dict(p, clues_by_puzzle[p.id], grid_format, SEARCH_CLUE_FIELDS) for p in puzzles
+                ],
                 "total": total,
+                "total_exact": total_exact,
                 "page": page,
                 "per_page": per_page,
-                "total_pages": (total + per_page - 1) // per_page
+                "total_pages": (total + per_page - 1) // per_page if total is not None else None
             })
             
     except Exception as e:
         logger.error(f"Error searching puzzles: {e}")
         return jsonify({"error": str(e)}), 500
 
+def _count_search_results(session, query, count_mode):
+    """Return (total, is_exact) for a search query according to the requested count mode"""
+    ids = query.with_entities(Puzzle.id).order_by(None)
+    
+    if count_mode == 'none':
+        return None, False
+    
+    if count_mode == 'estimate' and session.get_bind().dialect.name == 'postgresql':
+        # Planner row estimate: no rows are read
+        stmt = ids.statement.compile(dialect=session.get_bind().dialect)
+        plan = session.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {stmt}", stmt.params
+        ).scalar()
+        return int(plan[0]['Plan']['Plan Rows']), False
+    
+    if count_mode == 'exact':
+        return session.query(func.count()).select_from(ids.subquery()).scalar(), True
+    
+    # Capped (and the estimate fallback): stop counting after COUNT_CAP matches
+    total = session.query(func.count()).select_from(ids.limit(COUNT_CAP + 1).subquery()).scalar()
+    if total > COUNT_CAP:
+        return COUNT_CAP, False
+    return total, True
+
+@api.route('/export/puzzles')
+def export_puzzles():
+    """Stream puzzles with their clues as NDJSON, oldest first, optionally limited to a date range"""
+    try:
+        start = parse_export_date(request.args.get('start'))
+        end = parse_export_date(request.args.get('end'))
+        grid_format = request.args.get('grid_format', 'compact')
+        if grid_format not in GRID_FORMATS:
+            raise ValueError(f"grid_format must be one of {', '.join(GRID_FORMATS)}")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return Response(
+        stream_with_context(iter_ndjson(start, end, grid_format)),
+        mimetype='application/x-ndjson'
+    )
+
+@api.route('/answers/match')
+@cached_response()
+def match_answers():
+    """Find historical answers matching a positional pattern, e.g. ?R?SS"""
+    try:
+        try:
+            pattern = AnswerIndex.normalize_pattern(request.args.get('pattern'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        limit = max(1, min(request.args.get('limit', 50, type=int), 500))
+        total, answers = get_answer_index().match(pattern, limit)
+        
+        return jsonify({
+            "pattern": pattern,
+            "total": total,
+            "answers": answers
+        })
+    except Exception as e:
+        logger.error(f"Error matching answers: {e}")
+        return jsonify({"error": str(e)}), 500
+
+def _similar_clues(session, clue_id, limit):
+    """Response body for a clue's similar clues, or None if the clue is not indexed"""
+    result = get_clue_index().similar(clue_id, limit)
+    if result is None:
+        return None
+    
+    ids = {clue_id} | {i for i, _ in result['same_answer']} | {i for i, _ in result['similar']}
+    clues = {
+        row.id: row for row in session.query(
+            Clue.id, Clue.puzzle_id, Clue.number, Clue.direction, Clue.text, Clue.answer, Puzzle.date_published
+        ).join(Puzzle, Puzzle.id == Clue.puzzle_id).filter(Clue.id.in_(ids))
+    }
+    
+    def clue_dict(row, score=None):
+        clue = {
+            "id": row.id,
+            "puzzle_id": row.puzzle_id,
+            "date_published": row.date_published,
+            "number": row.number,
+            "direction": row.direction,
+            "text": row.text,
+            "answer": row.answer
+        }
+        if score is not None:
+            clue["score"] = round(score, 4)
+        return clue
+    
+    if clue_id not in clues:
+        return None
+    return {
+        "clue": clue_dict(clues[clue_id]),
+        "same_answer": [clue_dict(clues[i], score) for i, score in result['same_answer'] if i in clues],
+        "same_answer_total": result['same_answer_total'],
+        "similar": [clue_dict(clues[i], score) for i, score in result['similar'] if i in clues]
+    }
+
+@api.route('/clues/<int:clue_id>/similar')
+@cached_response()
+def get_similar_clues(clue_id):
+    """Past clues for the same answer and clues with similar wording, from the precomputed clue index"""
+    try:
+        with get_db_session() as session:
+            body = _similar_clues(session, clue_id, _get_limit(default=10, maximum=50))
+            if body is None:
+                return jsonify({"error": "Clue not found"}), 404
+            return jsonify(body)
+    except Exception as e:
+        logger.error(f"Error finding clues similar to {clue_id}: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/puzzles/<int:puzzle_id>/clues/<direction>/<int:number>/similar')
+@cached_response()
+def get_similar_clues_by_position(puzzle_id, direction, number):
+    """Similar clues for a clue identified by puzzle, direction and number"""
+    try:
+        with get_db_session() as session:
+            clue_id = session.query(Clue.id).filter(
+                Clue.puzzle_id == puzzle_id,
+                Clue.direction == direction,
+                Clue.number == number
+            ).limit(1).scalar()
+            body = _similar_clues(session, clue_id, _get_limit(default=10, maximum=50)) if clue_id else None
+            if body is None:
+                return jsonify({"error": "Clue not found"}), 404
+            return jsonify(body)
+    except Exception as e:
+        logger.error(f"Error finding clues similar to puzzle {puzzle_id} {number} {direction}: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/generate', methods=['POST'])
+def start_generation():
+    """Queue a grid fill for a black-square template; the result is polled from /generate/<job_id>"""
+    try:
+        data = request.get_json(silent=True)
+        if not data or 'template' not in data:
+            return jsonify({"error": "Missing template"}), 400
+        
+        try:
+            job_id = submit_generation(
+                data['template'],
+                time_budget=data.get('time_budget', DEFAULT_TIME_BUDGET),
+                seed=data.get('seed'),
+                min_uses=int(data.get('min_uses', 1))
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        except RuntimeError as e:
+            return jsonify({"error": str(e)}), 503
+        
+        return jsonify({"job_id": job_id, "status": "queued"}), 202
+    except Exception as e:
+        logger.error(f"Error starting puzzle generation: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/generate/<job_id>')
+def get_generation(job_id):
+    """Status of a generation job, with the generated puzzle once it is done"""
+    try:
+        with get_db_session() as session:
+            job = get_generation_job(session, job_id)
+            if job is None:
+                return jsonify({"error": "Job not found"}), 404
+            return jsonify(job)
+    except Exception as e:
+        logger.error(f"Error fetching generation job {job_id}: {e}")
+        return jsonify({"error": str(e)}), 500
+
 # User management endpoints
 @api.route('/users', methods=['POST'])
 def create_user():
@@ -175,66 +626,139 @@ def create_user():
 
 @api.route('/users/<int:user_id>/puzzles', methods=['GET'])
 def get_user_puzzles(user_id):
+    """A user's saved puzzles, most recently played first, with keyset pagination on (last_played, id)"""
     try:
+        per_page = get_per_page(request.args, default=20, maximum=100)
+        status = request.args.get('status', 'all')
+        if status not in LIBRARY_STATUSES:
+            return jsonify({"error": f"status must be one of {', '.join(LIBRARY_STATUSES)}"}), 400
+        
+        # Read your own buffered writes
+        buffer = get_progress_buffer()
+        if buffer is not None:
+            buffer.flush(user_id=user_id)
+        
         with get_db_session() as session:
-            saved_puzzles = session.query(SavedPuzzle).filter(
-                SavedPuzzle.user_id == user_id
-            ).all()
+            query = session.query(
+                SavedPuzzle.id, SavedPuzzle.puzzle_id, SavedPuzzle.cells, SavedPuzzle.progress,
+                SavedPuzzle.completed, SavedPuzzle.last_played,
+                Puzzle.date_published, Puzzle.author, Puzzle.cols
+            ).join(Puzzle, Puzzle.id == SavedPuzzle.puzzle_id).filter(SavedPuzzle.user_id == user_id)
+            
+            if status != 'all':
+                query = query.filter(SavedPuzzle.completed == (status == 'completed'))
+            
+            if cursor := request.args.get('cursor'):
+                try:
+                    last_played, last_id = decode_cursor(cursor, 2)
+                    last_key = tuple_(datetime.fromisoformat(last_played), int(last_id))
+                except (TypeError, ValueError):
+                    return jsonify({"error": "Invalid cursor"}), 400
+                query = query.filter(tuple_(SavedPuzzle.last_played, SavedPuzzle.id) < last_key)
+            
+            # Fetch one extra row to learn whether another page exists
+            rows = query.order_by(SavedPuzzle.last_played.desc(), SavedPuzzle.id.desc()).limit(per_page + 1).all()
+            has_more = len(rows) > per_page
+            rows = rows[:per_page]
             
             return jsonify({
                 "puzzles": [{
-                    "puzzle_id": sp.puzzle_id,
-                    "progress": sp.progress,
-                    "completed": sp.completed,
-                    "last_played": sp.last_played,
+                    "puzzle_id": row.puzzle_id,
+                    "progress": decode_cells(row.cells, row.cols) if row.cells is not None else row.progress,
+                    "completed": row.completed,
+                    "last_played": row.last_played,
                     "puzzle": {
-                        "date_published": sp.puzzle.date_published,
-                        "author": sp.puzzle.author
+                        "date_published": row.date_published,
+                        "author": row.author
                     }
-                } for sp in saved_puzzles]
+                } for row in rows],
+                "per_page": per_page,
+                "next_cursor": encode_cursor((rows[-1].last_played.isoformat(), rows[-1].id)) if has_more else None
             })
             
     except Exception as e:
         logger.error(f"Error fetching user puzzles: {e}")
         return jsonify({"error": str(e)}), 500
 
+def _progress_response(puzzle_id, result, data, **fields):
+    """Progress save response; writes held by the write-behind buffer are acknowledged with 202"""
+    if result is None:
+        return jsonify({
+            "puzzle_id": puzzle_id,
+            **fields,
+            "completed": data.get('completed'),
+            "last_played": None,
+            "buffered": True
+        }), 202
+    
+    completed, last_played = result
+    return jsonify({
+        "puzzle_id": puzzle_id,
+        **fields,
+        "completed": completed,
+        "last_played": last_played
+    })
+
 @api.route('/users/<int:user_id>/puzzles/<int:puzzle_id>', methods=['POST', 'PUT'])
 def save_puzzle_progress(user_id, puzzle_id):
+    """Save a user's full progress on a puzzle, creating or replacing it in one statement"""
     try:
         data = request.get_json()
-        if not data or 'progress' not in data:
+        if not data or ('progress' not in data and 'cells' not in data):
             return jsonify({"error": "Missing progress data"}), 400
-            
+        
         with get_db_session() as session:
-            if request.method == 'POST':
-                saved_puzzle = SavedPuzzle(
-                    user_id=user_id,
-                    puzzle_id=puzzle_id,
-                    progress=data['progress'],
-                    completed=data.get('completed', False)
-                )
-                session.add(saved_puzzle)
+            shape = get_puzzle_shape(session, puzzle_id)
+            if shape is None:
+                return jsonify({"error": "Puzzle not found"}), 404
+            
+            rows, cols = shape
+            try:
+                cells, progress = progress_from_request(data, rows, cols)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            
+            buffer = get_progress_buffer()
+            if buffer is not None:
+                result = buffer.save(session, user_id, puzzle_id, cells, progress, data.get('completed'))
             else:
-                saved_puzzle = session.query(SavedPuzzle).filter(
-                    SavedPuzzle.user_id == user_id,
-                    SavedPuzzle.puzzle_id == puzzle_id
-                ).first()
-                
-                if not saved_puzzle:
-                    return jsonify({"error": "Saved puzzle not found"}), 404
-                    
-                saved_puzzle.progress = data['progress']
-                saved_puzzle.completed = data.get('completed', saved_puzzle.completed)
-                
-            session.commit()
+                result = save_progress(session, user_id, puzzle_id, cells, progress, data.get('completed'))
             
-            return jsonify({
-                "puzzle_id": puzzle_id,
-                "progress": saved_puzzle.progress,
-                "completed": saved_puzzle.completed,
-                "last_played": saved_puzzle.last_played
-            })
+            return _progress_response(
+                puzzle_id, result, data, progress=decode_cells(cells, cols) if cells is not None else progress
+            )
             
     except Exception as e:
         logger.error(f"Error saving puzzle progress: {e}")
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/users/<int:user_id>/puzzles/<int:puzzle_id>', methods=['PATCH'])
+def patch_puzzle_progress(user_id, puzzle_id):
+    """Set individual cells of a user's progress: {"cells": [{"row", "col", "value"}], "completed"}"""
+    try:
+        data = request.get_json()
+        if not data or 'cells' not in data:
+            return jsonify({"error": "Missing cells"}), 400
+        
+        with get_db_session() as session:
+            shape = get_puzzle_shape(session, puzzle_id)
+            if shape is None:
+                return jsonify({"error": "Puzzle not found"}), 404
+            
+            rows, cols = shape
+            try:
+                changes = parse_cell_deltas(data['cells'], rows, cols)
+                buffer = get_progress_buffer()
+                if buffer is not None:
+                    result = buffer.patch(session, user_id, puzzle_id, changes, rows * cols, data.get('completed'))
+                else:
+                    result = patch_progress(session, user_id, puzzle_id, changes, rows * cols, data.get('completed'))
+            except ValueError as e:
+                session.rollback()
+                return jsonify({"error": str(e)}), 400
+            
+            return _progress_response(puzzle_id, result, data, updated=len(changes))
+            
+    except Exception as e:
+        logger.error(f"Error updating puzzle progress: {e}")
+        return jsonify({"error": str(e)}), 500
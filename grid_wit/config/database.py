@@ -1,50 +1,141 @@
 import os
+import threading
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import declarative_base, sessionmaker, scoped_session
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.pool import NullPool
 from contextlib import contextmanager
 import urllib.parse
-
-# Load environment variables
-load_dotenv()
-
-# Database configuration
-DB_USER = os.getenv('DB_USER')
-DB_PASSWORD = urllib.parse.quote(os.getenv('DB_PASSWORD'))
-DB_HOST = os.getenv('DB_HOST')
-DB_PORT = os.getenv('DB_PORT')
-DB_NAME = os.getenv('DB_NAME')
-DB_SSL_MODE = os.getenv('DB_SSL_MODE', 'require')
-
-# Connection URL with SSL mode
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?sslmode={DB_SSL_MODE}"
-
-# Create engine with connection pooling and SSL configuration
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=QueuePool,
-    pool_size=10,
-    max_overflow=5,
-    pool_timeout=30,
-    pool_recycle=1800,
-    pool_pre_ping=True,
-    echo=False,
-    connect_args={"sslmode": "require"}
-)
+from grid_wit.config.pool import InstrumentedQueuePool, instrument_engine
 
 # Create base class for declarative models
 Base = declarative_base()
 
-# Create session factory
-SessionFactory = sessionmaker(
-    bind=engine,
-    autocommit=False,
-    autoflush=False
-)
+# The engine is created lazily, once per process, so importing models and
+# routes needs no database configuration and forked workers never share
+# connections with their parent.
+_engine = None
+_engine_pid = None
+_engine_config = (None, {})
+_session_factory = None
+_engine_lock = threading.Lock()
+
+def get_database_url():
+    """Build the database URL from DATABASE_URL or the DB_* environment variables"""
+    load_dotenv()
+    
+    if url := os.getenv('DATABASE_URL'):
+        return url
+    
+    db_user = os.getenv('DB_USER')
+    db_password = urllib.parse.quote(os.getenv('DB_PASSWORD') or '')
+    db_host = os.getenv('DB_HOST')
+    db_port = os.getenv('DB_PORT')
+    db_name = os.getenv('DB_NAME')
+    db_ssl_mode = os.getenv('DB_SSL_MODE', 'require')
+    
+    # Connection URL with SSL mode
+    return f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}?sslmode={db_ssl_mode}"
+
+def _env_flag(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+def _engine_options(url):
+    """Connection pooling and SSL configuration for the engine, tunable from the environment.
+
+    DB_POOL_MODE=null hands pooling to an external pooler such as PgBouncer:
+    every checkout opens a fresh connection to it and pre-ping is off by default.
+    """
+    if not url.startswith('postgresql'):
+        return {}
+    
+    options = {'echo': False}
+    if os.getenv('DB_POOL_MODE', 'queue').lower() == 'null':
+        options['poolclass'] = NullPool
+        options['pool_pre_ping'] = _env_flag('DB_POOL_PRE_PING', False)
+    else:
+        options.update({
+            'poolclass': InstrumentedQueuePool,
+            'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 5)),
+            'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+            'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+            'pool_pre_ping': _env_flag('DB_POOL_PRE_PING', True)
+        })
+    
+    # The DB_* URL already carries sslmode; DB_SSL_MODE also applies to a DATABASE_URL
+    if os.getenv('DB_SSL_MODE'):
+        options['connect_args'] = {"sslmode": os.getenv('DB_SSL_MODE')}
+    
+    return options
+
+def configure_engine(url=None, **engine_options):
+    """Set the URL and engine options used when this process next creates its engine"""
+    global _engine_config
+    dispose_engine()
+    _engine_config = (url, engine_options)
+
+def get_engine():
+    """This process's engine, created on first use (and again in each forked child)"""
+    global _engine, _engine_pid, _session_factory
+    
+    if _engine is None or _engine_pid != os.getpid():
+        with _engine_lock:
+            if _engine is None or _engine_pid != os.getpid():
+                url, engine_options = _engine_config
+                url = url or get_database_url()
+                _engine = create_engine(url, **{**_engine_options(url), **engine_options})
+                instrument_engine(_engine)
+                _engine_pid = os.getpid()
+                _session_factory = sessionmaker(
+                    bind=_engine,
+                    autocommit=False,
+                    autoflush=False
+                )
+    
+    return _engine
+
+def get_session_factory():
+    get_engine()
+    return _session_factory
+
+def dispose_engine():
+    """Close this process's pooled connections; the next use creates a fresh engine"""
+    global _engine, _session_factory
+    
+    SessionLocal.remove()
+    if _engine is not None and _engine_pid == os.getpid():
+        _engine.dispose()
+    _engine = None
+    _session_factory = None
+
+def _reset_after_fork():
+    """Forget the parent's engine in a forked child without closing the parent's connections"""
+    global _engine, _session_factory
+    
+    if _engine is not None:
+        _engine.dispose(close=False)
+    _engine = None
+    _session_factory = None
+    SessionLocal.registry.clear()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def init_app(app, url=None, **engine_options):
+    """Wire the database into a Flask app; the engine itself is created on first use"""
+    if url or engine_options:
+        configure_engine(url, **engine_options)
+    
+    @app.teardown_appcontext
+    def remove_session(exception=None):
+        SessionLocal.remove()
 
 # Create scoped session
-SessionLocal = scoped_session(SessionFactory)
+SessionLocal = scoped_session(lambda: get_session_factory()())
 
 @contextmanager
 def get_db_session():
@@ -57,4 +148,10 @@ def get_db_session():
         session.rollback()
         raise e
     finally:
-        session.close() 
\ No newline at end of file
+        session.close()
+
+def dialect_insert(session):
+    """Return the dialect-specific insert() so callers can use ON CONFLICT upserts"""
+    if session.get_bind().dialect.name == 'sqlite':
+        return sqlite.insert
+    return postgresql.insert
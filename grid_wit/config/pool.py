@@ -0,0 +1,78 @@
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from grid_wit.utils.metrics import Counter, Gauge, Histogram, histogram_summary
+
+CHECKOUT_WAIT = Histogram(
+    'db_pool_checkout_wait_seconds',
+    "Time spent waiting for a pooled connection"
+)
+CHECKOUT_TIMEOUTS = Counter('db_pool_checkout_timeouts_total', "Checkouts that hit pool_timeout")
+PRE_PING_FAILURES = Counter('db_pool_pre_ping_failures_total', "Pooled connections found dead by pre-ping")
+CONNECTIONS_OPENED = Counter('db_pool_connections_opened_total', "New DBAPI connections opened")
+CONNECTIONS_INVALIDATED = Counter('db_pool_connections_invalidated_total', "Connections invalidated")
+
+_pool = None
+
+def _pool_state():
+    """Current pool occupancy; NullPool only reports the instrumented counters"""
+    if not isinstance(_pool, QueuePool):
+        return {}
+    return {
+        'size': _pool.size(),
+        'checked_out': _pool.checkedout(),
+        'checked_in': _pool.checkedin(),
+        'overflow': max(_pool.overflow(), 0)
+    }
+
+POOL_STATE = Gauge(
+    'db_pool_connections',
+    "Pool connections by state",
+    lambda: {(state,): value for state, value in _pool_state().items()},
+    labels=('state',)
+)
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits and how often it times out"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            CHECKOUT_TIMEOUTS.inc()
+            raise
+        finally:
+            CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+def instrument_engine(engine):
+    """Attach pool and connection metrics to an engine"""
+    global _pool
+    _pool = engine.pool
+
+    @event.listens_for(engine, 'handle_error')
+    def on_error(context):
+        if context.is_pre_ping:
+            PRE_PING_FAILURES.inc()
+
+    @event.listens_for(engine.pool, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        CONNECTIONS_OPENED.inc()
+
+    @event.listens_for(engine.pool, 'invalidate')
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        CONNECTIONS_INVALIDATED.inc()
+
+def pool_status():
+    """JSON summary of pool occupancy and wait metrics"""
+    wait = CHECKOUT_WAIT.snapshot().get((), {'buckets': [], 'sum': 0.0, 'count': 0})
+    return {
+        'pool_class': type(_pool).__name__ if _pool is not None else None,
+        **_pool_state(),
+        'checkout_wait': histogram_summary(wait),
+        'checkout_timeouts': CHECKOUT_TIMEOUTS.value(),
+        'pre_ping_failures': PRE_PING_FAILURES.value(),
+        'connections_opened': CONNECTIONS_OPENED.value(),
+        'connections_invalidated': CONNECTIONS_INVALIDATED.value()
+    }
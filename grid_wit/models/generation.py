@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Float, Text, JSON, DateTime, Index
+from sqlalchemy.sql import func
+from grid_wit.config.database import Base
+
+# Grid-fill requests. Rows are written by the API and by the generator pool
+# process that runs the job (grid_wit.utils.generator), so any web worker can
+# report a job's status.
+
+class GenerationJob(Base):
+    __tablename__ = 'generation_jobs'
+    
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    status = Column(String, nullable=False, default='queued')  # queued, running, done or failed
+    template = Column(JSON, nullable=False)  # Rows of the template, '.' for black squares
+    time_budget = Column(Float, nullable=False)  # Seconds the fill may search for
+    seed = Column(Integer)
+    result = Column(JSON)
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    
+    __table_args__ = (
+        Index('idx_generation_jobs_created_at', 'created_at'),
+    )
@@ -1,20 +1,57 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
+from sqlalchemy import Column, Integer, BigInteger, Float, String, Text, LargeBinary, ForeignKey, DateTime, Index, DDL, event, literal_column
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from grid_wit.config.database import Base
+from grid_wit.config.database import Base, get_engine
+
+# Text search configuration used by the full-text clue index and its queries
+TEXT_SEARCH_CONFIG = 'english'
+
+def text_search_vector(column):
+    """tsvector expression for a text column; queries must use it verbatim to hit the index"""
+    return func.to_tsvector(
+        literal_column(f"'{TEXT_SEARCH_CONFIG}'"),
+        func.coalesce(column, literal_column("''"))
+    )
+
+def text_search_query(value):
+    """tsquery for user-entered search text (quoted phrases, OR and -negation are supported)"""
+    return func.websearch_to_tsquery(literal_column(f"'{TEXT_SEARCH_CONFIG}'"), value)
+
+# Trigram indexes need pg_trgm
+event.listen(
+    Base.metadata,
+    'before_create',
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect='postgresql')
+)
 
 class Puzzle(Base):
     __tablename__ = 'puzzles'
     
     id = Column(Integer, primary_key=True)
-    date_published = Column(String, index=True)
+    date_published = Column(String, unique=True, index=True)  # ISO YYYY-MM-DD
     author = Column(String)
-    grid = Column(Text)
+    rows = Column(Integer)
+    cols = Column(Integer)
+    grid = Column(Text)  # Legacy JSON cell list, only kept for rebus grids
+    grid_compact = Column(String)  # One character per cell, '.' for black squares
+    gridnums = Column(LargeBinary)  # Packed little-endian uint16 per cell
+    body = Column(LargeBinary)  # Pre-rendered default API response (UTF-8 JSON), when the importer renders one
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Add relationship to clues
-    clues = relationship("Clue", back_populates="puzzle", cascade="all, delete-orphan")
+    clues = relationship(
+        "Clue",
+        back_populates="puzzle",
+        cascade="all, delete-orphan",
+        order_by="(Clue.direction, Clue.number)"
+    )
+    
+    # Indexes
+    __table_args__ = (
+        Index('idx_puzzle_date_id', 'date_published', 'id'),  # Keyset pagination
+        Index('idx_puzzle_author', 'author'),  # Author statistics refreshes
+    )
 
 class Clue(Base):
     __tablename__ = 'clues'
@@ -36,11 +73,52 @@ class Clue(Base):
     # Indexes
     __table_args__ = (
         Index('idx_puzzle_direction', 'puzzle_id', 'direction'),
+        Index('idx_clue_answer', 'answer'),  # Exact answer lookups and statistics refreshes
+        # Trigram indexes serve ILIKE '%...%' on answers and clue text
+        Index(
+            'idx_clue_answer_trgm', 'answer',
+            postgresql_using='gin', postgresql_ops={'answer': 'gin_trgm_ops'}
+        ).ddl_if(dialect='postgresql'),
+        Index(
+            'idx_clue_text_trgm', 'text',
+            postgresql_using='gin', postgresql_ops={'text': 'gin_trgm_ops'}
+        ).ddl_if(dialect='postgresql'),
+        # Full-text index over clue text
+        Index(
+            'idx_clue_text_fts', text_search_vector(text),
+            postgresql_using='gin'
+        ).ddl_if(dialect='postgresql'),
     )
 
+class ImportManifest(Base):
+    """Per-file record of what the importer last loaded, used for incremental syncs"""
+    __tablename__ = 'import_manifest'
+    
+    path = Column(String, primary_key=True)  # Relative to the archive root
+    content_hash = Column(String(64), nullable=False)
+    mtime = Column(Float)
+    size = Column(BigInteger)
+    date_published = Column(String)
+    imported_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class CorpusState(Base):
+    """Single-row record of the corpus version and summary counts, refreshed by the importer after every load"""
+    __tablename__ = 'corpus_state'
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    puzzle_count = Column(Integer)
+    clue_count = Column(Integer)
+    first_date = Column(String)
+    last_date = Column(String)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 def init_db():
     """Initialize the database schema"""
-    Base.metadata.create_all(bind=engine)
+    import grid_wit.models.user  # noqa: F401 - register user tables on Base
+    import grid_wit.models.stats  # noqa: F401 - register statistics tables on Base
+    import grid_wit.models.generation  # noqa: F401 - register generation job tables on Base
+    Base.metadata.create_all(bind=get_engine())
 
 if __name__ == "__main__":
     init_db()
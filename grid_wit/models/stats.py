@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, String, Index
+from grid_wit.config.database import Base
+
+# Aggregates over the clues and puzzles tables, maintained by the importer
+# (grid_wit.utils.stats) so statistics endpoints read rows instead of grouping clues.
+
+class AnswerStat(Base):
+    __tablename__ = 'answer_stats'
+    
+    answer = Column(String, primary_key=True)
+    length = Column(Integer, nullable=False)
+    uses = Column(Integer, nullable=False)  # Clues with this answer
+    first_date = Column(String)  # ISO date of the first and latest puzzle using it
+    last_date = Column(String)
+    
+    __table_args__ = (
+        Index('idx_answer_stats_uses', uses.desc(), 'answer'),
+        Index('idx_answer_stats_length_uses', 'length', uses.desc(), 'answer'),
+    )
+
+class AnswerYearStat(Base):
+    __tablename__ = 'answer_year_stats'
+    
+    answer = Column(String, primary_key=True)
+    year = Column(Integer, primary_key=True)
+    length = Column(Integer, nullable=False)  # Copied from the answer so year + length reads an index
+    uses = Column(Integer, nullable=False)
+    
+    __table_args__ = (
+        Index('idx_answer_year_stats_year_uses', 'year', uses.desc(), 'answer'),
+        Index('idx_answer_year_stats_year_length_uses', 'year', 'length', uses.desc(), 'answer'),
+    )
+
+class AuthorStat(Base):
+    __tablename__ = 'author_stats'
+    
+    author = Column(String, primary_key=True)
+    puzzle_count = Column(Integer, nullable=False)
+    first_date = Column(String)
+    last_date = Column(String)
+    
+    __table_args__ = (
+        Index('idx_author_stats_puzzle_count', puzzle_count.desc(), 'author'),
+    )
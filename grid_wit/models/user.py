@@ -1,8 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, JSON, Boolean, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from datetime import datetime, timezone
 from grid_wit.config.database import Base
 
+def utc_now():
+    """Current UTC time. last_played is always written from Python so every row is stored in one format;
+    SQLite keeps CURRENT_TIMESTAMP without fractional seconds, which breaks keyset comparisons."""
+    return datetime.now(timezone.utc)
+
 class User(Base):
     __tablename__ = 'users'
     
@@ -20,14 +26,23 @@ class SavedPuzzle(Base):
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'))
     puzzle_id = Column(Integer, ForeignKey('puzzles.id', ondelete='CASCADE'))
-    progress = Column(JSON)  # Store user's progress as JSON
+    cells = Column(String)  # One character per cell, row-major, ' ' when empty
+    progress = Column(JSON)  # Legacy and rebus progress that cells cannot encode
     completed = Column(Boolean, default=False)
-    last_played = Column(DateTime(timezone=True), onupdate=func.now())
+    last_played = Column(DateTime(timezone=True), nullable=False, default=utc_now, server_default=func.now(), onupdate=utc_now)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     user = relationship("User", back_populates="saved_puzzles")
     puzzle = relationship("Puzzle")
+    
+    # One progress row per user and puzzle, and the conflict target for progress upserts.
+    # The library pages through a user's saves newest first, optionally by completion.
+    __table_args__ = (
+        UniqueConstraint('user_id', 'puzzle_id', name='uq_saved_puzzle_user_puzzle'),
+        Index('idx_saved_user_last_played', 'user_id', last_played.desc(), id.desc()),
+        Index('idx_saved_user_completed_last_played', 'user_id', 'completed', last_played.desc(), id.desc()),
+    )
 
 class DailyPuzzleHistory(Base):
     __tablename__ = 'daily_puzzle_history'
@@ -35,4 +50,10 @@ class DailyPuzzleHistory(Base):
     id = Column(Integer, primary_key=True)
     puzzle_id = Column(Integer, ForeignKey('puzzles.id', ondelete='CASCADE'))
     served_date = Column(DateTime(timezone=True), server_default=func.now())
-    cycle_number = Column(Integer, default=1)  # Track which cycle this puzzle was served in 
\ No newline at end of file
+    served_on = Column(Date, unique=True)  # Calendar day (UTC) the puzzle was the daily puzzle
+    cycle_number = Column(Integer, default=1)  # Track which cycle this puzzle was served in
+    
+    # Indexes
+    __table_args__ = (
+        Index('idx_daily_cycle_puzzle', 'cycle_number', 'puzzle_id'),
+    ) 
\ No newline at end of file
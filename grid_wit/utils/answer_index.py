@@ -0,0 +1,123 @@
+import os
+import re
+import threading
+from sqlalchemy import func
+from grid_wit.config.database import get_db_session
+from grid_wit.models.puzzle import Clue
+from grid_wit.utils.corpus import get_corpus_version
+import logging
+
+logger = logging.getLogger(__name__)
+
+WILDCARDS = frozenset('?._')
+PATTERN_RE = re.compile(r'^[A-Z0-9?._]{1,25}$')
+EXAMPLES_PER_ANSWER = int(os.getenv('ANSWER_INDEX_EXAMPLES', 3))
+
+class _LengthBucket:
+    """Answers of one length, most frequent first, with a bitset per (position, letter).
+
+    Bit i of masks[pos][letter] is set when answers[i] has `letter` at `pos`, so a
+    pattern is matched by AND-ing one mask per fixed letter.
+    """
+
+    def __init__(self, length, entries):
+        entries.sort(key=lambda entry: (-entry[1], entry[0]))
+        self.answers = [entry[0] for entry in entries]
+        self.frequencies = [entry[1] for entry in entries]
+        self.examples = [entry[2] for entry in entries]
+        self.all_mask = (1 << len(entries)) - 1
+        self.masks = [{} for _ in range(length)]
+        
+        for i, answer in enumerate(self.answers):
+            bit = 1 << i
+            for pos, letter in enumerate(answer):
+                self.masks[pos][letter] = self.masks[pos].get(letter, 0) | bit
+
+    def match_mask(self, pattern):
+        mask = self.all_mask
+        for pos, letter in enumerate(pattern):
+            if letter not in WILDCARDS:
+                mask &= self.masks[pos].get(letter, 0)
+                if not mask:
+                    break
+        return mask
+
+class AnswerIndex:
+    """In-memory index of distinct answers for positional wildcard matching"""
+
+    def __init__(self, entries, version=None):
+        by_length = {}
+        for answer, frequency, examples in entries:
+            by_length.setdefault(len(answer), []).append((answer, frequency, examples))
+        
+        self.version = version
+        self.buckets = {length: _LengthBucket(length, items) for length, items in by_length.items()}
+        self.answer_count = sum(len(bucket.answers) for bucket in self.buckets.values())
+
+    @staticmethod
+    def normalize_pattern(pattern):
+        """Upper-case a pattern, raising ValueError if it is not a valid answer pattern"""
+        pattern = (pattern or '').strip().upper()
+        if not PATTERN_RE.match(pattern):
+            raise ValueError("Pattern must be 1-25 letters or digits, with ? . or _ as wildcards")
+        return pattern
+
+    def match(self, pattern, limit=50):
+        """Return (total, matches) for a normalized pattern, most frequent answers first"""
+        bucket = self.buckets.get(len(pattern))
+        if bucket is None:
+            return 0, []
+        
+        mask = bucket.match_mask(pattern)
+        total = mask.bit_count()
+        matches = []
+        
+        while mask and len(matches) < limit:
+            low = mask & -mask
+            i = low.bit_length() - 1
+            matches.append({
+                "answer": bucket.answers[i],
+                "frequency": bucket.frequencies[i],
+                "clues": bucket.examples[i]
+            })
+            mask ^= low
+        
+        return total, matches
+
+def build_answer_index(session, version=None):
+    """Build an AnswerIndex from the clues table in a single pass"""
+    answer = func.upper(Clue.answer)
+    ranked = session.query(
+        answer.label('answer'),
+        Clue.text,
+        Clue.puzzle_id,
+        func.count().over(partition_by=answer).label('frequency'),
+        func.row_number().over(partition_by=answer, order_by=Clue.id.desc()).label('rank')
+    ).filter(Clue.answer.isnot(None)).subquery()
+    
+    rows = session.query(ranked).filter(ranked.c.rank <= EXAMPLES_PER_ANSWER).execution_options(yield_per=10000)
+    
+    entries = {}
+    for row in rows:
+        entry = entries.setdefault(row.answer, (row.answer, row.frequency, []))
+        entry[2].append({"text": row.text, "puzzle_id": row.puzzle_id})
+    
+    index = AnswerIndex(entries.values(), version=version)
+    logger.info(f"Built answer index: {index.answer_count} distinct answers (corpus version {version})")
+    return index
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_answer_index():
+    """Shared AnswerIndex for this process, rebuilt when the corpus version changes"""
+    global _index
+    version = get_corpus_version()
+    
+    if _index is None or _index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                with get_db_session() as session:
+                    _index = build_answer_index(session, version)
+    
+    return _index
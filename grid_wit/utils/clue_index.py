@@ -0,0 +1,231 @@
+import os
+import re
+import json
+import shutil
+import threading
+from array import array
+import numpy as np
+from grid_wit.config.database import get_db_session
+from grid_wit.models.puzzle import Clue
+from grid_wit.utils.corpus import get_corpus_version
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Each corpus version's index lives in its own subdirectory, e.g. clue_index/v12/
+CLUE_INDEX_PATH = os.getenv('CLUE_INDEX_PATH', os.path.join(os.getcwd(), 'clue_index'))
+
+# Upper bound on postings scored per lookup; the most common query terms are skipped beyond it
+MAX_CANDIDATE_POSTINGS = int(os.getenv('CLUE_INDEX_MAX_CANDIDATES', 100000))
+
+TOKEN_RE = re.compile(r'[^\W_]+')
+STOPWORDS = frozenset(
+    'a an the of to in for on with and or as at by is it its from be this that who what one ones like e g eg'.split()
+)
+
+# Arrays written as .npy files. Clues are numbered by their position in clue_ids (ascending);
+# doc_* hold each clue's distinct terms, term_* and answer_* are posting lists in CSR form.
+ARRAYS = (
+    'clue_ids', 'doc_answer', 'doc_offsets', 'doc_terms', 'doc_norm',
+    'term_offsets', 'term_docs', 'idf', 'answer_offsets', 'answer_docs'
+)
+
+def tokenize(text):
+    """Distinct normalized tokens of a clue: lower-cased words without apostrophes or stopwords"""
+    words = TOKEN_RE.findall((text or '').lower().replace("'", ''))
+    return {word for word in words if word not in STOPWORDS}
+
+def _postings(doc_keys, key_count):
+    """CSR offsets per key, and the positions of doc_keys grouped by key (ascending within each key)"""
+    doc_keys = np.asarray(doc_keys)
+    order = np.argsort(doc_keys, kind='stable')
+    offsets = np.zeros(key_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(doc_keys, minlength=key_count), out=offsets[1:])
+    return offsets, order
+
+class ClueIndex:
+    """Inverted index from clue tokens and answers to clues, backed by flat (memory-mappable) arrays.
+
+    Similarity is the cosine of binary, IDF-weighted token vectors. A lookup
+    only touches the posting lists of the query clue's own tokens.
+    """
+
+    def __init__(self, arrays, version=None):
+        self.version = version
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self.clue_count = len(self.clue_ids)
+
+    def _doc(self, clue_id):
+        doc = int(np.searchsorted(self.clue_ids, clue_id))
+        if doc >= self.clue_count or self.clue_ids[doc] != clue_id:
+            return None
+        return doc
+
+    def _scores(self, doc):
+        """(candidate docs, similarity scores) for every clue sharing a token with `doc`"""
+        terms = self.doc_terms[self.doc_offsets[doc]:self.doc_offsets[doc + 1]]
+        if not len(terms) or not self.doc_norm[doc]:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        starts, ends = self.term_offsets[terms], self.term_offsets[terms + 1]
+        frequency = ends - starts
+        order = np.argsort(frequency)
+        keep = order[:max(1, int(np.searchsorted(np.cumsum(frequency[order]), MAX_CANDIDATE_POSTINGS, side='right')))]
+
+        docs = np.concatenate([self.term_docs[starts[i]:ends[i]] for i in keep])
+        weights = np.repeat(np.square(self.idf[terms[keep]], dtype=np.float64), frequency[keep])
+        candidates, inverse = np.unique(docs, return_inverse=True)
+        scores = np.bincount(inverse, weights) / (self.doc_norm[doc] * self.doc_norm[candidates])
+        return candidates, scores
+
+    @staticmethod
+    def _top(docs, scores, limit):
+        """Best `limit` docs by score, newer clues first among equal scores"""
+        if len(docs) > limit:
+            cut = np.argpartition(-scores, limit - 1)[:limit]
+            threshold = scores[cut].min()
+            keep = scores >= threshold
+            docs, scores = docs[keep], scores[keep]
+        order = np.lexsort((-docs, -scores))[:limit]
+        return docs[order], scores[order]
+
+    def similar(self, clue_id, limit=10):
+        """Clues with the same answer and clues with similar wording, as lists of (clue_id, score).
+
+        Returns None when clue_id is not in the index.
+        """
+        doc = self._doc(clue_id)
+        if doc is None:
+            return None
+
+        candidates, scores = self._scores(doc)
+        others = candidates != doc
+        similar = self._top(candidates[others], scores[others], limit)
+
+        answer = self.doc_answer[doc]
+        same = self.answer_docs[self.answer_offsets[answer]:self.answer_offsets[answer + 1]]
+        same = same[same != doc]
+        same_scores = np.zeros(len(same))
+        if len(candidates):
+            position = np.minimum(np.searchsorted(candidates, same), len(candidates) - 1)
+            found = candidates[position] == same
+            same_scores[found] = scores[position[found]]
+        same_answer = self._top(same, same_scores, limit)
+
+        return {
+            'same_answer': [(int(self.clue_ids[d]), float(s)) for d, s in zip(*same_answer)],
+            'same_answer_total': len(same),
+            'similar': [(int(self.clue_ids[d]), float(s)) for d, s in zip(*similar)]
+        }
+
+    def save(self, path):
+        """Write the arrays and metadata to `path`, replacing it atomically"""
+        temp = f"{path}.tmp-{os.getpid()}"
+        shutil.rmtree(temp, ignore_errors=True)
+        os.makedirs(temp)
+        for name in ARRAYS:
+            np.save(os.path.join(temp, f'{name}.npy'), getattr(self, name))
+        with open(os.path.join(temp, 'meta.json'), 'w') as f:
+            json.dump({'version': self.version, 'clues': self.clue_count, 'terms': len(self.idf)}, f)
+
+        try:
+            os.rename(temp, path)
+        except OSError:
+            # Another process saved the same version first
+            shutil.rmtree(temp, ignore_errors=True)
+
+def build_clue_index(session, version=None):
+    """Build a ClueIndex from the clues table in a single pass ordered by clue ID"""
+    terms, answers = {}, {}
+    clue_ids, doc_answer, doc_lengths, doc_terms = array('i'), array('i'), array('i'), array('i')
+
+    rows = session.query(Clue.id, Clue.text, Clue.answer).order_by(Clue.id).execution_options(yield_per=10000)
+    for clue_id, text, answer in rows:
+        tokens = [terms.setdefault(token, len(terms)) for token in tokenize(text)]
+        clue_ids.append(clue_id)
+        doc_answer.append(answers.setdefault((answer or '').upper(), len(answers)))
+        doc_lengths.append(len(tokens))
+        doc_terms.extend(sorted(tokens))
+
+    clue_count = len(clue_ids)
+    doc_terms = np.frombuffer(doc_terms, dtype=np.int32)
+    doc_answer = np.frombuffer(doc_answer, dtype=np.int32)
+    doc_offsets = np.zeros(clue_count + 1, dtype=np.int64)
+    np.cumsum(np.frombuffer(doc_lengths, dtype=np.int32), out=doc_offsets[1:])
+    doc_of_posting = np.repeat(np.arange(clue_count, dtype=np.int32), np.diff(doc_offsets))
+
+    term_offsets, order = _postings(doc_terms, len(terms))
+    idf = np.log((clue_count + 1) / (np.diff(term_offsets) + 1)).astype(np.float32) + 1
+    doc_norm = np.sqrt(np.bincount(doc_of_posting, np.square(idf[doc_terms], dtype=np.float64), minlength=clue_count))
+    answer_offsets, answer_order = _postings(doc_answer, len(answers))
+
+    index = ClueIndex({
+        'clue_ids': np.frombuffer(clue_ids, dtype=np.int32),
+        'doc_answer': doc_answer,
+        'doc_offsets': doc_offsets,
+        'doc_terms': doc_terms,
+        'doc_norm': doc_norm.astype(np.float32),
+        'term_offsets': term_offsets,
+        'term_docs': doc_of_posting[order],
+        'idf': idf,
+        'answer_offsets': answer_offsets,
+        'answer_docs': answer_order.astype(np.int32)
+    }, version=version)
+    logger.info(f"Built clue index: {clue_count} clues, {len(terms)} terms, {len(answers)} answers (corpus version {version})")
+    return index
+
+def load_clue_index(path):
+    """Memory-map a saved ClueIndex, or return None when `path` holds no index"""
+    try:
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in ARRAYS}
+    except FileNotFoundError:
+        return None
+    return ClueIndex(arrays, version=meta['version'])
+
+def _version_path(version, base_path=None):
+    return os.path.join(base_path or CLUE_INDEX_PATH, f'v{version}')
+
+def write_clue_index(base_path=None):
+    """Build and save the index for the current corpus version and remove older versions, e.g. after an import"""
+    base_path = base_path or CLUE_INDEX_PATH
+    os.makedirs(base_path, exist_ok=True)
+    with get_db_session() as session:
+        version = get_corpus_version()
+        index = build_clue_index(session, version)
+
+    path = _version_path(version, base_path)
+    index.save(path)
+    for name in os.listdir(base_path):
+        if name.startswith('v') and name != os.path.basename(path) and '.tmp-' not in name:
+            shutil.rmtree(os.path.join(base_path, name), ignore_errors=True)
+    logger.info(f"Saved clue index to {path}")
+    return index
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_clue_index():
+    """Shared ClueIndex for this process: the saved index for the current corpus version, built here if missing"""
+    global _index
+    version = get_corpus_version()
+
+    if _index is None or _index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                path = _version_path(version)
+                index = load_clue_index(path)
+                if index is None:
+                    logger.warning(f"No clue index at {path}; building it in this process")
+                    with get_db_session() as session:
+                        index = build_clue_index(session, version)
+                    try:
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        index.save(path)
+                    except OSError as e:
+                        logger.warning(f"Could not save clue index to {path}: {e}")
+                _index = index
+
+    return _index
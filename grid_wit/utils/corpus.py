@@ -0,0 +1,110 @@
+import os
+import time
+import threading
+from sqlalchemy import func, select, text
+from grid_wit.config.database import get_db_session, dialect_insert
+from grid_wit.models.puzzle import CorpusState, Puzzle, Clue
+import logging
+
+logger = logging.getLogger(__name__)
+
+# How long a process trusts its last read of the corpus version
+CORPUS_VERSION_TTL = float(os.getenv('CORPUS_VERSION_TTL', 5))
+
+_lock = threading.Lock()
+_cached_version = None
+_checked_at = 0.0
+_cached_stats = None
+_stats_version = None
+
+def bump_corpus_version(session):
+    """Record that the corpus changed and refresh its summary counts; commits with the caller's transaction"""
+    stats = {
+        'puzzle_count': select(func.count(Puzzle.id)).scalar_subquery(),
+        'clue_count': select(func.count(Clue.id)).scalar_subquery(),
+        'first_date': select(func.min(Puzzle.date_published)).scalar_subquery(),
+        'last_date': select(func.max(Puzzle.date_published)).scalar_subquery()
+    }
+    stmt = dialect_insert(session)(CorpusState).values(id=1, version=1, **stats)
+    session.execute(stmt.on_conflict_do_update(
+        index_elements=[CorpusState.id],
+        set_={
+            'version': CorpusState.version + 1,
+            'updated_at': func.now(),
+            **{name: getattr(stmt.excluded, name) for name in stats}
+        }
+    ))
+    
+    # Make the change visible to this process immediately
+    global _checked_at
+    _checked_at = 0.0
+
+def get_corpus_version():
+    """Current corpus version, re-read from the database at most every CORPUS_VERSION_TTL seconds"""
+    global _cached_version, _checked_at
+    
+    if time.monotonic() - _checked_at < CORPUS_VERSION_TTL:
+        return _cached_version
+    
+    with _lock:
+        if time.monotonic() - _checked_at >= CORPUS_VERSION_TTL:
+            with get_db_session() as session:
+                _cached_version = session.query(CorpusState.version).filter(CorpusState.id == 1).scalar() or 0
+            _checked_at = time.monotonic()
+    
+    return _cached_version
+
+def _estimated_counts(session):
+    """Planner row estimates for puzzles and clues, or None where there is no estimate"""
+    if session.get_bind().dialect.name != 'postgresql':
+        return None, None
+    
+    rows = dict(session.execute(text(
+        "SELECT relname, reltuples::bigint FROM pg_class WHERE oid IN ('puzzles'::regclass, 'clues'::regclass)"
+    )).all())
+    # reltuples is -1 for tables that have never been vacuumed or analyzed
+    return (
+        rows['puzzles'] if rows.get('puzzles', -1) >= 0 else None,
+        rows['clues'] if rows.get('clues', -1) >= 0 else None
+    )
+
+def get_corpus_stats():
+    """Puzzle and clue counts as recorded by the last import, cached until the corpus version changes.
+
+    Databases that have not been imported into since the counts were added
+    fall back to pg_class.reltuples estimates rather than counting the tables.
+    """
+    global _cached_stats, _stats_version
+    
+    version = get_corpus_version()
+    if _cached_stats is not None and _stats_version == version:
+        return _cached_stats
+    
+    with get_db_session() as session:
+        state = session.query(
+            CorpusState.version, CorpusState.puzzle_count, CorpusState.clue_count,
+            CorpusState.first_date, CorpusState.last_date, CorpusState.updated_at
+        ).filter(CorpusState.id == 1).one_or_none()
+        
+        if state is not None and state.puzzle_count is not None:
+            stats = {
+                "puzzle_count": state.puzzle_count,
+                "clue_count": state.clue_count,
+                "first_date": state.first_date,
+                "last_date": state.last_date,
+                "source": "import"
+            }
+        else:
+            puzzle_count, clue_count = _estimated_counts(session)
+            stats = {
+                "puzzle_count": puzzle_count,
+                "clue_count": clue_count,
+                "first_date": None,
+                "last_date": None,
+                "source": "estimate"
+            }
+        stats["corpus_version"] = state.version if state is not None else 0
+        stats["updated_at"] = state.updated_at.isoformat() if state is not None and state.updated_at else None
+    
+    _cached_stats, _stats_version = stats, version
+    return stats
@@ -0,0 +1,102 @@
+import random
+import threading
+from datetime import datetime, timezone
+from sqlalchemy import func, exists
+from sqlalchemy.exc import IntegrityError
+from grid_wit.config.database import get_db_session
+from grid_wit.models.puzzle import Puzzle
+from grid_wit.models.user import DailyPuzzleHistory
+from grid_wit.utils.corpus import get_corpus_version
+import logging
+
+logger = logging.getLogger(__name__)
+
+def utc_today():
+    return datetime.now(timezone.utc).date()
+
+def _pick_unserved_puzzle(session, cycle_number):
+    """Pick a random puzzle not yet served in this cycle using index seeks rather than a sort"""
+    low, high = session.query(func.min(Puzzle.id), func.max(Puzzle.id)).one()
+    if low is None:
+        return None
+    
+    start = random.randint(low, high)
+    unserved = ~exists().where(
+        DailyPuzzleHistory.cycle_number == cycle_number,
+        DailyPuzzleHistory.puzzle_id == Puzzle.id
+    )
+    
+    # First unserved puzzle at or after a random ID, wrapping around to the start
+    for bound in (Puzzle.id >= start, Puzzle.id < start):
+        puzzle_id = session.query(Puzzle.id).filter(bound, unserved).order_by(Puzzle.id).limit(1).scalar()
+        if puzzle_id is not None:
+            return puzzle_id
+    return None
+
+def schedule_daily_puzzle(session, day):
+    """Return the puzzle ID for `day`, choosing and recording one if the day has no pick yet"""
+    puzzle_id = session.query(DailyPuzzleHistory.puzzle_id).filter(
+        DailyPuzzleHistory.served_on == day
+    ).scalar()
+    if puzzle_id is not None:
+        return puzzle_id
+    
+    cycle_number = session.query(func.max(DailyPuzzleHistory.cycle_number)).scalar() or 1
+    puzzle_id = _pick_unserved_puzzle(session, cycle_number)
+    if puzzle_id is None:
+        # Every puzzle has been served this cycle: start the next one
+        cycle_number += 1
+        puzzle_id = _pick_unserved_puzzle(session, cycle_number)
+        if puzzle_id is None:
+            return None
+    
+    try:
+        with session.begin_nested():
+            session.add(DailyPuzzleHistory(
+                puzzle_id=puzzle_id,
+                served_on=day,
+                cycle_number=cycle_number
+            ))
+        session.commit()
+        logger.info(f"Scheduled puzzle {puzzle_id} for {day} (cycle {cycle_number})")
+    except IntegrityError:
+        # Another worker scheduled the day first; serve its pick
+        session.rollback()
+        puzzle_id = session.query(DailyPuzzleHistory.puzzle_id).filter(
+            DailyPuzzleHistory.served_on == day
+        ).scalar()
+    
+    return puzzle_id
+
+_payloads = {}
+_payload_lock = threading.Lock()
+
+def get_daily_payload(build_payload, day=None, variant=None):
+    """Rendered payload for the day's puzzle, built once per day (and variant) per process.
+
+    build_payload(session, puzzle_id) renders the response body; `variant`
+    distinguishes renderings such as grid formats. Returns None when there
+    are no puzzles.
+    """
+    day = day or utc_today()
+    version = get_corpus_version()
+    key = (day, version, variant)
+    
+    payload = _payloads.get(key)
+    if payload is not None:
+        return payload
+    
+    with _payload_lock:
+        payload = _payloads.get(key)
+        if payload is None:
+            with get_db_session() as session:
+                puzzle_id = schedule_daily_puzzle(session, day)
+                if puzzle_id is None:
+                    return None
+                payload = build_payload(session, puzzle_id)
+            
+            for stale in [k for k in _payloads if k[:2] != (day, version)]:
+                del _payloads[stale]
+            _payloads[key] = payload
+    
+    return payload
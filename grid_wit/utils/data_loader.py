@@ -1,44 +1,56 @@
 import os
+import io
+import csv
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from grid_wit.config.database import get_db_session
-from grid_wit.models.puzzle import Puzzle, Clue
+from sqlalchemy import func, insert, text
+from grid_wit.config.database import get_db_session, dialect_insert
+from grid_wit.models.puzzle import Puzzle, Clue, ImportManifest
+from grid_wit.utils.corpus import bump_corpus_version
+from grid_wit.utils.stats import rebuild_stats, refresh_stats
+from grid_wit.utils.clue_index import write_clue_index
+from grid_wit.utils.grid_codec import grid_columns, encode_grid
+from grid_wit.utils.grid_geometry import GridGeometry, grid_dimensions
+from grid_wit.utils import serializers
 import json
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def calculate_word_positions(grid_data, size=15):
-    """Calculate starting positions for words in the grid"""
+# Bulk import tuning, overridable per run
+DEFAULT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', 500))
+DEFAULT_WORKERS = int(os.getenv('IMPORT_WORKERS', os.cpu_count() or 1))
+# Store each puzzle's default API response at import so it is served without rendering
+DEFAULT_PRERENDER = os.getenv('IMPORT_PRERENDER', '').lower() in ('1', 'true', 'yes')
+
+PUZZLE_COLUMNS = ('id', 'date_published', 'author', 'rows', 'cols', 'grid', 'grid_compact', 'gridnums', 'body')
+CLUE_COLUMNS = ('puzzle_id', 'number', 'direction', 'text', 'answer', 'row', 'column')
+
+def calculate_word_positions(grid_data, rows=None, cols=None):
+    """Calculate starting positions for words in the grid (square unless cols is given)"""
+    rows = rows or int(round(len(grid_data) ** 0.5))
+    geometry = GridGeometry(grid_data, rows, cols or rows)
     positions = {'across': {}, 'down': {}}
-    number = 1
     
-    for row in range(size):
-        for col in range(size):
-            index = row * size + col
-            if grid_data[index] == '.':
-                continue
-                
-            is_across_start = (col == 0 or grid_data[index - 1] == '.') and \
-                             (col < size - 1 and grid_data[index + 1] != '.')
-                             
-            is_down_start = (row == 0 or grid_data[index - size] == '.') and \
-                           (row < size - 1 and grid_data[index + size] != '.')
-            
-            if is_across_start or is_down_start:
-                if is_across_start:
-                    positions['across'][number] = {'row': row, 'column': col}
-                if is_down_start:
-                    positions['down'][number] = {'row': row, 'column': col}
-                number += 1
-                
+    for direction in ('across', 'down'):
+        for number, row, col, _ in geometry.slots(direction):
+            positions[direction][number] = {'row': row, 'column': col}
+    
     return positions
 
 def parse_puzzle_json(puzzle_data):
-    """Parse puzzle JSON and verify grid numbers match clues"""
+    """Parse puzzle JSON and map each clue number to the grid position of its word"""
     
     grid = puzzle_data['grid']  # Already a list
-    gridnums = puzzle_data['gridnums']
+    rows, cols = grid_dimensions(puzzle_data)
+    geometry = GridGeometry(grid, rows, cols)
+    
+    # Number slots by the source gridnums where present, so clue numbers line up with the source
+    gridnums = puzzle_data.get('gridnums') or geometry.numbers.tolist()
     
     # Get clues and answers
     across_clues = puzzle_data['clues']['across']
@@ -48,25 +60,15 @@ def parse_puzzle_json(puzzle_data):
     
     # Map positions to clue numbers
     clue_positions = {}
-    for row in range(15):
-        for col in range(15):
-            idx = row * 15 + col
-            number = gridnums[idx]
-            
-            if number > 0:
-                # Check if this position starts an across word
-                if col == 0 or (col > 0 and grid[idx-1] == '.'):
-                    if col < 14 and grid[idx+1] != '.':  # Make sure it's not a single square
-                        clue_positions[f"across-{number}"] = (row, col)
-                
-                # Check if this position starts a down word
-                if row == 0 or (row > 0 and grid[idx-15] == '.'):
-                    if row < 14 and grid[idx+15] != '.':  # Make sure it's not a single square
-                        clue_positions[f"down-{number}"] = (row, col)
+    for direction in ('across', 'down'):
+        for _, row, col, _ in geometry.slots(direction):
+            clue_positions[f"{direction}-{gridnums[row * cols + col]}"] = (row, col)
     
     return {
         'grid': grid,
         'gridnums': gridnums,
+        'rows': rows,
+        'cols': cols,
         'across_clues': across_clues,
         'down_clues': down_clues,
         'across_answers': across_answers,
@@ -74,99 +76,555 @@ def parse_puzzle_json(puzzle_data):
         'clue_positions': clue_positions
     }
 
-def load_puzzles_from_json():
-    """Load puzzles directly from JSON files into PostgreSQL"""
-    logger.info("Starting direct JSON to PostgreSQL import...")
+def build_clue_rows(parsed_data):
+    """Build clue rows for a parsed puzzle, skipping clues without a grid position"""
+    rows = []
+    
+    for direction in ('across', 'down'):
+        clues = zip(parsed_data[f'{direction}_clues'], parsed_data[f'{direction}_answers'])
+        for clue_text, answer in clues:
+            number = int(clue_text.split('.')[0])
+            text = clue_text.split('.', 1)[1].strip()
+            pos = parsed_data['clue_positions'].get(f"{direction}-{number}")
+            
+            if pos:
+                row, col = pos
+                rows.append({
+                    'number': number,
+                    'direction': direction,
+                    'text': text,
+                    'answer': answer,
+                    'row': row,
+                    'column': col
+                })
+                
+    return rows
+
+def normalize_date(value):
+    """Normalize archive dates (M/D/YYYY) to ISO YYYY-MM-DD"""
+    if '/' not in value:
+        return value
+    return datetime.strptime(value, '%m/%d/%Y').date().isoformat()
+
+def build_puzzle_rows(puzzle_data):
+    """Return the puzzle row and clue rows for a source puzzle dict"""
+    parsed_data = parse_puzzle_json(puzzle_data)
+    puzzle_row = {
+        'date_published': normalize_date(puzzle_data['date']),
+        'author': puzzle_data['author'],
+        'rows': parsed_data['rows'],
+        'cols': parsed_data['cols'],
+        **grid_columns(parsed_data['grid'], parsed_data['gridnums'])
+    }
+    return puzzle_row, build_clue_rows(parsed_data)
+
+def parse_puzzle_file(file_path):
+    """Read a puzzle file and return its puzzle row and clue rows"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        puzzle_data = json.load(f)
     
-    puzzles_path = os.path.join(os.getcwd(), 'nyt_crosswords')
+    return build_puzzle_rows(puzzle_data)
+
+def _parse_puzzle_file_safe(file_path):
+    """Worker entry point: parse a file and hash its contents, returning errors instead of raising"""
+    try:
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        
+        content_hash = hashlib.sha256(content).hexdigest()
+        return file_path, content_hash, build_puzzle_rows(json.loads(content)), None
+    except Exception as e:
+        return file_path, None, None, str(e)
+
+def iter_puzzle_files(puzzles_path):
+    """Yield puzzle JSON paths in year/month/file order"""
+    for year_folder in sorted(os.listdir(puzzles_path)):
+        year_path = os.path.join(puzzles_path, year_folder)
+        if not os.path.isdir(year_path):
+            continue
+        
+        for month_folder in sorted(os.listdir(year_path)):
+            month_path = os.path.join(year_path, month_folder)
+            if not os.path.isdir(month_path):
+                continue
+            
+            for filename in sorted(os.listdir(month_path)):
+                if filename.endswith('.json'):
+                    yield os.path.join(month_path, filename)
+
+def _resolve_puzzles_path(puzzles_path=None):
+    """Return the archive directory, defaulting to ./nyt_crosswords"""
+    puzzles_path = puzzles_path or os.path.join(os.getcwd(), 'nyt_crosswords')
     
     if not os.path.exists(puzzles_path):
         raise FileNotFoundError(f"Crosswords directory not found at {puzzles_path}")
+    return puzzles_path
+
+def _allocate_puzzle_ids(session, count):
+    """Reserve `count` puzzle IDs up front so clue rows can reference them without a flush"""
+    if session.get_bind().dialect.name == 'postgresql':
+        return session.execute(
+            text("SELECT nextval(pg_get_serial_sequence('puzzles', 'id')) FROM generate_series(1, :count)"),
+            {'count': count}
+        ).scalars().all()
+    
+    start = session.query(func.coalesce(func.max(Puzzle.id), 0)).scalar()
+    return list(range(start + 1, start + count + 1))
+
+def _copy_value(value):
+    """Format a value for COPY ... (FORMAT csv); bytea uses hex input syntax"""
+    if isinstance(value, bytes):
+        return '\\x' + value.hex()
+    return value
+
+def _copy_rows(session, model, columns, rows):
+    """Write rows with COPY on PostgreSQL, falling back to an executemany INSERT"""
+    if not rows:
+        return
+    
+    if session.get_bind().dialect.name != 'postgresql':
+        session.execute(insert(model), rows)
+        return
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_copy_value(row[column]) for column in columns] for row in rows)
+    buffer.seek(0)
+    
+    column_list = ', '.join(f'"{column}"' for column in columns)
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {model.__tablename__} ({column_list}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+def _manifest_row(puzzles_path, file_path, content_hash, date_published):
+    """Build the manifest entry recording a file as imported"""
+    stat = os.stat(file_path)
+    return {
+        'path': os.path.relpath(file_path, puzzles_path),
+        'content_hash': content_hash,
+        'mtime': stat.st_mtime,
+        'size': stat.st_size,
+        'date_published': date_published
+    }
+
+def _upsert_manifest(session, rows):
+    """Insert or refresh manifest entries"""
+    if not rows:
+        return
+    
+    stmt = dialect_insert(session)(ImportManifest).values(rows)
+    session.execute(stmt.on_conflict_do_update(
+        index_elements=[ImportManifest.path],
+        set_={
+            'content_hash': stmt.excluded.content_hash,
+            'mtime': stmt.excluded.mtime,
+            'size': stmt.excluded.size,
+            'date_published': stmt.excluded.date_published,
+            'imported_at': func.now()
+        }
+    ))
+
+def _puzzle_body(puzzle_id, puzzle_row, clue_rows):
+    """Pre-rendered response body for a parsed puzzle, with clues in the order the API returns them"""
+    puzzle = tuple(puzzle_id if column.key == 'id' else puzzle_row[column.key] for column in serializers.PUZZLE_COLUMNS)
+    clues = sorted(
+        (tuple(row[field] for field in serializers.CLUE_FIELDS) for row in clue_rows),
+        key=lambda clue: (clue[1], clue[0])
+    )
+    return serializers.render_puzzle_body(puzzle, clues)
+
+def _dedupe_dates(batch):
+    """Keep one parsed file per date_published (the last one wins), logging the files it drops"""
+    latest = {}
+    for item in batch:
+        file_path, _, (puzzle_row, _) = item
+        date_published = puzzle_row['date_published']
+        if date_published in latest:
+            logger.warning(f"Skipping {latest[date_published][0]}: {file_path} has the same date {date_published}")
+        latest[date_published] = item
+    return list(latest.values())
+
+def _write_batch(session, puzzles_path, batch, prerender=False):
+    """Insert a batch of parsed puzzles with dates not yet stored, their clues and manifest entries"""
+    puzzles = _dedupe_dates(batch)
+    puzzle_ids = _allocate_puzzle_ids(session, len(puzzles))
+    puzzle_rows = []
+    clue_rows = []
+    
+    for puzzle_id, (file_path, content_hash, (puzzle_row, rows)) in zip(puzzle_ids, puzzles):
+        body = _puzzle_body(puzzle_id, puzzle_row, rows) if prerender else None
+        puzzle_rows.append(dict(puzzle_row, id=puzzle_id, body=body))
+        clue_rows.extend(dict(row, puzzle_id=puzzle_id) for row in rows)
+    
+    _copy_rows(session, Puzzle, PUZZLE_COLUMNS, puzzle_rows)
+    _copy_rows(session, Clue, CLUE_COLUMNS, clue_rows)
+    _upsert_manifest(session, [
+        _manifest_row(puzzles_path, file_path, content_hash, puzzle_row['date_published'])
+        for file_path, content_hash, (puzzle_row, _) in batch
+    ])
+
+def _sync_batch(session, puzzles_path, batch, prerender=False):
+    """Upsert a batch of new or changed puzzles keyed on date_published and replace their clues"""
+    puzzles = _dedupe_dates(batch)
+    puzzle_rows = {puzzle_row['date_published']: puzzle_row for _, _, (puzzle_row, _) in puzzles}
+    
+    # Statistics keys touched by the puzzles' previous and new versions
+    authors = {row['author'] for row in puzzle_rows.values()}
+    authors.update(author for (author,) in session.query(Puzzle.author).filter(
+        Puzzle.date_published.in_(puzzle_rows.keys())
+    ))
+    
+    stmt = dialect_insert(session)(Puzzle).values(list(puzzle_rows.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Puzzle.date_published],
+        set_={
+            'author': stmt.excluded.author,
+            'rows': stmt.excluded.rows,
+            'cols': stmt.excluded.cols,
+            'grid': stmt.excluded.grid,
+            'grid_compact': stmt.excluded.grid_compact,
+            'gridnums': stmt.excluded.gridnums,
+            'body': None,
+            'updated_at': func.now()
+        }
+    ).returning(Puzzle.id, Puzzle.date_published)
+    puzzle_ids = {date_published: puzzle_id for puzzle_id, date_published in session.execute(stmt)}
+    
+    answers = {answer for (answer,) in session.query(Clue.answer).filter(
+        Clue.puzzle_id.in_(puzzle_ids.values())
+    ).distinct()}
+    session.query(Clue).filter(Clue.puzzle_id.in_(puzzle_ids.values())).delete(synchronize_session=False)
+    
+    clue_rows = []
+    for file_path, content_hash, (puzzle_row, rows) in puzzles:
+        clue_rows.extend(dict(row, puzzle_id=puzzle_ids[puzzle_row['date_published']]) for row in rows)
+    answers.update(row['answer'] for row in clue_rows)
+    
+    # Dropped duplicates are still recorded, so later syncs do not re-import them over the kept file
+    manifest_rows = [
+        _manifest_row(puzzles_path, file_path, content_hash, puzzle_row['date_published'])
+        for file_path, content_hash, (puzzle_row, _) in batch
+    ]
+    
+    _copy_rows(session, Clue, CLUE_COLUMNS, clue_rows)
+    if prerender:
+        bodies = []
+        for file_path, content_hash, (puzzle_row, rows) in puzzles:
+            puzzle_id = puzzle_ids[puzzle_row['date_published']]
+            bodies.append({'id': puzzle_id, 'body': _puzzle_body(puzzle_id, puzzle_row, rows)})
+        session.bulk_update_mappings(Puzzle, bodies)
+    refresh_stats(session, answers, authors)
+    _upsert_manifest(session, manifest_rows)
+
+def iter_parsed_puzzles(file_paths, workers=DEFAULT_WORKERS):
+    """Parse puzzle files across a process pool, yielding (path, hash, result, error) in order"""
+    if workers <= 1:
+        yield from map(_parse_puzzle_file_safe, file_paths)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_parse_puzzle_file_safe, file_paths, chunksize=32)
+
+def _write_bulk_batch(session, puzzles_path, batch, prerender, loaded_dates):
+    """Write a bulk import batch in a savepoint, retrying file by file when it fails so only bad files are skipped.
+
+    Dates already written by an earlier batch are replaced, so the last file for a date wins.
+    """
+    try:
+        with session.begin_nested():
+            fresh = [item for item in batch if item[2][0]['date_published'] not in loaded_dates]
+            repeats = [item for item in batch if item[2][0]['date_published'] in loaded_dates]
+            if fresh:
+                _write_batch(session, puzzles_path, fresh, prerender)
+            if repeats:
+                _sync_batch(session, puzzles_path, repeats, prerender)
+    except Exception as e:
+        if len(batch) == 1:
+            logger.error(f"Error importing {batch[0][0]}: {e}")
+            return 0
+        logger.warning(f"Batch of {len(batch)} files failed ({e}); retrying them one at a time")
+        return sum(_write_bulk_batch(session, puzzles_path, [item], prerender, loaded_dates) for item in batch)
+    
+    loaded_dates.update(item[2][0]['date_published'] for item in batch)
+    return len(batch)
+
+def bulk_load_puzzles_from_json(puzzles_path=None, batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS,
+                                prerender=DEFAULT_PRERENDER):
+    """Load the archive with parallel parsing and batched COPY/executemany writes.
+
+    The existing data is replaced in a single transaction, so readers keep the
+    previous corpus until the import commits and a failed run leaves it intact.
+    """
+    puzzles_path = _resolve_puzzles_path(puzzles_path)
+    logger.info(f"Starting bulk import from {puzzles_path} (batch_size={batch_size}, workers={workers}, prerender={prerender})...")
+    
+    file_paths = list(iter_puzzle_files(puzzles_path))
+    written_count = error_count = 0
+    loaded_dates = set()
     
     with get_db_session() as session:
-        # First, clear existing data
         logger.info("Clearing existing data...")
+        session.query(ImportManifest).delete()
         session.query(Clue).delete()
         session.query(Puzzle).delete()
+        
+        batch = []
+        for file_path, content_hash, result, error in iter_parsed_puzzles(file_paths, workers):
+            if error:
+                logger.error(f"Error processing {file_path}: {error}")
+                error_count += 1
+                continue
+            
+            batch.append((file_path, content_hash, result))
+            if len(batch) >= batch_size:
+                written = _write_bulk_batch(session, puzzles_path, batch, prerender, loaded_dates)
+                written_count += written
+                error_count += len(batch) - written
+                logger.info(f"Imported {written_count}/{len(file_paths)} files")
+                batch = []
+        
+        if batch:
+            written = _write_bulk_batch(session, puzzles_path, batch, prerender, loaded_dates)
+            written_count += written
+            error_count += len(batch) - written
+        
+        rebuild_stats(session)
+        bump_corpus_version(session)
+        puzzle_count = session.query(func.count(Puzzle.id)).scalar()
+        clue_count = session.query(func.count(Clue.id)).scalar()
         session.commit()
+    
+    write_clue_index()
+    logger.info(f"Bulk import completed: {puzzle_count} puzzles, {clue_count} clues, {error_count} errors")
+    return puzzle_count
+
+def sync_puzzles_from_json(puzzles_path=None, batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS,
+                           prerender=DEFAULT_PRERENDER):
+    """Incrementally import new or changed archive files without clearing existing data.
+
+    Files whose mtime and size match the manifest are skipped without being read;
+    files that were touched but hash the same only have their manifest entry
+    refreshed. Each batch commits its puzzles, clues and manifest entries
+    together, so an interrupted sync resumes from the last committed batch.
+    """
+    puzzles_path = _resolve_puzzles_path(puzzles_path)
+    logger.info(f"Starting incremental sync from {puzzles_path}...")
+    
+    with get_db_session() as session:
+        manifest = {
+            entry.path: entry
+            for entry in session.query(
+                ImportManifest.path,
+                ImportManifest.content_hash,
+                ImportManifest.mtime,
+                ImportManifest.size,
+                ImportManifest.date_published
+            )
+        }
+        
+        candidates = []
+        for file_path in iter_puzzle_files(puzzles_path):
+            entry = manifest.get(os.path.relpath(file_path, puzzles_path))
+            stat = os.stat(file_path)
+            if entry and entry.mtime == stat.st_mtime and entry.size == stat.st_size:
+                continue
+            candidates.append(file_path)
         
-        for year_folder in sorted(os.listdir(puzzles_path)):
-            year_path = os.path.join(puzzles_path, year_folder)
+        logger.info(f"{len(candidates)} of {len(manifest)} known files need checking")
+        
+        changed_count = touched_count = error_count = 0
+        batch = []
+        touched = []
+        for file_path, content_hash, result, error in iter_parsed_puzzles(candidates, workers):
+            if error:
+                logger.error(f"Error processing {file_path}: {error}")
+                error_count += 1
+                continue
+            
+            entry = manifest.get(os.path.relpath(file_path, puzzles_path))
+            if entry and entry.content_hash == content_hash:
+                touched.append(_manifest_row(puzzles_path, file_path, content_hash, entry.date_published))
+                touched_count += 1
+                continue
             
-            if os.path.isdir(year_path):
-                logger.info(f"Processing year: {year_folder}")
+            batch.append((file_path, content_hash, result))
+            if len(batch) >= batch_size:
+                _sync_batch(session, puzzles_path, batch, prerender)
+                session.commit()
+                changed_count += len(batch)
+                logger.info(f"Synced {changed_count} changed puzzles")
+                batch = []
+        
+        if batch:
+            _sync_batch(session, puzzles_path, batch, prerender)
+            session.commit()
+            changed_count += len(batch)
+        
+        _upsert_manifest(session, touched)
+        if changed_count:
+            bump_corpus_version(session)
+        session.commit()
+    
+    if changed_count:
+        write_clue_index()
+    logger.info(f"Sync completed: {changed_count} puzzles upserted, {touched_count} unchanged files re-stamped, {error_count} errors")
+    return changed_count
+
+def load_puzzles_from_json(puzzles_path=None, bulk=False, batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS,
+                           prerender=DEFAULT_PRERENDER):
+    """Load puzzles directly from JSON files into PostgreSQL"""
+    if bulk:
+        return bulk_load_puzzles_from_json(puzzles_path, batch_size=batch_size, workers=workers, prerender=prerender)
+    
+    logger.info("Starting direct JSON to PostgreSQL import...")
+    
+    puzzles_path = _resolve_puzzles_path(puzzles_path)
+    
+    with get_db_session() as session:
+        # First, clear existing data
+        logger.info("Clearing existing data...")
+        session.query(ImportManifest).delete()
+        session.query(Clue).delete()
+        session.query(Puzzle).delete()
+        session.commit()
+        
+        for file_path in iter_puzzle_files(puzzles_path):
+            try:
+                logger.info(f"Processing puzzle from {file_path}")
+                puzzle_row, clue_rows = parse_puzzle_file(file_path)
+                
+                # Create puzzle record
+                puzzle = Puzzle(**puzzle_row)
+                session.add(puzzle)
+                session.flush()  # Get puzzle ID
                 
-                for month_folder in sorted(os.listdir(year_path)):
-                    month_path = os.path.join(year_path, month_folder)
-                    
-                    if os.path.isdir(month_path):
-                        for filename in sorted(os.listdir(month_path)):
-                            if filename.endswith('.json'):
-                                file_path = os.path.join(month_path, filename)
-                                
-                                try:
-                                    with open(file_path, 'r', encoding='utf-8') as f:
-                                        puzzle_data = json.load(f)
-                                    
-                                    logger.info(f"Processing puzzle from {file_path}")
-                                    parsed_data = parse_puzzle_json(puzzle_data)
-                                    
-                                    # Create puzzle record
-                                    puzzle = Puzzle(
-                                        date_published=puzzle_data['date'],
-                                        author=puzzle_data['author'],
-                                        grid=json.dumps(parsed_data['grid'])
-                                    )
-                                    session.add(puzzle)
-                                    session.flush()  # Get puzzle ID
-                                    
-                                    # Add across clues
-                                    for idx, (clue_text, answer) in enumerate(zip(parsed_data['across_clues'], parsed_data['across_answers'])):
-                                        number = int(clue_text.split('.')[0])
-                                        text = clue_text.split('.', 1)[1].strip()
-                                        pos = parsed_data['clue_positions'].get(f"across-{number}")
-                                        
-                                        if pos:
-                                            row, col = pos
-                                            clue = Clue(
-                                                puzzle_id=puzzle.id,
-                                                number=number,
-                                                direction='across',
-                                                text=text,
-                                                answer=answer,
-                                                row=row,
-                                                column=col
-                                            )
-                                            session.add(clue)
-                                    
-                                    # Add down clues
-                                    for idx, (clue_text, answer) in enumerate(zip(parsed_data['down_clues'], parsed_data['down_answers'])):
-                                        number = int(clue_text.split('.')[0])
-                                        text = clue_text.split('.', 1)[1].strip()
-                                        pos = parsed_data['clue_positions'].get(f"down-{number}")
-                                        
-                                        if pos:
-                                            row, col = pos
-                                            clue = Clue(
-                                                puzzle_id=puzzle.id,
-                                                number=number,
-                                                direction='down',
-                                                text=text,
-                                                answer=answer,
-                                                row=row,
-                                                column=col
-                                            )
-                                            session.add(clue)
-                                    
-                                    session.commit()
-                                    logger.info(f"Successfully processed puzzle from {file_path}")
-                                    
-                                except Exception as e:
-                                    logger.error(f"Error processing {file_path}: {e}")
-                                    session.rollback()
-                                    continue
+                for row in clue_rows:
+                    session.add(Clue(puzzle_id=puzzle.id, **row))
+                if prerender:
+                    puzzle.body = _puzzle_body(puzzle.id, puzzle_row, clue_rows)
+                
+                session.commit()
+                logger.info(f"Successfully processed puzzle from {file_path}")
+                
+            except Exception as e:
+                logger.error(f"Error processing {file_path}: {e}")
+                session.rollback()
+                continue
+        
+        rebuild_stats(session)
+        bump_corpus_version(session)
+        session.commit()
     
+    write_clue_index()
     logger.info("Import completed successfully!")
 
+def compact_stored_grids(batch_size=DEFAULT_BATCH_SIZE):
+    """Convert puzzles still stored as JSON grids to the compact columns, in batches"""
+    converted = last_id = 0
+    
+    with get_db_session() as session:
+        while True:
+            rows = session.query(Puzzle.id, Puzzle.grid).filter(
+                Puzzle.grid_compact.is_(None),
+                Puzzle.grid.isnot(None),
+                Puzzle.id > last_id
+            ).order_by(Puzzle.id).limit(batch_size).all()
+            if not rows:
+                break
+            
+            updates = []
+            for puzzle_id, grid in rows:
+                cells = json.loads(grid)
+                if encode_grid(cells) is not None:
+                    # Legacy rows are square and did not keep gridnums, so number them from the grid
+                    size = int(round(len(cells) ** 0.5))
+                    gridnums = GridGeometry(cells, size, size).numbers.tolist()
+                    updates.append({
+                        'id': puzzle_id, 'rows': size, 'cols': size, 'body': None, **grid_columns(cells, gridnums)
+                    })
+            
+            if updates:
+                session.bulk_update_mappings(Puzzle, updates)
+                session.commit()
+            
+            converted += len(updates)
+            last_id = rows[-1].id
+            logger.info(f"Compacted {converted} grids")
+        
+        if converted:
+            bump_corpus_version(session)
+            session.commit()
+    
+    if converted:
+        write_clue_index()
+    logger.info(f"Grid compaction completed: {converted} puzzles converted")
+    return converted
+
+def render_stored_bodies(batch_size=DEFAULT_BATCH_SIZE):
+    """Pre-render the response body of every puzzle that does not have one, in batches"""
+    rendered = last_id = 0
+    
+    with get_db_session() as session:
+        while True:
+            puzzles = session.query(*serializers.PUZZLE_COLUMNS).filter(
+                Puzzle.body.is_(None),
+                Puzzle.id > last_id
+            ).order_by(Puzzle.id).limit(batch_size).all()
+            if not puzzles:
+                break
+            
+            clues = serializers.load_clues(session, [puzzle.id for puzzle in puzzles])
+            session.bulk_update_mappings(Puzzle, [
+                {'id': puzzle.id, 'body': serializers.render_puzzle_body(puzzle, clues[puzzle.id])}
+                for puzzle in puzzles
+            ])
+            session.commit()
+            
+            rendered += len(puzzles)
+            last_id = puzzles[-1].id
+            logger.info(f"Rendered {rendered} puzzle bodies")
+    
+    logger.info(f"Body rendering completed: {rendered} puzzles rendered")
+    return rendered
+
+def main():
+    parser = argparse.ArgumentParser(description="Import the NYT crossword archive")
+    parser.add_argument('--path', help="Archive directory (default: ./nyt_crosswords)")
+    parser.add_argument('--bulk', action='store_true', help="Parallel parse and batched COPY inserts")
+    parser.add_argument('--sync', action='store_true', help="Incrementally upsert new or changed files only")
+    parser.add_argument('--compact-grids', action='store_true', help="Convert stored JSON grids to the compact columns")
+    parser.add_argument('--render-bodies', action='store_true', help="Pre-render response bodies for puzzles without one")
+    parser.add_argument('--clue-index', action='store_true', help="Rebuild the similar-clues index (CLUE_INDEX_PATH)")
+    parser.add_argument('--prerender', action='store_true', default=DEFAULT_PRERENDER,
+                        help="Store each imported puzzle's rendered response body (also IMPORT_PRERENDER=1)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+    
+    if args.compact_grids:
+        compact_stored_grids(args.batch_size)
+        return
+    
+    if args.render_bodies:
+        render_stored_bodies(args.batch_size)
+        return
+    
+    if args.clue_index:
+        write_clue_index()
+        return
+    
+    if args.sync:
+        sync_puzzles_from_json(args.path, batch_size=args.batch_size, workers=args.workers, prerender=args.prerender)
+        return
+    
+    load_puzzles_from_json(
+        args.path, bulk=args.bulk, batch_size=args.batch_size, workers=args.workers, prerender=args.prerender
+    )
+
 if __name__ == "__main__":
-    load_puzzles_from_json()
\ No newline at end of file
+    main()
@@ -0,0 +1,79 @@
+import sys
+import argparse
+from datetime import date
+from grid_wit.config.database import get_db_session
+from grid_wit.models.puzzle import Puzzle
+from grid_wit.utils.grid_codec import GRID_FORMATS
+from grid_wit.utils.serializers import PUZZLE_COLUMNS, dumps, load_clues, puzzle_dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Puzzles fetched per round trip from the server-side cursor; clues are loaded per batch
+EXPORT_BATCH_SIZE = 500
+
+def parse_export_date(value):
+    """Validate an ISO date bound (YYYY-MM-DD), returning it as stored in date_published"""
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid date {value!r}, expected YYYY-MM-DD")
+
+def iter_export(session, start=None, end=None, grid_format='compact', batch_size=EXPORT_BATCH_SIZE):
+    """Yield puzzles published between start and end (inclusive) with their clues, oldest first.
+
+    Puzzles come from a server-side cursor and clues are fetched once per
+    batch of puzzles, so memory use does not grow with the corpus.
+    """
+    query = session.query(*PUZZLE_COLUMNS)
+    if start:
+        query = query.filter(Puzzle.date_published >= start)
+    if end:
+        query = query.filter(Puzzle.date_published <= end)
+
+    result = session.execute(
+        query.order_by(Puzzle.date_published, Puzzle.id).statement,
+        execution_options={'stream_results': True, 'yield_per': batch_size}
+    )
+
+    for batch in result.partitions():
+        clues = load_clues(session, [puzzle.id for puzzle in batch])
+        for puzzle in batch:
+            yield puzzle_dict(puzzle, clues[puzzle.id], grid_format)
+
+def iter_ndjson(start=None, end=None, grid_format='compact', batch_size=EXPORT_BATCH_SIZE):
+    """NDJSON lines (bytes) for iter_export, in a session held open for the whole stream"""
+    with get_db_session() as session:
+        for puzzle in iter_export(session, start, end, grid_format, batch_size):
+            yield dumps(puzzle) + b'\n'
+
+def main():
+    parser = argparse.ArgumentParser(description="Export puzzles with their clues as NDJSON")
+    parser.add_argument('--start', help="First publication date (YYYY-MM-DD)")
+    parser.add_argument('--end', help="Last publication date (YYYY-MM-DD)")
+    parser.add_argument('--grid-format', choices=GRID_FORMATS, default='compact')
+    parser.add_argument('--batch-size', type=int, default=EXPORT_BATCH_SIZE)
+    parser.add_argument('--output', help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    try:
+        start, end = parse_export_date(args.start), parse_export_date(args.end)
+    except ValueError as e:
+        parser.error(str(e))
+
+    out = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    count = 0
+    try:
+        for line in iter_ndjson(start, end, args.grid_format, args.batch_size):
+            out.write(line)
+            count += 1
+    finally:
+        if args.output:
+            out.close()
+    logger.info(f"Exported {count} puzzles")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
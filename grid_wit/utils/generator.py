@@ -0,0 +1,434 @@
+import os
+import time
+import random
+import string
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from grid_wit.config.database import get_db_session
+from grid_wit.models.puzzle import Puzzle
+from grid_wit.models.generation import GenerationJob
+from grid_wit.utils.answer_index import get_answer_index
+from grid_wit.utils.grid_geometry import GridGeometry, BLACK_SQUARE
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Fills run in a separate process pool so a search never holds a request
+# thread or the GIL of a web worker. Jobs are rows in generation_jobs, so
+# any web worker can report on a job started by another.
+GENERATOR_WORKERS = int(os.getenv('GENERATOR_WORKERS', 1))
+GENERATOR_MAX_PENDING = int(os.getenv('GENERATOR_MAX_PENDING', 32))
+DEFAULT_TIME_BUDGET = float(os.getenv('GENERATOR_DEFAULT_BUDGET', 10))
+MAX_TIME_BUDGET = float(os.getenv('GENERATOR_MAX_BUDGET', 60))
+
+# A running job this long past its time budget is reported as failed (its worker died)
+LOST_JOB_GRACE = float(os.getenv('GENERATOR_LOST_JOB_GRACE', 120))
+
+# Template cells: black squares, empty white cells, anything else is a prefilled letter
+TEMPLATE_BLACK = frozenset('.#')
+TEMPLATE_EMPTY = frozenset('?_ ')
+MIN_SIZE, MAX_SIZE = 3, 25
+
+# Seeds are stored in a 32-bit integer column
+MAX_SEED = 2 ** 31
+
+# Search tuning: candidates tried per slot are drawn from the CANDIDATE_WINDOW most
+# frequent remaining answers, and the node limit doubles with every restart
+CANDIDATE_WINDOW = 4
+FIRST_NODE_LIMIT = 200
+
+LETTERS = frozenset(string.ascii_uppercase)
+
+class FillTimeout(Exception):
+    """No fill was found within the time budget"""
+
+class _Restart(Exception):
+    pass
+
+def parse_template(template):
+    """Validate a template (a list of row strings) and return (cells, rows, cols).
+
+    cells is row-major with BLACK_SQUARE for black squares, None for empty
+    white cells and upper-case letters for prefilled cells. Raises ValueError.
+    """
+    if not isinstance(template, list) or not all(isinstance(row, str) for row in template):
+        raise ValueError("template must be a list of row strings")
+
+    rows = len(template)
+    cols = len(template[0]) if rows else 0
+    if not (MIN_SIZE <= rows <= MAX_SIZE and MIN_SIZE <= cols <= MAX_SIZE):
+        raise ValueError(f"template must be between {MIN_SIZE}x{MIN_SIZE} and {MAX_SIZE}x{MAX_SIZE}")
+    if any(len(row) != cols for row in template):
+        raise ValueError("template rows must all have the same length")
+
+    cells = []
+    for row in template:
+        for cell in row:
+            if cell in TEMPLATE_BLACK:
+                cells.append(BLACK_SQUARE)
+            elif cell in TEMPLATE_EMPTY:
+                cells.append(None)
+            elif cell.upper() in LETTERS:
+                cells.append(cell.upper())
+            else:
+                raise ValueError(f"Invalid template cell {cell!r}: use . or # for black, ? or _ for empty, or a letter")
+
+    geometry = GridGeometry(cells, rows, cols)
+    if ((geometry.across_number == 0) & (geometry.down_number == 0) & geometry.white.ravel()).any():
+        raise ValueError("Every white cell must be part of a word of at least two letters")
+    return cells, rows, cols
+
+def _fillable_masks(bucket, min_uses):
+    """A bucket's (position, letter) masks limited to plain A-Z answers used at least min_uses times,
+    and the mask of those answers"""
+    # Answers are sorted most frequent first, so the frequency cut is a prefix
+    count = next((i for i, uses in enumerate(bucket.frequencies) if uses < min_uses), len(bucket.frequencies))
+    fillable = (1 << count) - 1
+    for position in bucket.masks:
+        letters = 0
+        for letter, letter_mask in position.items():
+            if letter in LETTERS:
+                letters |= letter_mask
+        fillable &= letters
+
+    masks = [
+        {letter: letter_mask & fillable for letter, letter_mask in position.items() if letter in LETTERS and letter_mask & fillable}
+        for position in bucket.masks
+    ]
+    return masks, fillable
+
+class GridFiller:
+    """Fills a template's slots with answers by constraint propagation and randomized backtracking.
+
+    Each slot's domain is a bitset over its length bucket of the answer index.
+    Crossing constraints are kept arc-consistent with the bucket's per-position
+    letter masks, and a slot narrowed to one answer removes that answer from
+    every other slot of the same length. The search picks the slot with the
+    fewest candidates and tries the most frequent answers first, restarting
+    with a new random order when a node limit is hit.
+    """
+
+    def __init__(self, index, cells, rows, cols, min_uses=1, seed=None):
+        self.geometry = GridGeometry(cells, rows, cols)
+        self.rng = random.Random(seed)
+        self.nodes = 0
+        self.restarts = 0
+
+        # Slots in (direction, number) order: (direction, number, cells)
+        self.slots = []
+        for direction in ('across', 'down'):
+            slot_cells, slot_index = self.geometry.slot_cells(direction)
+            numbers = self.geometry.slots(direction)
+            grouped = [[] for _ in numbers]
+            for cell, slot in zip(slot_cells.tolist(), slot_index.tolist()):
+                grouped[slot].append(cell)
+            self.slots.extend((direction, number[0], group) for number, group in zip(numbers, grouped))
+
+        self.buckets = []
+        self.masks = []
+        self.initial = []
+        fillable = {}
+        for direction, number, slot_cells in self.slots:
+            length = len(slot_cells)
+            bucket = index.buckets.get(length)
+            if bucket is None:
+                raise ValueError(f"No answers of length {length} for {number} {direction}")
+            if length not in fillable:
+                fillable[length] = _fillable_masks(bucket, min_uses)
+            masks, mask = fillable[length]
+            pattern = ''.join(cells[cell] or '?' for cell in slot_cells)
+            self.buckets.append(bucket)
+            self.masks.append(masks)
+            self.initial.append(mask & bucket.match_mask(pattern))
+
+        # For each slot, the slots crossing it: (position here, other slot, position there)
+        cell_slots = {}
+        for slot, (_, _, slot_cells) in enumerate(self.slots):
+            for position, cell in enumerate(slot_cells):
+                cell_slots.setdefault(cell, []).append((slot, position))
+        self.crossings = [[] for _ in self.slots]
+        for covering in cell_slots.values():
+            for slot, position in covering:
+                self.crossings[slot].extend((position, other, other_position) for other, other_position in covering if other != slot)
+
+        # Slots that must not repeat each other's answers
+        self.same_length = [
+            [other for other in range(len(self.slots)) if other != slot and self.buckets[other] is self.buckets[slot]]
+            for slot in range(len(self.slots))
+        ]
+
+    def _propagate(self, domains, changed):
+        """Restore arc consistency after the domains of `changed` slots shrank; False on a wipe-out"""
+        queue = deque(changed)
+        queued = set(changed)
+        for slot in changed:
+            if domains[slot].bit_count() == 1 and not self._exclude(domains, slot, queue, queued):
+                return False
+
+        while queue:
+            slot = queue.popleft()
+            queued.discard(slot)
+            domain = domains[slot]
+            masks = self.masks[slot]
+
+            for position, other, other_position in self.crossings[slot]:
+                # Drop the crossing slot's answers whose letter here no longer appears in this slot's domain
+                allowed = {letter for letter, letter_mask in masks[position].items() if domain & letter_mask}
+                narrowed = domains[other]
+                for letter, letter_mask in self.masks[other][other_position].items():
+                    if letter not in allowed:
+                        dropped = narrowed & letter_mask
+                        if dropped:
+                            narrowed ^= dropped
+                if narrowed == domains[other]:
+                    continue
+                if not narrowed:
+                    return False
+                domains[other] = narrowed
+                if narrowed.bit_count() == 1 and not self._exclude(domains, other, queue, queued):
+                    return False
+                if other not in queued:
+                    queue.append(other)
+                    queued.add(other)
+        return True
+
+    def _exclude(self, domains, slot, queue, queued):
+        """Remove a decided slot's answer from the other slots of its length"""
+        keep = ~domains[slot]
+        for other in self.same_length[slot]:
+            narrowed = domains[other] & keep
+            if narrowed == domains[other]:
+                continue
+            if not narrowed:
+                return False
+            domains[other] = narrowed
+            if narrowed.bit_count() == 1 and not self._exclude(domains, other, queue, queued):
+                return False
+            if other not in queued:
+                queue.append(other)
+                queued.add(other)
+        return True
+
+    def _candidate(self, domain):
+        """One of the CANDIDATE_WINDOW most frequent answers left in a domain, as a single-bit mask"""
+        bits = []
+        while domain and len(bits) < CANDIDATE_WINDOW:
+            low = domain & -domain
+            bits.append(low)
+            domain ^= low
+        return bits[min(int(self.rng.expovariate(1.0)), len(bits) - 1)]
+
+    def _search(self, domains, deadline, node_limit):
+        """Depth-first search from arc-consistent domains; returns the solved domains or None"""
+        self.nodes += 1
+        if self.nodes > node_limit:
+            raise _Restart()
+        if time.monotonic() > deadline:
+            raise FillTimeout()
+
+        best, best_count = None, None
+        for slot, domain in enumerate(domains):
+            count = domain.bit_count()
+            if count > 1 and (best is None or count < best_count):
+                best, best_count = slot, count
+        if best is None:
+            return domains
+
+        domains = list(domains)
+        while domains[best]:
+            choice = self._candidate(domains[best])
+            trial = list(domains)
+            trial[best] = choice
+            if self._propagate(trial, [best]):
+                solved = self._search(trial, deadline, node_limit)
+                if solved is not None:
+                    return solved
+            domains[best] &= ~choice
+            if not domains[best] or not self._propagate(domains, [best]):
+                return None
+        return None
+
+    def fill(self, time_budget):
+        """Position of each slot's answer in its bucket, in slot order; raises FillTimeout or ValueError"""
+        deadline = time.monotonic() + time_budget
+        domains = list(self.initial)
+        if not all(domains) or not self._propagate(domains, list(range(len(domains)))):
+            raise ValueError("The template has no fill from the answer corpus")
+
+        node_limit = FIRST_NODE_LIMIT
+        while True:
+            try:
+                solved = self._search(domains, deadline, self.nodes + node_limit)
+                break
+            except _Restart:
+                self.restarts += 1
+                node_limit *= 2
+        if solved is None:
+            raise ValueError("The template has no fill from the answer corpus")
+
+        return [domain.bit_length() - 1 for domain in solved]
+
+def generate_puzzle(template, time_budget=DEFAULT_TIME_BUDGET, seed=None, min_uses=1):
+    """Fill a template from the historical answers and clue every slot with a past clue for its answer"""
+    cells, rows, cols = parse_template(template)
+    index = get_answer_index()
+    started = time.monotonic()
+
+    filler = GridFiller(index, cells, rows, cols, min_uses=min_uses, seed=seed)
+    choices = filler.fill(time_budget)
+
+    grid = list(cells)
+    clues = []
+    for (direction, number, slot_cells), choice, bucket in zip(filler.slots, choices, filler.buckets):
+        answer = bucket.answers[choice]
+        for cell, letter in zip(slot_cells, answer):
+            grid[cell] = letter
+        examples = bucket.examples[choice] or [{"text": None, "puzzle_id": None}]
+        source = filler.rng.choice(examples)
+        row, column = divmod(slot_cells[0], cols)
+        clues.append({
+            "number": number,
+            "direction": direction,
+            "text": source['text'],
+            "answer": answer,
+            "row": row,
+            "column": column,
+            "source_puzzle_id": source['puzzle_id']
+        })
+
+    with get_db_session() as session:
+        dates = dict(session.query(Puzzle.id, Puzzle.date_published).filter(
+            Puzzle.id.in_({clue['source_puzzle_id'] for clue in clues})
+        ).all())
+    for clue in clues:
+        clue['source_date'] = dates.get(clue['source_puzzle_id'])
+
+    return {
+        "rows": rows,
+        "cols": cols,
+        "grid": grid,
+        "gridnums": filler.geometry.numbers.tolist(),
+        "clues": clues,
+        "corpus_version": index.version,
+        "stats": {
+            "nodes": filler.nodes,
+            "restarts": filler.restarts,
+            "seconds": round(time.monotonic() - started, 3)
+        }
+    }
+
+def _update_job(job_id, **fields):
+    with get_db_session() as session:
+        session.query(GenerationJob).filter(GenerationJob.id == job_id).update(fields)
+
+def run_generation_job(job_id, min_uses=1):
+    """Run a queued job in a pool process, recording its result or error on the job row"""
+    with get_db_session() as session:
+        job = session.get(GenerationJob, job_id)
+        if job is None:
+            logger.warning(f"Generation job {job_id} no longer exists")
+            return
+        template, time_budget, seed = job.template, job.time_budget, job.seed
+
+    _update_job(job_id, status='running', started_at=datetime.now(timezone.utc))
+    try:
+        result = generate_puzzle(template, time_budget, seed, min_uses)
+    except FillTimeout:
+        _update_job(job_id, status='failed', error=f"No fill found within {time_budget:g} seconds",
+                    finished_at=datetime.now(timezone.utc))
+    except Exception as e:
+        logger.error(f"Generation job {job_id} failed: {e}")
+        _update_job(job_id, status='failed', error=str(e), finished_at=datetime.now(timezone.utc))
+    else:
+        logger.info(f"Generation job {job_id} filled in {result['stats']['seconds']}s ({result['stats']['nodes']} nodes)")
+        _update_job(job_id, status='done', result=result, finished_at=datetime.now(timezone.utc))
+
+def _warm_worker():
+    # Build the answer index when a pool process starts rather than inside the first job's budget
+    try:
+        get_answer_index()
+    except Exception as e:
+        logger.warning(f"Could not build the answer index in a generator worker: {e}")
+
+_executor = None
+_pending = set()
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=GENERATOR_WORKERS, initializer=_warm_worker)
+    return _executor
+
+def submit_generation(template, time_budget=DEFAULT_TIME_BUDGET, seed=None, min_uses=1):
+    """Validate a template, record a queued job and hand it to the pool; returns the job ID.
+
+    Raises ValueError for invalid input and RuntimeError when too many jobs are pending.
+    """
+    global _executor
+    parse_template(template)
+    time_budget = float(time_budget)
+    if not 0 < time_budget <= MAX_TIME_BUDGET:
+        raise ValueError(f"time_budget must be between 0 and {MAX_TIME_BUDGET:g} seconds")
+    seed = random.randrange(MAX_SEED) if seed is None else int(seed)
+    if not 0 <= seed < MAX_SEED:
+        raise ValueError(f"seed must be between 0 and {MAX_SEED - 1}")
+
+    with _executor_lock:
+        _pending.difference_update([future for future in _pending if future.done()])
+        if len(_pending) >= GENERATOR_MAX_PENDING:
+            raise RuntimeError("Too many generation jobs in progress, try again later")
+
+        job_id = os.urandom(16).hex()
+        with get_db_session() as session:
+            session.add(GenerationJob(id=job_id, status='queued', template=template, time_budget=time_budget, seed=seed))
+
+        try:
+            future = _get_executor().submit(run_generation_job, job_id, min_uses)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool
+            logger.warning("Generator pool is broken, restarting it")
+            _executor = None
+            future = _get_executor().submit(run_generation_job, job_id, min_uses)
+        _pending.add(future)
+    return job_id
+
+def _as_utc(value):
+    # SQLite returns naive timestamps, which are UTC here
+    return value.replace(tzinfo=timezone.utc) if value is not None and value.tzinfo is None else value
+
+def get_generation_job(session, job_id):
+    """Response dict for a job, or None if it does not exist"""
+    job = session.get(GenerationJob, job_id)
+    if job is None:
+        return None
+
+    status, error = job.status, job.error
+    started_at = _as_utc(job.started_at)
+    if status == 'running' and started_at is not None:
+        if (datetime.now(timezone.utc) - started_at).total_seconds() > job.time_budget + LOST_JOB_GRACE:
+            status, error = 'failed', "Generation worker stopped before finishing the job"
+
+    return {
+        "job_id": job.id,
+        "status": status,
+        "time_budget": job.time_budget,
+        "seed": job.seed,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": started_at.isoformat() if started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "error": error,
+        "result": job.result
+    }
+
+def _reset_after_fork():
+    # Pool processes and pending futures belong to the parent
+    global _executor, _pending, _executor_lock
+    _executor = None
+    _pending = set()
+    _executor_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
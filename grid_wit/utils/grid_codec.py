@@ -0,0 +1,66 @@
+import json
+import sys
+from array import array
+
+# Grids are stored as one character per cell with '.' for black squares, and
+# gridnums as little-endian uint16 per cell. Rebus grids (multi-letter cells)
+# cannot be stored compactly and keep the legacy JSON column instead.
+BLACK_SQUARE = '.'
+GRID_FORMATS = ('legacy', 'array', 'compact')
+
+def encode_grid(cells):
+    """Compact string for a list of cells, or None if any cell holds more than one character"""
+    if any(len(cell) != 1 for cell in cells):
+        return None
+    return ''.join(cells)
+
+def decode_grid(compact):
+    return list(compact)
+
+def pack_gridnums(gridnums):
+    packed = array('H', gridnums)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed.tobytes()
+
+def unpack_gridnums(data):
+    unpacked = array('H')
+    unpacked.frombytes(data)
+    if sys.byteorder == 'big':
+        unpacked.byteswap()
+    return unpacked.tolist()
+
+def grid_columns(cells, gridnums):
+    """Storage columns for a grid: compact form where possible, legacy JSON otherwise"""
+    compact = encode_grid(cells)
+    return {
+        'grid': None if compact is not None else json.dumps(cells),
+        'grid_compact': compact,
+        'gridnums': pack_gridnums(gridnums) if gridnums else None
+    }
+
+def grid_fields(grid, grid_compact, gridnums, grid_format='legacy', rows=None, cols=None):
+    """Response fields for a stored grid.
+
+    legacy: `grid` as a JSON-encoded string of the cell list (the original format)
+    array: `grid` as a list of cells, plus `gridnums`
+    compact: `grid` as one character per cell, plus `gridnums`
+    """
+    if grid_format == 'legacy':
+        return {
+            "rows": rows,
+            "cols": cols,
+            "grid": grid if grid_compact is None else json.dumps(decode_grid(grid_compact))
+        }
+    
+    if grid_format == 'compact' and grid_compact is not None:
+        cells = grid_compact
+    else:
+        cells = decode_grid(grid_compact) if grid_compact is not None else json.loads(grid)
+    
+    return {
+        "rows": rows,
+        "cols": cols,
+        "grid": cells,
+        "gridnums": unpack_gridnums(gridnums) if gridnums is not None else None
+    }
@@ -0,0 +1,93 @@
+import numpy as np
+
+BLACK_SQUARE = '.'
+
+def grid_dimensions(puzzle_data):
+    """(rows, cols) from a source puzzle's size, falling back to a square grid"""
+    size = puzzle_data.get('size') or {}
+    cells = len(puzzle_data['grid'])
+    rows = size.get('rows') or int(round(cells ** 0.5))
+    cols = size.get('cols') or cells // rows
+    if rows * cols != cells:
+        raise ValueError(f"Grid has {cells} cells, expected {rows}x{cols}")
+    return rows, cols
+
+def _runs(white):
+    """Label horizontal runs of white cells: (run start mask, run id per cell or -1, run lengths)"""
+    left = np.zeros_like(white)
+    left[:, 1:] = white[:, :-1]
+    run_start = white & ~left
+
+    run_id = np.cumsum(run_start.ravel()).reshape(white.shape) - 1
+    run_id = np.where(white, run_id, -1)
+    lengths = np.bincount(run_id[white], minlength=max(int(run_start.sum()), 1))
+    return run_start, run_id, lengths
+
+class GridGeometry:
+    """Word slots, numbering and cell-to-slot mapping for a rectangular grid.
+
+    Everything is derived from the black-square mask in a handful of array
+    operations, so any size works (15x15 dailies, 21x21 Sundays, variety grids).
+    Cell indices are row-major: index = row * cols + column.
+    """
+
+    def __init__(self, cells, rows, cols):
+        if len(cells) != rows * cols:
+            raise ValueError(f"Grid has {len(cells)} cells, expected {rows}x{cols}")
+
+        self.rows = rows
+        self.cols = cols
+        white = np.fromiter((cell != BLACK_SQUARE for cell in cells), dtype=bool, count=len(cells))
+        self.white = white.reshape(rows, cols)
+
+        across_start, across_run, across_len = _runs(self.white)
+        down_start_t, down_run_t, down_len = _runs(self.white.T)
+        down_start, down_run = down_start_t.T, down_run_t.T
+
+        # A run is a slot when it is at least two cells long
+        across_slot_start = across_start & (across_len[np.maximum(across_run, 0)] >= 2)
+        down_slot_start = down_start & (down_len[np.maximum(down_run, 0)] >= 2)
+
+        numbered = (across_slot_start | down_slot_start).ravel()
+        numbers = np.zeros(rows * cols, dtype=np.int32)
+        numbers[numbered] = np.arange(1, int(numbered.sum()) + 1)
+        self.numbers = numbers
+
+        self.across = self._slots(across_slot_start, across_run, across_len, step=1)
+        self.down = self._slots(down_slot_start, down_run, down_len, step=cols)
+
+        # Number of the across/down slot covering each cell, 0 where there is none
+        self.across_number = self._cell_numbers(across_slot_start, across_run)
+        self.down_number = self._cell_numbers(down_slot_start, down_run)
+
+    def _slots(self, slot_start, run_id, lengths, step):
+        starts = np.flatnonzero(slot_start.ravel())
+        return {
+            'start': starts,
+            'number': self.numbers[starts],
+            'length': lengths[run_id.ravel()[starts]],
+            'step': step
+        }
+
+    def _cell_numbers(self, slot_start, run_id):
+        flat_run = run_id.ravel()
+        run_number = np.zeros(int(flat_run.max()) + 2, dtype=np.int32)
+        starts = np.flatnonzero(slot_start.ravel())
+        run_number[flat_run[starts]] = self.numbers[starts]
+        return np.where(flat_run >= 0, run_number[flat_run], 0)
+
+    def slots(self, direction):
+        """Slots as (number, row, column, length) tuples in number order"""
+        slots = self.across if direction == 'across' else self.down
+        rows, cols = np.divmod(slots['start'], self.cols)
+        return list(zip(
+            slots['number'].tolist(), rows.tolist(), cols.tolist(), slots['length'].tolist()
+        ))
+
+    def slot_cells(self, direction):
+        """Flat cell indices for every slot, concatenated, with the slot index of each cell"""
+        slots = self.across if direction == 'across' else self.down
+        lengths = slots['length']
+        slot_index = np.repeat(np.arange(len(lengths)), lengths)
+        offsets = np.arange(int(lengths.sum())) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return slots['start'][slot_index] + offsets * slots['step'], slot_index
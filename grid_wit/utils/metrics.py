@@ -0,0 +1,121 @@
+import bisect
+import threading
+
+# Latency buckets in seconds, shared by the request, query and pool histograms
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class _Metric:
+    """A named metric holding one series per combination of label values"""
+    type = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._series = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._series.get(self._key(labels), 0)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._series)
+
+class Gauge(_Metric):
+    """A value read from a callback at collection time"""
+    type = 'gauge'
+
+    def __init__(self, name, help, callback, labels=()):
+        super().__init__(name, help, labels)
+        self.callback = callback  # Returns {label values tuple: value}
+
+    def snapshot(self):
+        return self.callback()
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            series['counts'][bisect.bisect_left(self.buckets, value)] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def snapshot(self):
+        """{labels: {'buckets': [(upper bound, cumulative count)], 'sum': ..., 'count': ...}}"""
+        with self._lock:
+            result = {}
+            for key, series in self._series.items():
+                cumulative = 0
+                buckets = []
+                for bound, count in zip(self.buckets + (float('inf'),), series['counts']):
+                    cumulative += count
+                    buckets.append((bound, cumulative))
+                result[key] = {'buckets': buckets, 'sum': series['sum'], 'count': series['count']}
+            return result
+
+REGISTRY = []
+
+def histogram_summary(snapshot):
+    """JSON-friendly view of one histogram series"""
+    return {
+        'count': snapshot['count'],
+        'sum_seconds': round(snapshot['sum'], 6),
+        'buckets': [
+            {'le': '+Inf' if bound == float('inf') else bound, 'count': count}
+            for bound, count in snapshot['buckets']
+        ]
+    }
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render_prometheus(registry=None):
+    """Every registered metric in the Prometheus text exposition format"""
+    lines = []
+    for metric in registry or REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for key, value in sorted(metric.snapshot().items()):
+            if metric.type == 'histogram':
+                for bound, count in value['buckets']:
+                    labels = _format_labels(metric.label_names, key, [('le', _format_value(bound))])
+                    lines.append(f"{metric.name}_bucket{labels} {count}")
+                labels = _format_labels(metric.label_names, key)
+                lines.append(f"{metric.name}_sum{labels} {_format_value(value['sum'])}")
+                lines.append(f"{metric.name}_count{labels} {value['count']}")
+            else:
+                lines.append(f"{metric.name}{_format_labels(metric.label_names, key)} {_format_value(value)}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,210 @@
+import threading
+from sqlalchemy import func, literal, null
+from grid_wit.config.database import dialect_insert
+from grid_wit.models.puzzle import Puzzle
+from grid_wit.models.user import SavedPuzzle, utc_now
+from grid_wit.utils.corpus import get_corpus_version
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Progress is stored as one character per cell, row-major, with a space for an
+# empty cell. Rebus entries (more than one letter in a cell) cannot be encoded
+# that way and are kept in the legacy `progress` JSON column instead.
+EMPTY_CELL = ' '
+
+# Deltas up to this many cells are spliced in SQL; larger ones (e.g. many
+# coalesced autosaves) rewrite the locked row instead of nesting substr() calls
+MAX_SPLICED_CELLS = 32
+
+# Rebus progress lives in the JSON column, which cell deltas cannot update
+REBUS_PATCH_ERROR = "saved progress cannot take cell updates; send a full progress update"
+
+_shape_lock = threading.Lock()
+_shapes = {}
+_shapes_version = None
+
+def get_puzzle_shape(session, puzzle_id):
+    """(rows, cols) of a puzzle, cached per process until the corpus changes; None if it does not exist"""
+    global _shapes, _shapes_version
+
+    version = get_corpus_version()
+    if _shapes_version != version:
+        with _shape_lock:
+            _shapes, _shapes_version = {}, version
+
+    shape = _shapes.get(puzzle_id)
+    if shape is None:
+        # Misses are not cached, so requests for made-up IDs cannot grow the cache
+        shape = session.query(Puzzle.rows, Puzzle.cols).filter(Puzzle.id == puzzle_id).one_or_none()
+        if shape is None:
+            return None
+        shape = _shapes[puzzle_id] = tuple(shape)
+    return shape
+
+def _cell_value(value):
+    """Normalize one cell entry to a single character, or None when it is a rebus; raises ValueError for non-strings"""
+    if value is None:
+        return EMPTY_CELL
+    if not isinstance(value, str):
+        raise ValueError("cell values must be strings")
+    value = value.strip().upper()
+    if not value:
+        return EMPTY_CELL
+    if len(value) > 1:
+        return None
+    return value
+
+def encode_cells(progress, rows, cols):
+    """Encode a rows x cols list of cell entries, or None if it contains rebus entries"""
+    if len(progress) != rows or any(len(row) != cols for row in progress):
+        raise ValueError(f"progress must be a {rows}x{cols} grid")
+
+    cells = [_cell_value(value) for row in progress for value in row]
+    if None in cells:
+        return None
+    return ''.join(cells)
+
+def decode_cells(cells, cols):
+    """Cell string back to the rows of entries clients send, with '' for empty cells"""
+    if not isinstance(cells, str):
+        raise ValueError("cells must be a string")
+    return [
+        [value.strip() for value in cells[start:start + cols]]
+        for start in range(0, len(cells), cols)
+    ]
+
+def parse_cell_deltas(deltas, rows, cols):
+    """Validate [{row, col, value}] deltas into sorted (index, character) pairs, later entries winning"""
+    if not isinstance(deltas, list) or not deltas:
+        raise ValueError("cells must be a non-empty list of {row, col, value}")
+
+    changes = {}
+    for delta in deltas:
+        try:
+            row, col = int(delta['row']), int(delta['col'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("each cell needs integer row and col")
+        if not (0 <= row < rows and 0 <= col < cols):
+            raise ValueError(f"cell ({row}, {col}) is outside the {rows}x{cols} grid")
+
+        value = _cell_value(delta.get('value'))
+        if value is None:
+            raise ValueError("rebus entries must be saved with a full progress update")
+        changes[row * cols + col] = value
+
+    return sorted(changes.items())
+
+def apply_cell_deltas(cells, changes):
+    """Apply (index, character) pairs to a cell string"""
+    cells = list(cells)
+    for index, value in changes:
+        cells[index] = value
+    return ''.join(cells)
+
+def _spliced(column, changes):
+    """SQL expression for `column` with each (index, character) replaced, built from one substr per gap"""
+    parts = []
+    position = 1  # substr() is 1-based
+    for index, value in changes:
+        if index + 1 > position:
+            parts.append(func.substr(column, position, index + 1 - position))
+        parts.append(literal(value))
+        position = index + 2
+    parts.append(func.substr(column, position))
+
+    expression = parts[0]
+    for part in parts[1:]:
+        expression = expression.op('||')(part)
+    return expression
+
+def save_progress(session, user_id, puzzle_id, cells=None, progress=None, completed=None):
+    """Insert or replace a user's progress in one statement; returns (completed, last_played)"""
+    now = utc_now()
+    stmt = dialect_insert(session)(SavedPuzzle).values(
+        user_id=user_id,
+        puzzle_id=puzzle_id,
+        cells=cells,
+        progress=null() if cells is not None else progress,
+        completed=bool(completed),
+        last_played=now
+    )
+    updates = {
+        'cells': stmt.excluded.cells,
+        'progress': stmt.excluded.progress,
+        'last_played': now
+    }
+    if completed is not None:
+        updates['completed'] = stmt.excluded.completed
+
+    return session.execute(stmt.on_conflict_do_update(
+        index_elements=[SavedPuzzle.user_id, SavedPuzzle.puzzle_id],
+        set_=updates
+    ).returning(SavedPuzzle.completed, SavedPuzzle.last_played)).one()
+
+def patch_progress(session, user_id, puzzle_id, changes, size, completed=None):
+    """Set individual cells in one upsert; returns (completed, last_played).
+
+    The stored string is spliced in SQL, so an autosave only sends the changed
+    cells and never reads the row first. Large deltas and rows still holding
+    legacy JSON progress take a read-modify-write instead.
+    """
+    if len(changes) > MAX_SPLICED_CELLS:
+        return _rewrite_progress(session, user_id, puzzle_id, changes, size, completed)
+    
+    now = utc_now()
+    stmt = dialect_insert(session)(SavedPuzzle).values(
+        user_id=user_id,
+        puzzle_id=puzzle_id,
+        cells=apply_cell_deltas(EMPTY_CELL * size, changes),
+        completed=bool(completed),
+        last_played=now
+    )
+    updates = {
+        'cells': _spliced(SavedPuzzle.cells, changes),
+        'last_played': now
+    }
+    if completed is not None:
+        updates['completed'] = stmt.excluded.completed
+
+    row = session.execute(stmt.on_conflict_do_update(
+        index_elements=[SavedPuzzle.user_id, SavedPuzzle.puzzle_id],
+        set_=updates,
+        where=SavedPuzzle.cells.isnot(None)
+    ).returning(SavedPuzzle.completed, SavedPuzzle.last_played)).one_or_none()
+    if row is not None:
+        return row
+
+    return _rewrite_progress(session, user_id, puzzle_id, changes, size, completed)
+
+def _rewrite_progress(session, user_id, puzzle_id, changes, size, completed):
+    saved = session.query(SavedPuzzle.cells, SavedPuzzle.progress).filter(
+        SavedPuzzle.user_id == user_id,
+        SavedPuzzle.puzzle_id == puzzle_id
+    ).with_for_update().one_or_none()
+
+    if saved is None or saved.cells is not None:
+        cells = saved.cells if saved is not None else EMPTY_CELL * size
+    else:
+        progress = saved.progress if isinstance(saved.progress, list) else []
+        flat = [value for row in progress if isinstance(row, list) for value in row]
+        values = [_cell_value(value) if value is None or isinstance(value, str) else None for value in flat]
+        if len(values) != size or None in values:
+            # Rebus or malformed legacy progress: keep it as JSON and fail the delta
+            raise ValueError(REBUS_PATCH_ERROR)
+        cells = ''.join(values)
+
+    return save_progress(session, user_id, puzzle_id, apply_cell_deltas(cells, changes), None, completed)
+
+def progress_from_request(data, rows, cols):
+    """(cells, legacy progress) from a full-save body holding either `cells` or a `progress` grid"""
+    if 'cells' in data:
+        cells = data['cells']
+        if not isinstance(cells, str) or len(cells) != rows * cols:
+            raise ValueError(f"cells must be a string of {rows * cols} characters")
+        return cells.upper(), None
+
+    progress = data['progress']
+    if not isinstance(progress, list) or not all(isinstance(row, list) for row in progress):
+        raise ValueError("progress must be a list of rows")
+    return encode_cells(progress, rows, cols), progress
@@ -0,0 +1,235 @@
+import os
+import atexit
+import threading
+from sqlalchemy.exc import IntegrityError
+from grid_wit.config.database import get_db_session
+from grid_wit.utils.progress import REBUS_PATCH_ERROR, apply_cell_deltas, save_progress, patch_progress
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Write-behind mode for autosaves. Off by default: every save commits before
+# the response. Buffered writes are per worker process, so read-your-writes
+# holds for requests served by the same worker.
+PROGRESS_WRITE_BEHIND = os.getenv('PROGRESS_WRITE_BEHIND', '').lower() in ('1', 'true', 'yes')
+PROGRESS_FLUSH_INTERVAL = float(os.getenv('PROGRESS_FLUSH_INTERVAL', 1.0))
+PROGRESS_FLUSH_SIZE = int(os.getenv('PROGRESS_FLUSH_SIZE', 500))
+
+class _PendingProgress:
+    """Coalesced writes for one (user_id, puzzle_id): an optional full save followed by cell changes"""
+    __slots__ = ('full', 'changes', 'size', 'completed')
+
+    def __init__(self):
+        self.full = None  # (cells, progress) of the latest full save
+        self.changes = {}  # index -> character, applied after `full`
+        self.size = None
+        self.completed = None
+
+    def add_full(self, cells, progress, completed):
+        self.full = (cells, progress)
+        self.changes = {}
+        if completed is not None:
+            self.completed = completed
+
+    def add_changes(self, changes, size, completed):
+        if self.full is not None and self.full[0] is not None:
+            # Fold the changes into the pending cells so one upsert writes both
+            self.full = (apply_cell_deltas(self.full[0], changes), None)
+        else:
+            self.changes.update(changes)
+            self.size = size
+        if completed is not None:
+            self.completed = completed
+
+    def accepts(self, newer):
+        """False when newer holds cell changes and this entry's full save is a rebus, which cannot take them"""
+        rebus = self.full is not None and self.full[0] is None
+        return not (rebus and newer.full is None and newer.changes)
+
+    def merge(self, newer):
+        """Combine with a newer entry for the same key (the newer one wins)"""
+        if newer.full is not None:
+            self.add_full(*newer.full, newer.completed)
+        elif newer.completed is not None:
+            self.completed = newer.completed
+        if newer.changes:
+            self.add_changes(sorted(newer.changes.items()), newer.size, None)
+
+    def write(self, session, user_id, puzzle_id):
+        """Write this entry with the single-statement upserts; returns (completed, last_played)"""
+        result = None
+        if self.full is not None:
+            result = save_progress(
+                session, user_id, puzzle_id, *self.full, None if self.changes else self.completed
+            )
+        if self.changes:
+            result = patch_progress(
+                session, user_id, puzzle_id, sorted(self.changes.items()), self.size, self.completed
+            )
+        return result
+
+class ProgressWriteBuffer:
+    """Coalesces progress writes in memory (last write wins per user and puzzle) and flushes them in batches.
+
+    A background thread flushes every `interval` seconds, or sooner once
+    `max_pending` keys are waiting. Completions write through immediately.
+    """
+
+    def __init__(self, interval=PROGRESS_FLUSH_INTERVAL, max_pending=PROGRESS_FLUSH_SIZE):
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._thread_pid = None
+        self._closed = False
+        self._pid = os.getpid()
+
+    def _add(self, session, user_id, puzzle_id, entry):
+        """Queue an entry, or write it through with any pending state when it completes the puzzle"""
+        key = (user_id, puzzle_id)
+        if entry.completed or self._closed:
+            # Wait out a running flush, which may hold older cells for this key
+            # that it would otherwise commit over the write-through
+            with self._flush_lock:
+                with self._lock:
+                    pending = self._pending.get(key)
+                    if pending is not None:
+                        self._check_accepts(pending, entry)
+                        del self._pending[key]
+                if pending is not None:
+                    pending.merge(entry)
+                    entry = pending
+                return entry.write(session, user_id, puzzle_id)
+
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is None:
+                self._pending[key] = entry
+            else:
+                self._check_accepts(pending, entry)
+                pending.merge(entry)
+            count = len(self._pending)
+
+        self._ensure_thread()
+        if count >= self.max_pending:
+            self._wakeup.set()
+        return None
+
+    @staticmethod
+    def _check_accepts(pending, entry):
+        # Reject the write now (a 400, as without buffering) rather than fail the whole entry at flush
+        if not pending.accepts(entry):
+            raise ValueError(REBUS_PATCH_ERROR)
+
+    def save(self, session, user_id, puzzle_id, cells=None, progress=None, completed=None):
+        """Buffer a full save; returns (completed, last_played) when it was written through, else None"""
+        entry = _PendingProgress()
+        entry.add_full(cells, progress, completed)
+        return self._add(session, user_id, puzzle_id, entry)
+
+    def patch(self, session, user_id, puzzle_id, changes, size, completed=None):
+        """Buffer cell changes; returns (completed, last_played) when written through, else None.
+
+        Raises ValueError when a rebus full save for the puzzle is still pending.
+        """
+        entry = _PendingProgress()
+        entry.add_changes(changes, size, completed)
+        return self._add(session, user_id, puzzle_id, entry)
+
+    def pending_count(self):
+        return len(self._pending)
+
+    def flush(self, user_id=None):
+        """Write pending entries (only this user's when user_id is given) in one transaction"""
+        with self._flush_lock:
+            with self._lock:
+                if user_id is None:
+                    batch, self._pending = self._pending, {}
+                else:
+                    batch = {key: self._pending.pop(key) for key in list(self._pending) if key[0] == user_id}
+            if not batch:
+                return 0
+
+            try:
+                with get_db_session() as session:
+                    for (entry_user, entry_puzzle), entry in batch.items():
+                        try:
+                            with session.begin_nested():
+                                entry.write(session, entry_user, entry_puzzle)
+                        except (IntegrityError, ValueError) as e:
+                            # Retrying cannot fix a missing user or an unpatchable row
+                            logger.error(f"Dropping buffered progress for user {entry_user} puzzle {entry_puzzle}: {e}")
+            except Exception as e:
+                logger.error(f"Error flushing {len(batch)} buffered progress writes, will retry: {e}")
+                self._requeue(batch)
+                raise
+            return len(batch)
+
+    def _requeue(self, batch):
+        with self._lock:
+            for key, entry in batch.items():
+                newer = self._pending.get(key)
+                if newer is not None:
+                    entry.merge(newer)
+                self._pending[key] = entry
+
+    def _ensure_thread(self):
+        if self._thread_pid == os.getpid() or self._closed:
+            return
+        with self._lock:
+            if self._thread_pid != os.getpid():
+                self._thread = threading.Thread(target=self._run, name='progress-flush', daemon=True)
+                self._thread_pid = os.getpid()
+                self._thread.start()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                pass  # Logged by flush; the entries are back in the buffer
+
+    def close(self):
+        """Stop the flush thread and write everything still pending"""
+        if self._pid != os.getpid():
+            return  # A forked copy; the process that buffered these writes flushes them
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None and self._thread_pid == os.getpid():
+            self._thread.join(timeout=self.interval + 5)
+        try:
+            self.flush()
+        except Exception:
+            logger.error(f"{self.pending_count()} buffered progress writes were lost at shutdown")
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+def get_progress_buffer():
+    """The process-wide write-behind buffer, or None when PROGRESS_WRITE_BEHIND is off"""
+    global _buffer
+    if not PROGRESS_WRITE_BEHIND:
+        return None
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = ProgressWriteBuffer()
+                atexit.register(_buffer.close)
+    return _buffer
+
+def flush_progress_buffer():
+    """Durably write all buffered progress, e.g. from a worker shutdown hook"""
+    if _buffer is not None:
+        _buffer.close()
+
+def _reset_after_fork():
+    # A forked child starts with an empty buffer; the parent still owns its pending writes
+    global _buffer
+    _buffer = None
+
+os.register_at_fork(after_in_child=_reset_after_fork)
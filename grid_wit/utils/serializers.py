@@ -0,0 +1,94 @@
+import json
+from itertools import groupby
+from flask import Response
+from grid_wit.models.puzzle import Puzzle, Clue
+from grid_wit.utils.grid_codec import grid_fields
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson  # Optional dependency: several times faster than json and encodes straight to bytes
+except ImportError:
+    orjson = None
+
+# Puzzle and clue responses are built from plain column tuples rather than
+# hydrated ORM objects. PUZZLE_COLUMNS matches the column order of the
+# importer's puzzle rows.
+PUZZLE_COLUMNS = (
+    Puzzle.id, Puzzle.date_published, Puzzle.author, Puzzle.rows, Puzzle.cols,
+    Puzzle.grid, Puzzle.grid_compact, Puzzle.gridnums
+)
+CLUE_FIELDS = ('number', 'direction', 'text', 'answer', 'row', 'column')
+CLUE_COLUMNS = tuple(getattr(Clue, field) for field in CLUE_FIELDS)
+
+# Search results leave out clue positions
+SEARCH_CLUE_FIELDS = CLUE_FIELDS[:4]
+SEARCH_CLUE_COLUMNS = CLUE_COLUMNS[:4]
+
+# grid_format of the bodies pre-rendered at import: the API default
+BODY_GRID_FORMAT = 'legacy'
+
+def dumps(obj):
+    """Encode obj as compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode()
+
+def json_response(body, status=200):
+    """JSON response for a dict or an already encoded body"""
+    if not isinstance(body, bytes):
+        body = dumps(body)
+    return Response(body, status=status, mimetype='application/json')
+
+def puzzle_dict(puzzle, clues, grid_format='legacy', clue_fields=CLUE_FIELDS):
+    """Response dict for a PUZZLE_COLUMNS tuple and its clue tuples (in clue_fields order)"""
+    puzzle_id, date_published, author, rows, cols, grid, grid_compact, gridnums = puzzle
+    return {
+        "id": puzzle_id,
+        "date_published": date_published,
+        "author": author,
+        **grid_fields(grid, grid_compact, gridnums, grid_format, rows, cols),
+        "clues": [dict(zip(clue_fields, clue)) for clue in clues]
+    }
+
+def render_puzzle_body(puzzle, clues):
+    """Pre-rendered response body in BODY_GRID_FORMAT, as stored in Puzzle.body"""
+    return dumps(puzzle_dict(puzzle, clues, BODY_GRID_FORMAT))
+
+def load_clues(session, puzzle_ids, columns=CLUE_COLUMNS):
+    """Clue tuples for many puzzles in one query, as {puzzle_id: [clue, ...]} in (direction, number) order"""
+    clues = {puzzle_id: [] for puzzle_id in puzzle_ids}
+    if not clues:
+        return clues
+
+    rows = session.query(Clue.puzzle_id, *columns).filter(
+        Clue.puzzle_id.in_(clues)
+    ).order_by(Clue.puzzle_id, Clue.direction, Clue.number)
+    for puzzle_id, group in groupby(rows, key=lambda row: row[0]):
+        clues[puzzle_id] = [row[1:] for row in group]
+    return clues
+
+def load_puzzle(session, puzzle_id, grid_format='legacy'):
+    """Response dict for one puzzle and its clues from a single joined query, or None if it does not exist"""
+    rows = session.query(*PUZZLE_COLUMNS, *CLUE_COLUMNS).outerjoin(
+        Clue, Clue.puzzle_id == Puzzle.id
+    ).filter(Puzzle.id == puzzle_id).order_by(Clue.direction, Clue.number).all()
+    if not rows:
+        return None
+
+    split = len(PUZZLE_COLUMNS)
+    clues = [row[split:] for row in rows if row[split + 1] is not None]
+    return puzzle_dict(rows[0][:split], clues, grid_format)
+
+def load_puzzle_body(session, puzzle_id, grid_format='legacy'):
+    """Encoded response body for a puzzle, served from the pre-rendered body when there is one"""
+    if grid_format == BODY_GRID_FORMAT:
+        row = session.query(Puzzle.body).filter(Puzzle.id == puzzle_id).one_or_none()
+        if row is None:
+            return None
+        if row.body is not None:
+            return row.body
+
+    puzzle = load_puzzle(session, puzzle_id, grid_format)
+    return dumps(puzzle) if puzzle is not None else None
@@ -0,0 +1,83 @@
+from sqlalchemy import Integer, cast, func, insert, select
+from grid_wit.models.puzzle import Puzzle, Clue
+from grid_wit.models.stats import AnswerStat, AnswerYearStat, AuthorStat
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Keys per IN (...) list when refreshing a subset of the aggregates
+REFRESH_CHUNK_SIZE = 1000
+
+def _year(date_column):
+    """Year of an ISO date string"""
+    return cast(func.substr(date_column, 1, 4), Integer)
+
+def _answer_stats_query():
+    return select(
+        Clue.answer,
+        func.length(Clue.answer),
+        func.count(),
+        func.min(Puzzle.date_published),
+        func.max(Puzzle.date_published)
+    ).join(Puzzle, Puzzle.id == Clue.puzzle_id).where(Clue.answer.isnot(None)).group_by(Clue.answer)
+
+def _answer_year_stats_query():
+    year = _year(Puzzle.date_published)
+    return select(Clue.answer, year, func.length(Clue.answer), func.count()).join(
+        Puzzle, Puzzle.id == Clue.puzzle_id
+    ).where(Clue.answer.isnot(None)).group_by(Clue.answer, year)
+
+def _author_stats_query():
+    return select(
+        Puzzle.author,
+        func.count(),
+        func.min(Puzzle.date_published),
+        func.max(Puzzle.date_published)
+    ).where(Puzzle.author.isnot(None)).group_by(Puzzle.author)
+
+def _insert_answer_stats(session, answers=None):
+    answer_query, year_query = _answer_stats_query(), _answer_year_stats_query()
+    if answers is not None:
+        answer_query = answer_query.where(Clue.answer.in_(answers))
+        year_query = year_query.where(Clue.answer.in_(answers))
+
+    session.execute(insert(AnswerStat).from_select(
+        ['answer', 'length', 'uses', 'first_date', 'last_date'], answer_query
+    ))
+    session.execute(insert(AnswerYearStat).from_select(['answer', 'year', 'length', 'uses'], year_query))
+
+def _insert_author_stats(session, authors=None):
+    query = _author_stats_query()
+    if authors is not None:
+        query = query.where(Puzzle.author.in_(authors))
+    session.execute(insert(AuthorStat).from_select(['author', 'puzzle_count', 'first_date', 'last_date'], query))
+
+def rebuild_stats(session):
+    """Recompute every aggregate from scratch, after a full import"""
+    session.query(AnswerYearStat).delete(synchronize_session=False)
+    session.query(AnswerStat).delete(synchronize_session=False)
+    session.query(AuthorStat).delete(synchronize_session=False)
+    _insert_answer_stats(session)
+    _insert_author_stats(session)
+    logger.info("Rebuilt answer and author statistics")
+
+def refresh_stats(session, answers, authors):
+    """Recompute the aggregates for the given answers and authors only, after an incremental import.
+
+    Callers pass every key whose clues or puzzles were added, changed or removed;
+    each key is regrouped from its own rows through the clues.answer and
+    puzzles.author lookups rather than a scan of the tables.
+    """
+    answers = sorted(answer for answer in answers if answer is not None)
+    authors = sorted(author for author in authors if author is not None)
+
+    for start in range(0, len(answers), REFRESH_CHUNK_SIZE):
+        chunk = answers[start:start + REFRESH_CHUNK_SIZE]
+        session.query(AnswerYearStat).filter(AnswerYearStat.answer.in_(chunk)).delete(synchronize_session=False)
+        session.query(AnswerStat).filter(AnswerStat.answer.in_(chunk)).delete(synchronize_session=False)
+        _insert_answer_stats(session, chunk)
+
+    for start in range(0, len(authors), REFRESH_CHUNK_SIZE):
+        chunk = authors[start:start + REFRESH_CHUNK_SIZE]
+        session.query(AuthorStat).filter(AuthorStat.author.in_(chunk)).delete(synchronize_session=False)
+        _insert_author_stats(session, chunk)
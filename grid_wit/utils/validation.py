@@ -0,0 +1,271 @@
+import os
+import sys
+import json
+import argparse
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from sqlalchemy import func
+from grid_wit.config.database import get_db_session
+from grid_wit.models.puzzle import Puzzle, Clue
+from grid_wit.utils.data_loader import DEFAULT_WORKERS, iter_puzzle_files, _resolve_puzzles_path
+from grid_wit.utils.grid_codec import decode_grid, unpack_gridnums
+from grid_wit.utils.grid_geometry import GridGeometry, grid_dimensions
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Puzzles per pool task: files read by one worker, or an ID range it loads from the database
+VALIDATION_CHUNK_SIZE = 256
+
+ISSUE_KINDS = {
+    'invalid_puzzle': "Unreadable file, or a grid that does not match its dimensions",
+    'clue_count_mismatch': "Different numbers of clues and answers in a direction",
+    'unparsed_clue': "Clue text without a leading number",
+    'gridnums_mismatch': "Source gridnums disagree with the numbering derived from the grid",
+    'dropped_clue': "Clue number with no slot in the grid (the importer drops these)",
+    'duplicate_clue': "More than one clue for the same slot",
+    'missing_clue': "Slot in the grid without a clue",
+    'position_mismatch': "Stored row/column differ from the slot's start",
+    'wrong_length': "Answer length differs from the slot length",
+    'answer_mismatch': "Answer letters differ from the grid",
+}
+
+# A puzzle normalized for validation. clues holds (direction, number, answer, row, column)
+# tuples; row and column are None for source files, which carry no positions.
+PuzzleRecord = namedtuple('PuzzleRecord', ['key', 'cells', 'rows', 'cols', 'gridnums', 'clues'])
+
+def _issue(key, kind, direction=None, number=None, detail=None):
+    return {'puzzle': key, 'kind': kind, 'direction': direction, 'number': number, 'detail': detail}
+
+def _codepoints(text):
+    return np.frombuffer(text.encode('utf-32-le'), dtype='<u4')
+
+def _check_numbering(record, geometry, issues):
+    """Slot numbering to match clues against: the source gridnums when present (as the importer uses them), else the derived numbers"""
+    if record.gridnums is None:
+        return geometry.numbers
+
+    gridnums = np.asarray(record.gridnums)
+    if gridnums.shape != geometry.numbers.shape:
+        issues.append(_issue(record.key, 'gridnums_mismatch', detail=f"{gridnums.size} numbers for {geometry.numbers.size} cells"))
+        return geometry.numbers
+
+    wrong = np.flatnonzero(gridnums != geometry.numbers)
+    if len(wrong):
+        row, col = divmod(int(wrong[0]), record.cols)
+        issues.append(_issue(record.key, 'gridnums_mismatch', detail=f"{len(wrong)} cells differ, first at ({row}, {col})"))
+    return gridnums
+
+def validate_records(records):
+    """Check each puzzle's clues against its grid; returns a list of issues.
+
+    Slot lookups and length checks run per puzzle on the GridGeometry arrays.
+    The letter comparison for every well-formed slot in the batch is a single
+    array comparison, with mismatches attributed back to slots by bincount.
+    """
+    issues = []
+    expected, actual, owners = [], [], []
+    checked = []  # (key, direction, number, answer) per compared slot
+
+    for record in records:
+        try:
+            geometry = GridGeometry(record.cells, record.rows, record.cols)
+        except ValueError as e:
+            issues.append(_issue(record.key, 'invalid_puzzle', detail=str(e)))
+            continue
+
+        numbering = _check_numbering(record, geometry, issues)
+        letters = ''.join(record.cells)
+        compact = len(letters) == len(record.cells)
+        grid_points = _codepoints(letters) if compact else None
+
+        clues = {'across': [], 'down': []}
+        for clue in record.clues:
+            clues.setdefault(clue[0], []).append(clue)
+
+        for direction in ('across', 'down'):
+            slots = getattr(geometry, direction)
+            starts, lengths = slots['start'], slots['length']
+            numbers = numbering[starts].tolist()
+            slot_of = {number: i for i, number in enumerate(numbers)}
+
+            answers = [None] * len(numbers)
+            for _, number, answer, row, column in clues[direction]:
+                i = slot_of.get(number)
+                if i is None:
+                    issues.append(_issue(record.key, 'dropped_clue', direction, number))
+                    continue
+                if answers[i] is not None:
+                    issues.append(_issue(record.key, 'duplicate_clue', direction, number))
+                    continue
+                if row is not None and (row, column) != divmod(int(starts[i]), record.cols):
+                    issues.append(_issue(record.key, 'position_mismatch', direction, number, f"stored at ({row}, {column})"))
+                answers[i] = answer or ''
+
+            have = np.fromiter((answer is not None for answer in answers), dtype=bool, count=len(answers))
+            for i in np.flatnonzero(~have):
+                issues.append(_issue(record.key, 'missing_clue', direction, numbers[i]))
+
+            flat, slot_index = geometry.slot_cells(direction)
+            if not compact:
+                # Rebus cells hold several letters, so compare whole words
+                offsets = np.cumsum(lengths) - lengths
+                for i in np.flatnonzero(have):
+                    word = ''.join(record.cells[cell] for cell in flat[offsets[i]:offsets[i] + lengths[i]])
+                    if answers[i] != word:
+                        issues.append(_issue(record.key, 'answer_mismatch', direction, numbers[i], f"{answers[i]} vs grid {word}"))
+                continue
+
+            answer_lengths = np.fromiter((len(a) if a is not None else -1 for a in answers), dtype=np.int64, count=len(answers))
+            for i in np.flatnonzero(have & (answer_lengths != lengths)):
+                issues.append(_issue(
+                    record.key, 'wrong_length', direction, numbers[i], f"{answers[i]} in a {lengths[i]}-cell slot"
+                ))
+
+            ok = have & (answer_lengths == lengths)
+            if not ok.any():
+                continue
+            cells = ok[slot_index]
+            rank = np.cumsum(ok) - 1
+            owners.append(len(checked) + rank[slot_index[cells]])
+            expected.append(grid_points[flat[cells]])
+            actual.append(_codepoints(''.join(answers[i] for i in np.flatnonzero(ok))))
+            checked.extend((record.key, direction, numbers[i], answers[i]) for i in np.flatnonzero(ok))
+
+    if checked:
+        expected, actual, owners = np.concatenate(expected), np.concatenate(actual), np.concatenate(owners)
+        wrong = np.bincount(owners[expected != actual], minlength=len(checked))
+        for slot in np.flatnonzero(wrong):
+            key, direction, number, answer = checked[slot]
+            low, high = np.searchsorted(owners, [slot, slot + 1])
+            word = ''.join(map(chr, expected[low:high]))
+            issues.append(_issue(key, 'answer_mismatch', direction, number, f"{answer} vs grid {word}"))
+
+    return issues
+
+def source_record(key, puzzle_data, issues):
+    """PuzzleRecord for a source puzzle dict, appending problems that stop clues from being read"""
+    rows, cols = grid_dimensions(puzzle_data)
+    clues = []
+    for direction in ('across', 'down'):
+        texts, answers = puzzle_data['clues'][direction], puzzle_data['answers'][direction]
+        if len(texts) != len(answers):
+            issues.append(_issue(key, 'clue_count_mismatch', direction, detail=f"{len(texts)} clues, {len(answers)} answers"))
+        for clue_text, answer in zip(texts, answers):
+            try:
+                number = int(clue_text.split('.')[0])
+            except ValueError:
+                issues.append(_issue(key, 'unparsed_clue', direction, detail=clue_text[:40]))
+                continue
+            clues.append((direction, number, answer, None, None))
+    return PuzzleRecord(key, puzzle_data['grid'], rows, cols, puzzle_data.get('gridnums') or None, clues)
+
+def _validate_source_chunk(task):
+    """Worker entry point: validate a chunk of source files, returning (puzzles, clues, issues)"""
+    puzzles_path, file_paths = task
+    issues, records = [], []
+    for file_path in file_paths:
+        key = os.path.relpath(file_path, puzzles_path)
+        try:
+            with open(file_path, 'rb') as f:
+                records.append(source_record(key, json.loads(f.read()), issues))
+        except Exception as e:
+            issues.append(_issue(key, 'invalid_puzzle', detail=str(e)))
+    return len(file_paths), sum(len(record.clues) for record in records), issues + validate_records(records)
+
+def _validate_database_chunk(id_range):
+    """Worker entry point: validate puzzles with low <= id < high, returning (puzzles, clues, issues)"""
+    low, high = id_range
+    issues, records = [], []
+    with get_db_session() as session:
+        puzzles = session.query(
+            Puzzle.id, Puzzle.date_published, Puzzle.rows, Puzzle.cols, Puzzle.grid, Puzzle.grid_compact, Puzzle.gridnums
+        ).filter(Puzzle.id >= low, Puzzle.id < high).order_by(Puzzle.id).all()
+
+        clues = {puzzle.id: [] for puzzle in puzzles}
+        for row in session.query(
+            Clue.puzzle_id, Clue.direction, Clue.number, Clue.answer, Clue.row, Clue.column
+        ).filter(Clue.puzzle_id >= low, Clue.puzzle_id < high):
+            clues[row.puzzle_id].append(tuple(row[1:]))
+
+    for puzzle in puzzles:
+        key = f"{puzzle.date_published} (id {puzzle.id})"
+        try:
+            cells = decode_grid(puzzle.grid_compact) if puzzle.grid_compact is not None else json.loads(puzzle.grid)
+            size = {'rows': puzzle.rows, 'cols': puzzle.cols}
+            rows, cols = grid_dimensions({'grid': cells, 'size': size})
+        except Exception as e:
+            issues.append(_issue(key, 'invalid_puzzle', detail=str(e)))
+            continue
+        gridnums = unpack_gridnums(puzzle.gridnums) if puzzle.gridnums is not None else None
+        records.append(PuzzleRecord(key, cells, rows, cols, gridnums, clues[puzzle.id]))
+    return len(puzzles), sum(len(record.clues) for record in records), issues + validate_records(records)
+
+def _run_chunks(function, tasks, workers):
+    """Run validation tasks across a process pool and merge their results into a report"""
+    report = {'puzzles': 0, 'clues': 0, 'issue_counts': Counter(), 'issues': []}
+    if workers <= 1:
+        results = map(function, tasks)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(function, tasks)
+
+    try:
+        for puzzle_count, clue_count, issues in results:
+            report['puzzles'] += puzzle_count
+            report['clues'] += clue_count
+            report['issue_counts'].update(issue['kind'] for issue in issues)
+            report['issues'].extend(issues)
+    finally:
+        if workers > 1:
+            executor.shutdown()
+    return report
+
+def validate_source(puzzles_path=None, workers=DEFAULT_WORKERS, chunk_size=VALIDATION_CHUNK_SIZE):
+    """Validate every puzzle file in the archive against its own grid"""
+    puzzles_path = _resolve_puzzles_path(puzzles_path)
+    file_paths = list(iter_puzzle_files(puzzles_path))
+    tasks = [(puzzles_path, file_paths[i:i + chunk_size]) for i in range(0, len(file_paths), chunk_size)]
+    return _run_chunks(_validate_source_chunk, tasks, workers)
+
+def validate_database(workers=DEFAULT_WORKERS, chunk_size=VALIDATION_CHUNK_SIZE):
+    """Validate every stored puzzle's clues against its stored grid; each worker loads its own ID ranges"""
+    with get_db_session() as session:
+        low, high = session.query(func.min(Puzzle.id), func.max(Puzzle.id)).one()
+    if low is None:
+        return _run_chunks(_validate_database_chunk, [], workers)
+    tasks = [(start, start + chunk_size) for start in range(low, high + 1, chunk_size)]
+    return _run_chunks(_validate_database_chunk, tasks, workers)
+
+def main():
+    parser = argparse.ArgumentParser(description="Check every puzzle's answers and numbering against its grid")
+    parser.add_argument('--path', help="Archive directory to validate (default: ./nyt_crosswords)")
+    parser.add_argument('--database', action='store_true', help="Validate the imported puzzles instead of source files")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--chunk-size', type=int, default=VALIDATION_CHUNK_SIZE)
+    parser.add_argument('--output', help="Write every issue as NDJSON to this file")
+    parser.add_argument('--examples', type=int, default=5, help="Issues to log per kind")
+    args = parser.parse_args()
+
+    if args.database:
+        report = validate_database(args.workers, args.chunk_size)
+    else:
+        report = validate_source(args.path, args.workers, args.chunk_size)
+
+    logger.info(f"Validated {report['puzzles']} puzzles and {report['clues']} clues")
+    for kind, count in report['issue_counts'].most_common():
+        logger.info(f"{kind}: {count} ({ISSUE_KINDS[kind]})")
+        for issue in [issue for issue in report['issues'] if issue['kind'] == kind][:args.examples]:
+            logger.info(f"  {issue['puzzle']} {issue['direction'] or ''} {issue['number'] or ''} {issue['detail'] or ''}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            for issue in report['issues']:
+                f.write(json.dumps(issue) + '\n')
+
+    sys.exit(1 if report['issues'] else 0)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -18,7 +18,7 @@ def verify_data():
                 logger.info(f"Puzzle ID: {puzzle.id}")
                 logger.info(f"Date Published: {puzzle.date_published}")
                 logger.info(f"Author: {puzzle.author}")
-                logger.info(f"Grid: {puzzle.grid[:50]}...")  # Show first 50 chars
+                logger.info(f"Grid: {(puzzle.grid_compact or puzzle.grid)[:50]}...")  # Show first 50 chars
                 logger.info("---")
 
             # Query clues for first puzzle
@@ -7,12 +7,34 @@ bind = "0.0.0.0:" + os.getenv("PORT", "8080")
 backlog = 2048
 
 # Worker processes
-workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = "sync"
-worker_connections = 1000
+# GUNICORN_WORKER_CLASS selects the concurrency model:
+#   sync    - one request per process (default)
+#   gthread - GUNICORN_THREADS requests per process on a thread pool
+#   gevent  - up to worker_connections greenlets per process; needs the
+#             gevent and psycogreen packages installed
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+default_workers = multiprocessing.cpu_count() * 2 + 1 if worker_class == "sync" else multiprocessing.cpu_count()
+workers = int(os.getenv("GUNICORN_WORKERS", default_workers))
+threads = int(os.getenv("GUNICORN_THREADS", 1 if worker_class == "sync" else 8))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 1000))
+# Greenlets beyond this many wait for a pooled database connection instead of
+# each opening their own, so a worker holds at most this many connections
+gevent_db_connections = int(os.getenv("GUNICORN_GEVENT_DB_CONNECTIONS", 4))
 timeout = 30
 keepalive = 2
 
+# Size each worker's database pool to the requests it can run at once, so
+# total connections stay at workers x concurrency instead of workers x 15.
+# Explicit DB_POOL_SIZE / DB_MAX_OVERFLOW settings take precedence.
+if worker_class == "gthread":
+    db_pool_size = threads
+elif worker_class == "gevent":
+    db_pool_size = gevent_db_connections
+else:
+    db_pool_size = 1
+os.environ.setdefault("DB_POOL_SIZE", str(db_pool_size))
+os.environ.setdefault("DB_MAX_OVERFLOW", "0")
+
 # Logging
 accesslog = "-"
 errorlog = "-"
@@ -31,4 +53,21 @@ tmp_upload_dir = None
 
 # SSL
 keyfile = None
-certfile = None 
\ No newline at end of file
+certfile = None
+
+# Server hooks
+def post_fork(server, worker):
+    if worker_class == "gevent":
+        # psycopg2 blocks the whole process unless it is made greenlet-aware
+        try:
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            server.log.warning("psycogreen is not installed; database calls will block gevent workers")
+
+def worker_exit(server, worker):
+    # Write buffered autosaves, then close this worker's pooled connections
+    from grid_wit.utils.progress_buffer import flush_progress_buffer
+    from grid_wit.config.database import dispose_engine
+    flush_progress_buffer()
+    dispose_engine()
@@ -1,25 +1,11 @@
-from flask import Flask, jsonify
-from flask_cors import CORS
-from grid_wit.api.routes import api
+from grid_wit import create_app
 import logging
 import os
 
-logging.basicConfig(level=logging.DEBUG)
+logging.basicConfig(level=logging.DEBUG, force=True)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
-CORS(app)
-
-# Register blueprints
-app.register_blueprint(api, url_prefix='/api')
-
-@app.route('/')
-def home():
-    return jsonify({
-        "message": "Welcome to the Crossword API",
-        "status": "ok",
-        "documentation": "/api/"
-    })
+app = create_app()
 
 if __name__ == "__main__":
     logger.info("Starting Crossword Puzzle API in development mode...")
@@ -2,8 +2,11 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from grid_wit.config.database import engine
+from grid_wit.config.database import get_engine
 from grid_wit.models.puzzle import Base
+import grid_wit.models.user  # noqa: F401 - register user tables on Base
+import grid_wit.models.stats  # noqa: F401 - register statistics tables on Base
+import grid_wit.models.generation  # noqa: F401 - register generation job tables on Base
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -13,7 +16,7 @@ def setup_database():
     """Initialize the database schema"""
     try:
         logger.info("Creating database tables...")
-        Base.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=get_engine())
         logger.info("Database tables created successfully!")
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
@@ -0,0 +1,149 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from grid_wit.config.database import get_engine
+from grid_wit.models.puzzle import Base
+import grid_wit.models.user  # noqa: F401 - register user tables on Base
+import grid_wit.models.stats  # noqa: F401 - register statistics tables on Base
+import grid_wit.models.generation  # noqa: F401 - register generation job tables on Base
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Ordered, idempotent schema changes for databases created before the models
+# gained them. New tables are handled by create_all; list only changes to
+# existing tables here. Each entry runs once and is recorded in schema_migrations.
+MIGRATIONS = [
+    ('0001_unique_iso_date_published', [
+        """UPDATE puzzles
+           SET date_published = to_char(to_date(date_published, 'MM/DD/YYYY'), 'YYYY-MM-DD')
+           WHERE date_published LIKE '%/%'""",
+        """DELETE FROM puzzles p USING puzzles q
+           WHERE p.date_published = q.date_published AND p.id < q.id""",
+        "DROP INDEX IF EXISTS ix_puzzles_date_published",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_puzzles_date_published ON puzzles (date_published)",
+    ]),
+    ('0002_puzzle_keyset_index', [
+        "CREATE INDEX IF NOT EXISTS idx_puzzle_date_id ON puzzles (date_published, id)",
+    ]),
+    ('0003_clue_search_indexes', [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS idx_clue_answer_trgm ON clues USING gin (answer gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS idx_clue_text_trgm ON clues USING gin (text gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS idx_clue_text_fts ON clues USING gin (to_tsvector('english', coalesce(text, '')))",
+    ]),
+    ('0004_daily_puzzle_served_on', [
+        "ALTER TABLE daily_puzzle_history ADD COLUMN IF NOT EXISTS served_on DATE",
+        """UPDATE daily_puzzle_history SET served_on = (served_date AT TIME ZONE 'UTC')::date
+           WHERE served_on IS NULL""",
+        """DELETE FROM daily_puzzle_history h USING daily_puzzle_history o
+           WHERE h.served_on = o.served_on AND h.id > o.id""",
+        """CREATE UNIQUE INDEX IF NOT EXISTS daily_puzzle_history_served_on_key
+           ON daily_puzzle_history (served_on)""",
+        """CREATE INDEX IF NOT EXISTS idx_daily_cycle_puzzle
+           ON daily_puzzle_history (cycle_number, puzzle_id)""",
+    ]),
+    # Existing grids are converted by `python -m grid_wit.utils.data_loader --compact-grids`
+    ('0005_compact_grid_columns', [
+        "ALTER TABLE puzzles ADD COLUMN IF NOT EXISTS grid_compact VARCHAR",
+        "ALTER TABLE puzzles ADD COLUMN IF NOT EXISTS gridnums BYTEA",
+    ]),
+    # Rows imported before dimensions were stored are all 15x15 or other square grids
+    ('0006_grid_dimensions', [
+        'ALTER TABLE puzzles ADD COLUMN IF NOT EXISTS "rows" INTEGER',
+        'ALTER TABLE puzzles ADD COLUMN IF NOT EXISTS "cols" INTEGER',
+        """UPDATE puzzles
+           SET "rows" = round(sqrt(length(grid_compact)))::int, "cols" = round(sqrt(length(grid_compact)))::int
+           WHERE "rows" IS NULL AND grid_compact IS NOT NULL""",
+        """UPDATE puzzles
+           SET "rows" = round(sqrt(json_array_length(grid::json)))::int, "cols" = round(sqrt(json_array_length(grid::json)))::int
+           WHERE "rows" IS NULL AND grid IS NOT NULL""",
+    ]),
+    ('0007_corpus_stats', [
+        "ALTER TABLE corpus_state ADD COLUMN IF NOT EXISTS puzzle_count INTEGER",
+        "ALTER TABLE corpus_state ADD COLUMN IF NOT EXISTS clue_count INTEGER",
+        "ALTER TABLE corpus_state ADD COLUMN IF NOT EXISTS first_date VARCHAR",
+        "ALTER TABLE corpus_state ADD COLUMN IF NOT EXISTS last_date VARCHAR",
+        """UPDATE corpus_state SET
+               puzzle_count = (SELECT count(*) FROM puzzles),
+               clue_count = (SELECT count(*) FROM clues),
+               first_date = (SELECT min(date_published) FROM puzzles),
+               last_date = (SELECT max(date_published) FROM puzzles)""",
+    ]),
+    # Keeps the most recently played row where a user saved the same puzzle twice
+    ('0008_saved_puzzle_progress', [
+        "ALTER TABLE saved_puzzles ADD COLUMN IF NOT EXISTS cells VARCHAR",
+        """DELETE FROM saved_puzzles s USING saved_puzzles o
+           WHERE s.user_id = o.user_id AND s.puzzle_id = o.puzzle_id
+             AND (coalesce(s.last_played, s.created_at), s.id) < (coalesce(o.last_played, o.created_at), o.id)""",
+        """CREATE UNIQUE INDEX IF NOT EXISTS uq_saved_puzzle_user_puzzle
+           ON saved_puzzles (user_id, puzzle_id)""",
+    ]),
+    ('0009_saved_puzzle_library', [
+        """UPDATE saved_puzzles SET last_played = coalesce(created_at, now())
+           WHERE last_played IS NULL""",
+        "ALTER TABLE saved_puzzles ALTER COLUMN last_played SET DEFAULT now()",
+        "ALTER TABLE saved_puzzles ALTER COLUMN last_played SET NOT NULL",
+        """CREATE INDEX IF NOT EXISTS idx_saved_user_last_played
+           ON saved_puzzles (user_id, last_played DESC, id DESC)""",
+        """CREATE INDEX IF NOT EXISTS idx_saved_user_completed_last_played
+           ON saved_puzzles (user_id, completed, last_played DESC, id DESC)""",
+    ]),
+    # The statistics tables themselves are new and created by create_all
+    ('0010_answer_author_stats', [
+        "CREATE INDEX IF NOT EXISTS idx_clue_answer ON clues (answer)",
+        "CREATE INDEX IF NOT EXISTS idx_puzzle_author ON puzzles (author)",
+        """INSERT INTO answer_stats (answer, length, uses, first_date, last_date)
+           SELECT c.answer, length(c.answer), count(*), min(p.date_published), max(p.date_published)
+           FROM clues c JOIN puzzles p ON p.id = c.puzzle_id
+           WHERE c.answer IS NOT NULL
+           GROUP BY c.answer
+           ON CONFLICT DO NOTHING""",
+        """INSERT INTO answer_year_stats (answer, year, length, uses)
+           SELECT c.answer, substr(p.date_published, 1, 4)::int, length(c.answer), count(*)
+           FROM clues c JOIN puzzles p ON p.id = c.puzzle_id
+           WHERE c.answer IS NOT NULL
+           GROUP BY c.answer, substr(p.date_published, 1, 4)::int
+           ON CONFLICT DO NOTHING""",
+        """INSERT INTO author_stats (author, puzzle_count, first_date, last_date)
+           SELECT author, count(*), min(date_published), max(date_published)
+           FROM puzzles
+           WHERE author IS NOT NULL
+           GROUP BY author
+           ON CONFLICT DO NOTHING""",
+    ]),
+    # Existing puzzles are rendered by `python -m grid_wit.utils.data_loader --render-bodies`
+    ('0011_puzzle_body', [
+        "ALTER TABLE puzzles ADD COLUMN IF NOT EXISTS body BYTEA",
+    ]),
+]
+
+def run_migrations():
+    """Create missing tables and apply pending migrations"""
+    engine = get_engine()
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "name VARCHAR PRIMARY KEY, applied_at TIMESTAMPTZ DEFAULT now())"
+        ))
+        applied = set(conn.execute(text("SELECT name FROM schema_migrations")).scalars())
+
+    for name, statements in MIGRATIONS:
+        if name in applied:
+            continue
+
+        logger.info(f"Applying migration {name}...")
+        with engine.begin() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+            conn.execute(text("INSERT INTO schema_migrations (name) VALUES (:name)"), {'name': name})
+
+    logger.info("Database is up to date")
+
+if __name__ == "__main__":
+    run_migrations()
@@ -0,0 +1,100 @@
+import json
+import pytest
+from datetime import date, timedelta
+from grid_wit import create_app
+from grid_wit.config import database
+from grid_wit.config.database import get_db_session
+from grid_wit.models.puzzle import Puzzle, init_db
+from grid_wit.api.cache import invalidate_response_cache
+from grid_wit.utils import answer_index, clue_index, corpus, daily, progress
+from grid_wit.utils.data_loader import load_puzzles_from_json
+from grid_wit.utils.grid_geometry import GridGeometry, BLACK_SQUARE
+
+# Every test gets its own SQLite database; process-wide caches keyed on the
+# corpus version are reset so nothing leaks between databases.
+
+def _reset_caches():
+    corpus._checked_at = 0.0
+    progress._shapes_version = None
+    daily._payloads.clear()
+    answer_index._index = None
+    clue_index._index = None
+    invalidate_response_cache()
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(clue_index, 'CLUE_INDEX_PATH', str(tmp_path / 'clue_index'))
+    database.configure_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    init_db()
+    _reset_caches()
+    yield database
+    _reset_caches()
+    database.dispose_engine()
+    database.configure_engine()
+
+@pytest.fixture
+def app(db):
+    return create_app()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def source_puzzle(date, rows=('CAT', 'ORE', 'WED'), author='Test Author'):
+    """Archive JSON for a grid given as row strings ('.' for black squares), with generated clue text"""
+    cols = len(rows[0])
+    grid = [cell for row in rows for cell in row]
+    geometry = GridGeometry(grid, len(rows), cols)
+    clues, answers = {}, {}
+    for direction, step in (('across', 1), ('down', cols)):
+        clues[direction], answers[direction] = [], []
+        for number, row, col, length in geometry.slots(direction):
+            start = row * cols + col
+            answer = ''.join(grid[start + i * step] for i in range(length))
+            answers[direction].append(answer)
+            clues[direction].append(f"{number}. Clue for {answer.lower()}")
+    year, month, day = date.split('-')
+    return {
+        "date": f"{int(month)}/{int(day)}/{year}",
+        "author": author,
+        "size": {"rows": len(rows), "cols": cols},
+        "grid": [BLACK_SQUARE if cell == '.' else cell for cell in grid],
+        "gridnums": geometry.numbers.tolist(),
+        "clues": clues,
+        "answers": answers
+    }
+
+@pytest.fixture
+def archive(tmp_path):
+    """An empty archive directory and a function writing puzzles into it as year/month/name.json"""
+    root = tmp_path / 'archive'
+    root.mkdir()
+
+    def write(date, rows=('CAT', 'ORE', 'WED'), author='Test Author', name=None, data=None):
+        directory = root / date[:4] / date[5:7]
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{name or date}.json"
+        path.write_text(data if data is not None else json.dumps(source_puzzle(date, rows, author)))
+        return str(path)
+
+    write.root = str(root)
+    return write
+
+GRIDS = [
+    ('CAT', 'ORE', 'WED'),
+    ('DOG', 'ONE', 'TEN'),
+    ('AB.', 'CDE', '.FG'),
+    ('BAT', 'ORE', 'WED'),
+]
+
+@pytest.fixture
+def puzzles(archive):
+    """Load `count` 3x3 puzzles dated from 2020-01-01 and return their IDs in date order"""
+    def load(count=4, authors=('Ann Smith', 'Joel Fagliano')):
+        for index in range(count):
+            day = (date(2020, 1, 1) + timedelta(days=index)).isoformat()
+            archive(day, rows=GRIDS[index % len(GRIDS)], author=authors[index % len(authors)])
+        load_puzzles_from_json(archive.root, bulk=True, workers=1)
+        with get_db_session() as session:
+            return [puzzle_id for (puzzle_id,) in session.query(Puzzle.id).order_by(Puzzle.date_published)]
+    return load
@@ -0,0 +1,42 @@
+import random
+import re
+import pytest
+from grid_wit.utils.answer_index import AnswerIndex
+from grid_wit.utils.data_loader import sync_puzzles_from_json
+
+def test_match_agrees_with_regex():
+    rng = random.Random(5)
+    words = {''.join(rng.choice('ABCE') for _ in range(rng.randint(2, 5))) for _ in range(300)}
+    index = AnswerIndex([(word, rng.randint(1, 9), []) for word in words])
+    frequencies = {answer: frequency for bucket in index.buckets.values()
+                   for answer, frequency in zip(bucket.answers, bucket.frequencies)}
+
+    for _ in range(200):
+        pattern = ''.join(rng.choice('ABCE?.') for _ in range(rng.randint(1, 6)))
+        regex = re.compile(pattern.replace('?', '.') + '$')
+        expected = sorted((word for word in words if regex.match(word)), key=lambda word: (-frequencies[word], word))
+
+        total, matches = index.match(pattern, limit=5)
+        assert total == len(expected)
+        assert [match['answer'] for match in matches] == expected[:5]
+
+@pytest.mark.parametrize('pattern', [None, '', 'AB CD', 'A' * 26, 'A*'])
+def test_normalize_pattern_rejects(pattern):
+    with pytest.raises(ValueError):
+        AnswerIndex.normalize_pattern(pattern)
+
+def test_match_route(client, puzzles, archive):
+    puzzle_ids = puzzles(4)
+
+    body = client.get('/api/answers/match', query_string={'pattern': '?re'}).get_json()
+    assert (body['pattern'], body['total']) == ('?RE', 2)
+    assert [(match['answer'], match['frequency']) for match in body['answers']] == [('ARE', 2), ('ORE', 2)]
+    assert {clue['puzzle_id'] for clue in body['answers'][0]['clues']} == {puzzle_ids[0], puzzle_ids[3]}
+    assert client.get('/api/answers/match', query_string={'pattern': '?re', 'limit': 1}).get_json()['total'] == 2
+    assert client.get('/api/answers/match', query_string={'pattern': 'a!'}).status_code == 400
+
+    # The index is rebuilt once the corpus changes
+    archive('2020-02-01', rows=('IRE', 'ONE', 'NET'))
+    sync_puzzles_from_json(archive.root)
+    body = client.get('/api/answers/match', query_string={'pattern': '?RE', 'limit': 5}).get_json()
+    assert [match['answer'] for match in body['answers']] == ['ARE', 'ORE', 'IRE']
@@ -0,0 +1,34 @@
+import json
+import os
+import subprocess
+import sys
+
+SUITE = os.path.join(os.path.dirname(__file__), os.pardir, 'benchmarks', 'suite.py')
+
+def _suite(tmp_path, *args):
+    env = {**os.environ, 'CLUE_INDEX_PATH': str(tmp_path / 'clue_index')}
+    return subprocess.run([sys.executable, SUITE, *args], env=env, capture_output=True, text=True, timeout=120)
+
+def test_suite_runs_on_a_small_corpus(tmp_path):
+    result_path = tmp_path / 'result.json'
+    run = _suite(
+        tmp_path, '--scale', '20', '--duration', '0.1', '--concurrency', '2', '--users', '3', '--workers', '1',
+        '--corpus-dir', str(tmp_path / 'corpus'), '--database-url', f"sqlite:///{tmp_path / 'bench.db'}",
+        '--only', 'search_date', 'progress_patch', '--json', str(result_path)
+    )
+    assert run.returncode == 0, run.stderr
+
+    results = json.loads(result_path.read_text())
+    assert results['meta']['scale'] == 20 and results['meta']['dialect'] == 'sqlite'
+    assert results['importer']['bulk_import']['puzzles'] == 20
+    assert set(results['scenarios']) == {'search_date', 'progress_patch'}
+    assert all(scenario['errors'] == 0 for scenario in results['scenarios'].values())
+
+    # A slower copy is reported as a regression
+    slower = json.loads(result_path.read_text())
+    for scenario in slower['scenarios'].values():
+        scenario['p50_ms'] *= 2
+    slower_path = tmp_path / 'slower.json'
+    slower_path.write_text(json.dumps(slower))
+    assert _suite(tmp_path, '--compare', str(result_path), str(result_path)).returncode == 0
+    assert _suite(tmp_path, '--compare', str(result_path), str(slower_path)).returncode == 1
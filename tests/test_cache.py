@@ -0,0 +1,71 @@
+import sys
+import time
+from grid_wit.api import cache
+from grid_wit.api.cache import LRUCache, CachedResponse, ResponseCache, configure_response_cache
+
+def _entry(body, ttl=60):
+    return CachedResponse(body, 'etag', 'application/json', ttl)
+
+def test_lru_evicts_by_count_and_size():
+    lru = LRUCache(max_entries=2, max_bytes=10)
+    lru.set('a', _entry(b'1234'), 60)
+    lru.set('b', _entry(b'1234'), 60)
+    assert lru.get('a') is not None
+    lru.set('c', _entry(b'1234'), 60)
+    assert (lru.get('a') is not None, lru.get('b'), lru.get('c') is not None) == (True, None, True)
+
+    lru.set('d', _entry(b'12345678'), 60)
+    assert (lru.get('a'), lru.get('c'), lru.get('d') is not None) == (None, None, True)
+    lru.set('e', _entry(b'x' * 11), 60)
+    assert lru.get('e') is None
+
+def test_lru_expires_entries():
+    lru = LRUCache()
+    lru.set('a', _entry(b'1'), 0)
+    assert lru.get('a') is None
+
+def test_etag_and_not_modified(client, puzzles):
+    puzzle_id = puzzles(1)[0]
+    url = f'/api/puzzles/{puzzle_id}'
+
+    first = client.get(url)
+    assert first.status_code == 200 and first.headers['ETag']
+    assert 'max-age=300' in first.headers['Cache-Control']
+
+    second = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 304 and second.get_data() == b''
+    assert second.headers['ETag'] == first.headers['ETag']
+    assert client.get(url, headers={'If-None-Match': '"other"'}).get_data() == first.get_data()
+
+    # Errors are not cached
+    assert client.get('/api/puzzles/999').status_code == 404
+    assert client.get('/api/puzzles/999').status_code == 404
+
+def test_shared_cache_serves_other_workers(client, puzzles, monkeypatch):
+    puzzle_id = puzzles(1)[0]
+    shared = LRUCache()
+    # Restore the process-wide cache after the test
+    monkeypatch.setattr(cache, 'response_cache', cache.response_cache)
+    configure_response_cache(shared=shared)
+
+    body = client.get(f'/api/puzzles/{puzzle_id}').get_data()
+    assert len(shared._entries) == 1
+
+    # A fresh local cache (another worker) is filled from the shared one without a query
+    configure_response_cache(shared=shared)
+    monkeypatch.setattr(sys.modules['grid_wit.api.routes'], 'load_puzzle_body', None)
+    assert client.get(f'/api/puzzles/{puzzle_id}').get_data() == body
+
+def test_escaped_arguments_get_their_own_key(client, puzzles):
+    puzzles(4)
+    escaped = client.get('/api/puzzles/search?author=fagliano%26word%3DRE').get_json()
+    assert escaped['total'] == 0
+    assert client.get('/api/puzzles/search?author=fagliano&word=RE').get_json()['total'] == 1
+
+def test_shared_entries_keep_their_ttl_locally():
+    shared = LRUCache()
+    shared.set('key', _entry(b'body', ttl=5), 5)
+    local = LRUCache()
+    assert ResponseCache(local, shared).get('key').body == b'body'
+    expires_at = local._entries['key'][0]
+    assert expires_at - time.monotonic() <= 5
@@ -0,0 +1,88 @@
+import json
+import math
+import random
+import numpy as np
+from grid_wit.config.database import get_db_session
+from grid_wit.models.puzzle import Clue
+from grid_wit.utils import clue_index
+from grid_wit.utils.clue_index import build_clue_index, load_clue_index, tokenize, write_clue_index
+from grid_wit.utils.data_loader import load_puzzles_from_json
+from conftest import GRIDS, source_puzzle
+
+WORDS = ['river', 'opera', 'singer', 'capital', 'poet', 'island', 'bird', 'tree', 'French', "Kid's"]
+
+def _load_corpus(archive, count=12):
+    """Puzzles with random few-word clues, so clues share tokens in varying proportions"""
+    rng = random.Random(7)
+    for index in range(count):
+        day = f"2020-01-{index + 1:02d}"
+        data = source_puzzle(day, GRIDS[index % len(GRIDS)])
+        for direction in ('across', 'down'):
+            data['clues'][direction] = [
+                f"{clue.split('.')[0]}. {' '.join(rng.sample(WORDS, rng.randint(1, 3)))} of the day"
+                for clue in data['clues'][direction]
+            ]
+        archive(day, data=json.dumps(data))
+    load_puzzles_from_json(archive.root, bulk=True, workers=1)
+
+def _brute_force_scores(clues, clue_id):
+    """{other clue: IDF-weighted cosine over distinct tokens} for clues sharing a token with clue_id"""
+    tokens = {cid: tokenize(text) for cid, text, _ in clues}
+    frequency = {}
+    for words in tokens.values():
+        for word in words:
+            frequency[word] = frequency.get(word, 0) + 1
+    idf = {word: math.log((len(clues) + 1) / (count + 1)) + 1 for word, count in frequency.items()}
+    norm = {cid: math.sqrt(sum(idf[word] ** 2 for word in words)) for cid, words in tokens.items()}
+    return {
+        other: sum(idf[word] ** 2 for word in tokens[clue_id] & words) / (norm[clue_id] * norm[other])
+        for other, words in tokens.items() if other != clue_id and tokens[clue_id] & words
+    }
+
+def test_similar_agrees_with_brute_force(db, archive):
+    _load_corpus(archive)
+    with get_db_session() as session:
+        clues = session.query(Clue.id, Clue.text, Clue.answer).order_by(Clue.id).all()
+        index = build_clue_index(session)
+
+    answers = {cid: answer for cid, _, answer in clues}
+    for clue_id, _, answer in clues:
+        result = index.similar(clue_id, limit=5)
+        expected = _brute_force_scores(clues, clue_id)
+
+        # The top five by score, highest first; the index keeps float32 weights
+        similar = result['similar']
+        assert len(similar) == min(5, len(expected))
+        for cid, score in similar:
+            assert abs(score - expected[cid]) < 1e-5
+        scores = [score for _, score in similar]
+        assert scores == sorted(scores, reverse=True)
+        returned = {cid for cid, _ in similar}
+        assert all(score <= min(scores) + 1e-5 for cid, score in expected.items() if cid not in returned)
+
+        same = {cid for cid, a in answers.items() if a == answer and cid != clue_id}
+        assert result['same_answer_total'] == len(same)
+        assert {cid for cid, _ in result['same_answer']} <= same
+        assert len(result['same_answer']) == min(5, len(same))
+    assert index.similar(10 ** 6) is None
+
+def test_saved_index_is_memory_mapped(db, archive):
+    _load_corpus(archive, count=3)
+    index = write_clue_index()
+    loaded = load_clue_index(clue_index._version_path(index.version))
+
+    assert isinstance(loaded.term_docs, np.memmap)
+    for clue_id in index.clue_ids[:10].tolist():
+        assert loaded.similar(clue_id) == index.similar(clue_id)
+
+def test_similar_routes(client, puzzles):
+    puzzle_ids = puzzles(4)
+    body = client.get(f'/api/puzzles/{puzzle_ids[0]}/clues/across/4/similar').get_json()
+    assert (body['clue']['answer'], body['clue']['puzzle_id']) == ('ORE', puzzle_ids[0])
+    assert [(clue['answer'], clue['puzzle_id']) for clue in body['same_answer']] == [('ORE', puzzle_ids[3])]
+    assert body['same_answer_total'] == 1
+
+    same = client.get(f"/api/clues/{body['clue']['id']}/similar", query_string={'limit': 1}).get_json()
+    assert same['clue'] == body['clue'] and len(same['similar']) == 1
+    assert client.get('/api/clues/999999/similar').status_code == 404
+    assert client.get(f'/api/puzzles/{puzzle_ids[0]}/clues/across/9/similar').status_code == 404
@@ -0,0 +1,29 @@
+from datetime import date, timedelta
+from grid_wit.config.database import get_db_session
+from grid_wit.models.user import DailyPuzzleHistory
+from grid_wit.utils.daily import schedule_daily_puzzle
+
+def test_every_puzzle_is_served_once_per_cycle(db, puzzles):
+    puzzle_ids = puzzles(4)
+    days = [date(2024, 1, 1) + timedelta(days=i) for i in range(9)]
+
+    with get_db_session() as session:
+        picks = [schedule_daily_puzzle(session, day) for day in days]
+        assert [schedule_daily_puzzle(session, day) for day in days] == picks
+
+    assert sorted(picks[:4]) == sorted(puzzle_ids)
+    assert sorted(picks[4:8]) == sorted(puzzle_ids)
+    with get_db_session() as session:
+        cycles = [cycle for (cycle,) in session.query(DailyPuzzleHistory.cycle_number).order_by(DailyPuzzleHistory.served_on)]
+    assert cycles == [1] * 4 + [2] * 4 + [3]
+
+def test_daily_route(client, puzzles):
+    assert client.get('/api/puzzles/daily').status_code == 404
+
+    puzzle_ids = puzzles(2)
+    first = client.get('/api/puzzles/daily').get_json()
+    assert first['id'] in puzzle_ids and len(first['clues']) == 6
+    assert client.get('/api/puzzles/daily').get_json() == first
+
+    compact = client.get('/api/puzzles/daily', query_string={'grid_format': 'compact'}).get_json()
+    assert compact['id'] == first['id'] and len(compact['grid']) == 9
@@ -0,0 +1,132 @@
+import os
+import pytest
+from grid_wit.config.database import get_db_session
+from grid_wit.models.puzzle import Puzzle, Clue, ImportManifest
+from grid_wit.utils.corpus import get_corpus_version
+from grid_wit.utils import data_loader
+from grid_wit.utils.data_loader import load_puzzles_from_json, sync_puzzles_from_json
+
+def _corpus(session):
+    """{date: sorted clue tuples} for everything stored"""
+    rows = session.query(Puzzle.date_published, Clue.direction, Clue.number, Clue.text, Clue.answer, Clue.row, Clue.column).join(
+        Clue, Clue.puzzle_id == Puzzle.id
+    ).order_by(Puzzle.date_published, Clue.direction, Clue.number)
+    corpus = {}
+    for date, *clue in rows:
+        corpus.setdefault(date, []).append(tuple(clue))
+    return corpus
+
+def test_bulk_import_matches_row_by_row_import(db, archive):
+    archive('2020-01-01')
+    archive('2020-01-02', rows=('DOG', 'ONE', 'TEN'))
+    archive('2020-02-01', rows=('AB.', 'CDE', '.FG'))
+
+    load_puzzles_from_json(archive.root, workers=1)
+    with get_db_session() as session:
+        expected = _corpus(session)
+
+    assert load_puzzles_from_json(archive.root, bulk=True, batch_size=2, workers=1) == 3
+    with get_db_session() as session:
+        assert _corpus(session) == expected
+        assert session.query(ImportManifest).count() == 3
+
+    assert sorted(expected) == ['2020-01-01', '2020-01-02', '2020-02-01']
+    assert expected['2020-01-01'][0] == ('across', 1, 'Clue for cat', 'CAT', 0, 0)
+    assert ('down', 2, 'Clue for bdf', 'BDF', 0, 1) in expected['2020-02-01']
+
+def test_bulk_import_skips_unparseable_files(db, archive):
+    archive('2020-01-01')
+    archive('2020-01-02', name='broken', data='{"date": ')
+    archive('2020-01-03', rows=('DOG', 'ONE', 'TEN'))
+
+    assert load_puzzles_from_json(archive.root, bulk=True, workers=1) == 2
+    with get_db_session() as session:
+        assert sorted(_corpus(session)) == ['2020-01-01', '2020-01-03']
+
+def test_sync_imports_new_and_changed_files_only(db, archive):
+    first = archive('2020-01-01')
+    archive('2020-01-02', rows=('DOG', 'ONE', 'TEN'))
+    assert sync_puzzles_from_json(archive.root, workers=1) == 2
+    assert get_corpus_version() == 1
+
+    assert sync_puzzles_from_json(archive.root, workers=1) == 0
+    assert get_corpus_version() == 1
+
+    # Rewritten with the same content: only the manifest entry is refreshed
+    os.utime(first, (0, 0))
+    assert sync_puzzles_from_json(archive.root, workers=1) == 0
+
+    archive('2020-01-01', rows=('BAT', 'ORE', 'WED'), author='New Author')
+    archive('2020-01-03', rows=('AB.', 'CDE', '.FG'))
+    assert sync_puzzles_from_json(archive.root, workers=1) == 2
+    assert get_corpus_version() == 2
+
+    with get_db_session() as session:
+        corpus = _corpus(session)
+        assert sorted(corpus) == ['2020-01-01', '2020-01-02', '2020-01-03']
+        assert [clue[3] for clue in corpus['2020-01-01']] == ['BAT', 'ORE', 'WED', 'BOW', 'ARE', 'TED']
+        assert session.query(Puzzle.author).filter(Puzzle.date_published == '2020-01-01').scalar() == 'New Author'
+        assert session.query(Puzzle).count() == 3
+        assert session.query(ImportManifest).count() == 3
+
+def test_sync_keeps_last_file_for_a_duplicate_date(db, archive):
+    archive('2020-01-01', name='a')
+    archive('2020-01-01', rows=('DOG', 'ONE', 'TEN'), name='b')
+
+    assert sync_puzzles_from_json(archive.root, workers=1) == 2
+    with get_db_session() as session:
+        corpus = _corpus(session)
+        assert [clue[3] for clue in corpus['2020-01-01']] == ['DOG', 'ONE', 'TEN', 'DOT', 'ONE', 'GEN']
+        assert session.query(Clue).count() == 6
+
+    # Both files are recorded, so the dropped one is not re-imported over the kept one
+    assert sync_puzzles_from_json(archive.root, workers=1) == 0
+    with get_db_session() as session:
+        assert session.query(ImportManifest).count() == 2
+
+def test_bulk_import_keeps_last_file_for_a_duplicate_date(db, archive):
+    archive('2020-01-01', name='a')
+    archive('2020-01-01', rows=('DOG', 'ONE', 'TEN'), name='b')
+    archive('2020-01-02', rows=('AB.', 'CDE', '.FG'))
+    archive('2020-01-02', rows=('BAT', 'ORE', 'WED'), name='z')
+
+    # The first duplicate shares a batch with its original, the second lands in a later batch
+    assert load_puzzles_from_json(archive.root, bulk=True, batch_size=3, workers=1) == 2
+    with get_db_session() as session:
+        corpus = _corpus(session)
+        assert [clue[3] for clue in corpus['2020-01-01']] == ['DOG', 'ONE', 'TEN', 'DOT', 'ONE', 'GEN']
+        assert [clue[3] for clue in corpus['2020-01-02']] == ['BAT', 'ORE', 'WED', 'BOW', 'ARE', 'TED']
+        assert session.query(Clue).count() == 12
+        assert session.query(ImportManifest).count() == 4
+
+def test_bulk_import_skips_files_that_fail_to_write(db, archive, monkeypatch):
+    archive('2020-01-01')
+    archive('2020-01-02', rows=('DOG', 'ONE', 'TEN'))
+    archive('2020-01-03', rows=('AB.', 'CDE', '.FG'))
+
+    copy_rows = data_loader._copy_rows
+    def failing_copy_rows(session, model, columns, rows):
+        if any(row.get('date_published') == '2020-01-02' for row in rows):
+            raise RuntimeError("write failed")
+        copy_rows(session, model, columns, rows)
+    monkeypatch.setattr(data_loader, '_copy_rows', failing_copy_rows)
+
+    assert load_puzzles_from_json(archive.root, bulk=True, workers=1) == 2
+    with get_db_session() as session:
+        assert sorted(_corpus(session)) == ['2020-01-01', '2020-01-03']
+        assert session.query(Clue).count() == 12
+
+def test_failed_bulk_import_keeps_the_previous_corpus(db, archive, monkeypatch):
+    archive('2020-01-01')
+    load_puzzles_from_json(archive.root, bulk=True, workers=1)
+    archive('2020-01-02', rows=('DOG', 'ONE', 'TEN'))
+
+    def failing_rebuild(session):
+        raise RuntimeError("statistics failed")
+    monkeypatch.setattr(data_loader, 'rebuild_stats', failing_rebuild)
+
+    with pytest.raises(RuntimeError):
+        load_puzzles_from_json(archive.root, bulk=True, workers=1)
+    with get_db_session() as session:
+        assert sorted(_corpus(session)) == ['2020-01-01']
+        assert session.query(ImportManifest).count() == 1
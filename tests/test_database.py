@@ -0,0 +1,83 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool
+from grid_wit import create_app
+from grid_wit.config import database
+from grid_wit.config.pool import InstrumentedQueuePool, CHECKOUT_TIMEOUTS, pool_status
+
+def test_engine_is_created_on_first_use(tmp_path):
+    database.configure_engine(f"sqlite:///{tmp_path / 'lazy.db'}")
+    try:
+        create_app()
+        assert database._engine is None
+
+        engine = database.get_engine()
+        assert str(engine.url).endswith('lazy.db')
+        assert database.get_engine() is engine
+    finally:
+        database.dispose_engine()
+        database.configure_engine()
+
+def test_forked_child_gets_its_own_engine(tmp_path, monkeypatch):
+    database.configure_engine(f"sqlite:///{tmp_path / 'fork.db'}")
+    try:
+        parent = database.get_engine()
+        database._reset_after_fork()
+        monkeypatch.setattr(database.os, 'getpid', lambda: -1)
+
+        child = database.get_engine()
+        assert child is not parent
+        assert database._engine_pid == -1
+    finally:
+        monkeypatch.undo()
+        database.dispose_engine()
+        parent.dispose()
+        database.configure_engine()
+
+def test_sessions_roll_back_on_error(db):
+    with database.get_db_session() as session:
+        session.execute(text("CREATE TABLE scratch (value INTEGER)"))
+
+    with pytest.raises(RuntimeError):
+        with database.get_db_session() as session:
+            session.execute(text("INSERT INTO scratch VALUES (1)"))
+            raise RuntimeError("boom")
+
+    with database.get_db_session() as session:
+        assert session.execute(text("SELECT count(*) FROM scratch")).scalar() == 0
+
+def test_pool_options_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv('DB_POOL_SIZE', '3')
+    monkeypatch.setenv('DB_POOL_PRE_PING', 'off')
+    options = database._engine_options('postgresql://localhost/test')
+    assert options['poolclass'] is InstrumentedQueuePool
+    assert (options['pool_size'], options['max_overflow'], options['pool_pre_ping']) == (3, 5, False)
+
+    monkeypatch.setenv('DB_POOL_MODE', 'null')
+    options = database._engine_options('postgresql://localhost/test')
+    assert (options['poolclass'], options['pool_pre_ping']) == (NullPool, False)
+    assert database._engine_options('sqlite://') == {}
+
+def test_pool_metrics_record_checkout_timeouts(tmp_path):
+    database.configure_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.01
+    )
+    try:
+        engine = database.get_engine()
+        timeouts = CHECKOUT_TIMEOUTS.value()
+        with engine.connect():
+            assert pool_status()['checked_out'] == 1
+            with pytest.raises(PoolTimeoutError):
+                engine.connect()
+        status = pool_status()
+        assert status['pool_class'] == 'InstrumentedQueuePool'
+        assert (status['checked_out'], status['checkout_timeouts']) == (0, timeouts + 1)
+    finally:
+        database.dispose_engine()
+        database.configure_engine()
+
+def test_pool_metrics_route(client):
+    body = client.get('/api/metrics/pool').get_json()
+    assert body['pid'] > 0 and 'checkout_wait' in body
@@ -0,0 +1,31 @@
+import json
+from grid_wit.config.database import get_db_session
+from grid_wit.utils.export import iter_export
+
+def _lines(response):
+    assert response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+def test_export_streams_every_puzzle_oldest_first(client, puzzles):
+    puzzle_ids = puzzles(4)
+
+    lines = _lines(client.get('/api/export/puzzles'))
+    assert [puzzle['id'] for puzzle in lines] == puzzle_ids
+    assert (lines[0]['grid'], lines[0]['gridnums'][:3]) == ('CATOREWED', [1, 2, 3])
+    assert [clue['answer'] for clue in lines[2]['clues']] == ['AB', 'CDE', 'FG', 'AC', 'BDF', 'EG']
+
+    # Clues stay with their puzzles across batch boundaries
+    with get_db_session() as session:
+        assert list(iter_export(session, batch_size=3)) == lines
+
+def test_export_date_range(client, puzzles):
+    puzzle_ids = puzzles(4)
+    lines = _lines(client.get('/api/export/puzzles', query_string={'start': '2020-01-02', 'end': '2020-01-03'}))
+    assert [puzzle['id'] for puzzle in lines] == puzzle_ids[1:3]
+
+    lines = _lines(client.get('/api/export/puzzles', query_string={'grid_format': 'array', 'start': '2020-01-04'}))
+    assert [puzzle['grid'] for puzzle in lines] == [list('BATOREWED')]
+
+def test_export_rejects_bad_parameters(client):
+    assert client.get('/api/export/puzzles', query_string={'start': '1/2/2020'}).status_code == 400
+    assert client.get('/api/export/puzzles', query_string={'grid_format': 'bogus'}).status_code == 400
@@ -0,0 +1,111 @@
+import itertools
+import random
+import pytest
+from grid_wit.config.database import get_db_session
+from grid_wit.models.generation import GenerationJob
+from grid_wit.utils.answer_index import AnswerIndex
+from grid_wit.utils.generator import GridFiller, parse_template, run_generation_job, get_generation_job
+
+def _brute_force_fill(words, template):
+    """Whether any fill of a 3x3 template uses distinct words from `words`"""
+    present = set(words)
+    if template == ['???', '???', '???']:
+        for rows in itertools.permutations(words, 3):
+            columns = [''.join(row[i] for row in rows) for i in range(3)]
+            if all(column in present for column in columns) and len(set(rows) | set(columns)) == 6:
+                return True
+        return False
+    # ['???', '?.?', '???']: two across and two down words around a black center
+    for top, bottom in itertools.permutations(words, 2):
+        for left, right in itertools.permutations(words, 2):
+            if (left[0], right[0], left[2], right[2]) == (top[0], top[2], bottom[0], bottom[2]) \
+                    and len({top, bottom, left, right}) == 4:
+                return True
+    return False
+
+def test_filler_agrees_with_brute_force():
+    rng = random.Random(3)
+    for trial in range(120):
+        words = sorted({''.join(rng.choice('ABCD') for _ in range(3)) for _ in range(rng.randint(3, 14))})
+        template = ['???', '???', '???'] if trial % 2 else ['???', '?.?', '???']
+        cells, rows, cols = parse_template(template)
+
+        filler = GridFiller(AnswerIndex([(word, 1, []) for word in words]), cells, rows, cols, seed=trial)
+        try:
+            choices = filler.fill(5)
+        except ValueError:
+            filled = False
+        else:
+            filled = True
+            answers = [filler.buckets[slot].answers[choice] for slot, choice in enumerate(choices)]
+            assert len(set(answers)) == len(answers)
+            for (_, _, slot_cells), answer in zip(filler.slots, answers):
+                for cell, letter in zip(slot_cells, answer):
+                    assert cells[cell] in (None, letter)
+                    cells[cell] = letter
+        assert filled == _brute_force_fill(words, template), (trial, words)
+
+def test_filler_respects_prefilled_letters():
+    index = AnswerIndex([(word, 1, []) for word in ('CAT', 'ORE', 'WED', 'COW', 'ARE', 'TED', 'BAT', 'BOW')])
+    cells, rows, cols = parse_template(['B??', '???', '???'])
+    filler = GridFiller(index, cells, rows, cols, seed=1)
+    answers = [filler.buckets[slot].answers[choice] for slot, choice in enumerate(filler.fill(5))]
+    assert set(answers) == {'BAT', 'ORE', 'WED', 'BOW', 'ARE', 'TED'}
+
+@pytest.mark.parametrize('template, message', [
+    ('???', 'list of row strings'),
+    (['??', '??'], 'between'),
+    (['???', '??', '???'], 'same length'),
+    (['???', '?!?', '???'], 'Invalid template cell'),
+    (['?.?', '...', '?.?'], 'at least two letters'),
+])
+def test_parse_template_rejects(template, message):
+    with pytest.raises(ValueError, match=message):
+        parse_template(template)
+
+def test_parse_template_cells():
+    cells, rows, cols = parse_template(['a?.', '#_?', '???'])
+    assert (rows, cols) == (3, 3)
+    assert cells[:6] == ['A', None, '.', '.', None, None]
+
+@pytest.mark.parametrize('payload', [
+    {},
+    {'template': ['???', '?!?', '???']},
+    {'template': ['???'] * 3, 'seed': -1},
+    {'template': ['???'] * 3, 'seed': 2 ** 31},
+    {'template': ['???'] * 3, 'seed': 'abc'},
+    {'template': ['???'] * 3, 'time_budget': 0},
+    {'template': ['???'] * 3, 'time_budget': 3600},
+])
+def test_generate_rejects_bad_requests(client, payload):
+    response = client.post('/api/generate', json=payload)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+def test_generation_job_fills_from_the_corpus(client, puzzles):
+    result_ids = set(puzzles(4))
+    with get_db_session() as session:
+        session.add(GenerationJob(id='a' * 32, status='queued', template=['C??', '???', '???'], time_budget=5, seed=7))
+
+    run_generation_job('a' * 32)
+
+    response = client.get(f'/api/generate/{"a" * 32}')
+    assert response.status_code == 200
+    job = response.get_json()
+    assert job['status'] == 'done' and job['seed'] == 7
+    result = job['result']
+    assert {clue['answer'] for clue in result['clues']} == {'CAT', 'ORE', 'WED', 'COW', 'ARE', 'TED'}
+    assert all(clue['text'] and clue['source_puzzle_id'] in result_ids for clue in result['clues'])
+    assert result['gridnums'][:3] == [1, 2, 3]
+
+def test_generation_job_records_a_missing_fill(db, puzzles):
+    puzzles(4)
+    with get_db_session() as session:
+        session.add(GenerationJob(id='b' * 32, status='queued', template=['Z??', '???', '???'], time_budget=5, seed=7))
+
+    run_generation_job('b' * 32)
+
+    with get_db_session() as session:
+        job = get_generation_job(session, 'b' * 32)
+    assert job['status'] == 'failed'
+    assert 'no fill' in job['error']
@@ -0,0 +1,40 @@
+import json
+import pytest
+from grid_wit.utils.data_loader import load_puzzles_from_json
+from grid_wit.utils.grid_codec import grid_columns, grid_fields, pack_gridnums, unpack_gridnums
+from conftest import source_puzzle
+
+CELLS = ['C', 'A', 'T', '.', 'R', 'E', 'W', 'E', 'D']
+GRIDNUMS = [1, 2, 3, 0, 4, 0, 5, 0, 0]
+
+def test_gridnums_round_trip():
+    packed = pack_gridnums([0, 1, 300, 65535])
+    assert packed == b'\x00\x00\x01\x00\x2c\x01\xff\xff'
+    assert unpack_gridnums(packed) == [0, 1, 300, 65535]
+
+@pytest.mark.parametrize('cells, compact', [(CELLS, 'CAT.REWED'), (['CAT'] + CELLS[1:], None)])
+def test_grid_fields_match_the_legacy_column(cells, compact):
+    columns = grid_columns(cells, GRIDNUMS)
+    assert columns['grid_compact'] == compact
+    assert (columns['grid'] is None) == (compact is not None)
+
+    stored = (columns['grid'], columns['grid_compact'], columns['gridnums'])
+    assert json.loads(grid_fields(*stored, 'legacy', 3, 3)['grid']) == cells
+    assert grid_fields(*stored, 'array', 3, 3) == {"rows": 3, "cols": 3, "grid": cells, "gridnums": GRIDNUMS}
+    assert grid_fields(*stored, 'compact', 3, 3)['grid'] == (compact or cells)
+
+def test_grid_formats_in_responses(client, archive):
+    rebus = source_puzzle('2020-01-02')
+    rebus['grid'][0] = 'CAT'
+    archive('2020-01-01')
+    archive('2020-01-02', data=json.dumps(rebus))
+    load_puzzles_from_json(archive.root, bulk=True, workers=1)
+
+    plain, compound = client.get('/api/puzzles', query_string={'order': 'asc'}).get_json()['puzzles']
+    body = client.get(f"/api/puzzles/{plain['id']}", query_string={'grid_format': 'compact'}).get_json()
+    assert (body['grid'], body['gridnums']) == ('CATOREWED', [1, 2, 3, 4, 0, 0, 5, 0, 0])
+    body = client.get(f"/api/puzzles/{compound['id']}", query_string={'grid_format': 'compact'}).get_json()
+    assert body['grid'][:2] == ['CAT', 'A']
+    body = client.get(f"/api/puzzles/{compound['id']}").get_json()
+    assert json.loads(body['grid'])[0] == 'CAT'
+    assert client.get(f"/api/puzzles/{plain['id']}", query_string={'grid_format': 'bogus'}).status_code == 400
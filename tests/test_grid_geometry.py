@@ -0,0 +1,85 @@
+import random
+import pytest
+from grid_wit.utils.data_loader import load_puzzles_from_json
+from grid_wit.utils.grid_geometry import GridGeometry, BLACK_SQUARE, grid_dimensions
+
+def _naive_slots(cells, rows, cols):
+    """Standard crossword numbering by scanning cells: {direction: [(number, row, column, length)]}"""
+    def white(row, col):
+        return 0 <= row < rows and 0 <= col < cols and cells[row * cols + col] != BLACK_SQUARE
+
+    def length(row, col, dr, dc):
+        count = 0
+        while white(row + count * dr, col + count * dc):
+            count += 1
+        return count
+
+    slots = {'across': [], 'down': []}
+    number = 0
+    for row in range(rows):
+        for col in range(cols):
+            if not white(row, col):
+                continue
+            across = not white(row, col - 1) and length(row, col, 0, 1) >= 2
+            down = not white(row - 1, col) and length(row, col, 1, 0) >= 2
+            if across or down:
+                number += 1
+            if across:
+                slots['across'].append((number, row, col, length(row, col, 0, 1)))
+            if down:
+                slots['down'].append((number, row, col, length(row, col, 1, 0)))
+    return slots
+
+def test_slots_match_a_cell_scan():
+    rng = random.Random(11)
+    for _ in range(200):
+        rows, cols = rng.randint(1, 21), rng.randint(1, 21)
+        cells = [BLACK_SQUARE if rng.random() < 0.3 else 'A' for _ in range(rows * cols)]
+        geometry = GridGeometry(cells, rows, cols)
+        expected = _naive_slots(cells, rows, cols)
+
+        for direction in ('across', 'down'):
+            slots = geometry.slots(direction)
+            assert slots == expected[direction]
+
+            slot_cells, slot_index = geometry.slot_cells(direction)
+            covering = geometry.across_number if direction == 'across' else geometry.down_number
+            step = 1 if direction == 'across' else cols
+            position = 0
+            for index, (number, row, col, length) in enumerate(slots):
+                start = row * cols + col
+                assert slot_cells[position:position + length].tolist() == [start + i * step for i in range(length)]
+                assert set(slot_index[position:position + length].tolist()) == {index}
+                assert set(covering[slot_cells[position:position + length]].tolist()) == {number}
+                position += length
+            assert position == len(slot_cells) == int((covering > 0).sum())
+
+        numbers = {number for slots in expected.values() for number, *_ in slots}
+        assert sorted(number for number in geometry.numbers.tolist() if number) == sorted(numbers)
+
+@pytest.mark.parametrize('data, expected', [
+    ({'grid': ['A'] * 225}, (15, 15)),
+    ({'grid': ['A'] * 441, 'size': {'rows': 21, 'cols': 21}}, (21, 21)),
+    ({'grid': ['A'] * 40, 'size': {'rows': 5, 'cols': 8}}, (5, 8)),
+])
+def test_grid_dimensions(data, expected):
+    assert grid_dimensions(data) == expected
+
+def test_grid_dimensions_rejects_a_mismatch():
+    with pytest.raises(ValueError):
+        grid_dimensions({'grid': ['A'] * 40, 'size': {'rows': 6, 'cols': 8}})
+    with pytest.raises(ValueError):
+        GridGeometry(['A'] * 8, 3, 3)
+
+def test_non_square_puzzles_import(client, archive):
+    archive('2020-01-01', rows=('STAR.', 'TONES', '.PEAS'))
+    load_puzzles_from_json(archive.root, bulk=True, workers=1)
+
+    puzzle_id = client.get('/api/puzzles').get_json()['puzzles'][0]['id']
+    body = client.get(f'/api/puzzles/{puzzle_id}', query_string={'grid_format': 'array'}).get_json()
+    assert (body['rows'], body['cols']) == (3, 5)
+    assert [(clue['number'], clue['direction'], clue['answer'], clue['row'], clue['column']) for clue in body['clues']] == [
+        (1, 'across', 'STAR', 0, 0), (5, 'across', 'TONES', 1, 0), (7, 'across', 'PEAS', 2, 1),
+        (1, 'down', 'ST', 0, 0), (2, 'down', 'TOP', 0, 1), (3, 'down', 'ANE', 0, 2),
+        (4, 'down', 'REA', 0, 3), (6, 'down', 'SS', 1, 4),
+    ]
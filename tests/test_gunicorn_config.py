@@ -0,0 +1,46 @@
+import multiprocessing
+import os
+import runpy
+import pytest
+
+CONFIG = os.path.join(os.path.dirname(__file__), os.pardir, 'gunicorn.conf.py')
+
+@pytest.fixture
+def load_config(monkeypatch):
+    """Evaluate gunicorn.conf.py under the given environment, returning its settings and the pool variables"""
+    def load(**env):
+        # The config writes pool defaults into the environment, so give it a copy
+        environ = {name: value for name, value in os.environ.items() if not name.startswith(('GUNICORN_', 'DB_'))}
+        monkeypatch.setattr(os, 'environ', {**environ, **env})
+        monkeypatch.setattr(multiprocessing, 'cpu_count', lambda: 16)
+        config = runpy.run_path(CONFIG)
+        return config, os.getenv('DB_POOL_SIZE'), os.getenv('DB_MAX_OVERFLOW')
+    return load
+
+def _total_connections(config, pool_size, max_overflow):
+    return config['workers'] * (int(pool_size) + int(max_overflow))
+
+def test_sync_workers_get_one_connection_each(load_config):
+    config, pool_size, max_overflow = load_config()
+    assert (config['worker_class'], config['workers'], config['threads']) == ('sync', 33, 1)
+    assert (pool_size, max_overflow) == ('1', '0')
+    assert _total_connections(config, pool_size, max_overflow) == 33
+
+def test_thread_workers_size_the_pool_to_their_threads(load_config):
+    config, pool_size, max_overflow = load_config(GUNICORN_WORKER_CLASS='gthread', GUNICORN_THREADS='6')
+    assert (config['workers'], config['threads']) == (16, 6)
+    assert (pool_size, max_overflow) == ('6', '0')
+    assert _total_connections(config, pool_size, max_overflow) == 96
+
+def test_gevent_workers_share_a_small_pool(load_config):
+    config, pool_size, max_overflow = load_config(GUNICORN_WORKER_CLASS='gevent')
+    assert (config['workers'], config['worker_connections']) == (16, 1000)
+    assert (pool_size, max_overflow) == ('4', '0')
+    assert _total_connections(config, pool_size, max_overflow) == 64
+
+    config, pool_size, max_overflow = load_config(GUNICORN_WORKER_CLASS='gevent', GUNICORN_GEVENT_DB_CONNECTIONS='2')
+    assert _total_connections(config, pool_size, max_overflow) == 32
+
+def test_explicit_pool_settings_win(load_config):
+    _, pool_size, max_overflow = load_config(GUNICORN_WORKER_CLASS='gevent', DB_POOL_SIZE='8', DB_MAX_OVERFLOW='2')
+    assert (pool_size, max_overflow) == ('8', '2')
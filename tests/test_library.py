@@ -0,0 +1,63 @@
+import pytest
+from datetime import datetime, timezone
+from grid_wit.config.database import get_db_session
+from grid_wit.models.user import User, SavedPuzzle
+
+@pytest.fixture
+def user(db):
+    with get_db_session() as session:
+        user = User(username='solver', email='solver@example.com')
+        session.add(user)
+        session.flush()
+        return user.id
+
+def _pages(client, url, per_page, **params):
+    """Puzzle IDs page by page, following next_cursor to the end"""
+    pages, cursor = [], None
+    while True:
+        params.update(per_page=per_page, **({'cursor': cursor} if cursor else {}))
+        response = client.get(url, query_string=params)
+        assert response.status_code == 200
+        body = response.get_json()
+        pages.append([entry['puzzle_id'] for entry in body['puzzles']])
+        cursor = body['next_cursor']
+        if cursor is None:
+            return pages
+        assert len(pages) <= 10, "cursor did not advance"
+
+def test_library_pages_newest_first(client, user, puzzles):
+    puzzle_ids = puzzles(6)
+    for puzzle_id in puzzle_ids:
+        assert client.put(f'/api/users/{user}/puzzles/{puzzle_id}', json={'cells': 'C        '}).status_code == 200
+    newest_first = puzzle_ids[::-1]
+
+    assert _pages(client, f'/api/users/{user}/puzzles', 2) == [newest_first[0:2], newest_first[2:4], newest_first[4:6]]
+    assert _pages(client, f'/api/users/{user}/puzzles', 4) == [newest_first[0:4], newest_first[4:6]]
+
+    # Playing a puzzle again moves it to the front
+    client.patch(f'/api/users/{user}/puzzles/{puzzle_ids[0]}', json={'cells': [{'row': 0, 'col': 1, 'value': 'A'}]})
+    assert _pages(client, f'/api/users/{user}/puzzles', 6) == [[puzzle_ids[0]] + newest_first[:5]]
+
+def test_library_breaks_last_played_ties_by_id(client, user, puzzles):
+    puzzle_ids = puzzles(5)
+    for puzzle_id in puzzle_ids:
+        client.put(f'/api/users/{user}/puzzles/{puzzle_id}', json={'cells': 'C        '})
+    with get_db_session() as session:
+        session.query(SavedPuzzle).update({'last_played': datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)})
+
+    pages = _pages(client, f'/api/users/{user}/puzzles', 2)
+    assert [puzzle for page in pages for puzzle in page] == puzzle_ids[::-1]
+    assert len(pages) == 3
+
+def test_library_filters_by_status(client, user, puzzles):
+    puzzle_ids = puzzles(5)
+    for index, puzzle_id in enumerate(puzzle_ids):
+        client.put(f'/api/users/{user}/puzzles/{puzzle_id}', json={'cells': 'C        ', 'completed': index % 2 == 0})
+
+    completed = _pages(client, f'/api/users/{user}/puzzles', 2, status='completed')
+    assert [puzzle for page in completed for puzzle in page] == [puzzle_ids[4], puzzle_ids[2], puzzle_ids[0]]
+    in_progress = _pages(client, f'/api/users/{user}/puzzles', 1, status='in_progress')
+    assert in_progress == [[puzzle_ids[3]], [puzzle_ids[1]]]
+
+    assert client.get(f'/api/users/{user}/puzzles?status=bogus').status_code == 400
+    assert client.get(f'/api/users/{user}/puzzles?cursor=nonsense').status_code == 400
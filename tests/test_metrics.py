@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from grid_wit.api import instrumentation
+from grid_wit.config.database import get_db_session
+from grid_wit.utils.metrics import Counter, Histogram, render_prometheus, REGISTRY
+
+def test_render_prometheus(monkeypatch):
+    monkeypatch.setattr('grid_wit.utils.metrics.REGISTRY', [])
+    requests = Counter('test_requests_total', "Requests", labels=('route',))
+    latency = Histogram('test_latency_seconds', "Latency", buckets=(0.1, 1.0))
+    requests.inc(route='/a "b"')
+    requests.inc(2, route='/a "b"')
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    assert render_prometheus([requests, latency]).splitlines() == [
+        '# HELP test_requests_total Requests',
+        '# TYPE test_requests_total counter',
+        'test_requests_total{route="/a \\"b\\""} 3',
+        '# HELP test_latency_seconds Latency',
+        '# TYPE test_latency_seconds histogram',
+        'test_latency_seconds_bucket{le="0.1"} 1',
+        'test_latency_seconds_bucket{le="1.0"} 2',
+        'test_latency_seconds_bucket{le="+Inf"} 3',
+        'test_latency_seconds_sum 5.55',
+        'test_latency_seconds_count 3',
+    ]
+    assert requests not in REGISTRY
+
+def test_requests_are_instrumented(client, puzzles, monkeypatch):
+    puzzle_id = puzzles(1)[0]
+    route = '/api/puzzles/<int:puzzle_id>'
+    before = instrumentation.REQUESTS.value(method='GET', route=route, status=200)
+
+    response = client.get(f'/api/puzzles/{puzzle_id}')
+    assert 'queries"' in response.headers['Server-Timing']
+    assert instrumentation.REQUESTS.value(method='GET', route=route, status=200) == before + 1
+    assert instrumentation.REQUEST_QUERIES.snapshot()[(route,)]['count'] >= 1
+
+    # A tiny threshold (0 turns the log off) makes every statement slow
+    monkeypatch.setattr(instrumentation, 'SLOW_QUERY_MS', 1e-9)
+    slow = instrumentation.SLOW_QUERIES.value(route='/api/puzzles')
+    client.get('/api/puzzles', query_string={'per_page': 7})
+    assert instrumentation.SLOW_QUERIES.value(route='/api/puzzles') > slow
+
+    body = client.get('/api/metrics').get_data(as_text=True)
+    assert f'http_requests_total{{method="GET",route="{route}",status="200"}}' in body
+    assert '# TYPE db_query_duration_seconds histogram' in body
+
+def test_failed_statements_leave_no_timing_state(app, db):
+    with get_db_session() as session:
+        connection = session.connection()
+        with pytest.raises(OperationalError):
+            with session.begin_nested():
+                session.execute(text('SELECT * FROM no_such_table'))
+        count = instrumentation.QUERY_LATENCY.snapshot()[()]['count']
+        session.execute(text('SELECT 1'))
+        assert instrumentation.QUERY_LATENCY.snapshot()[()]['count'] == count + 1
+        assert 'query_start_time' not in connection.info
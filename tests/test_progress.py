@@ -0,0 +1,99 @@
+import pytest
+from grid_wit.config.database import get_db_session
+from grid_wit.models.user import User, SavedPuzzle
+from grid_wit.utils import progress
+from grid_wit.utils.progress import get_puzzle_shape, encode_cells, decode_cells, parse_cell_deltas, save_progress, patch_progress
+
+@pytest.fixture
+def user(db):
+    with get_db_session() as session:
+        user = User(username='solver', email='solver@example.com')
+        session.add(user)
+        session.flush()
+        return user.id
+
+def _saved(user_id, puzzle_id):
+    with get_db_session() as session:
+        return session.query(SavedPuzzle.cells, SavedPuzzle.progress).filter(
+            SavedPuzzle.user_id == user_id, SavedPuzzle.puzzle_id == puzzle_id
+        ).one_or_none()
+
+def test_cells_round_trip():
+    progress = [['c', '', 'T'], [None, ' o ', 'R'], ['', '', '']]
+    cells = encode_cells(progress, 3, 3)
+    assert cells == 'C T OR   '
+    assert decode_cells(cells, 3) == [['C', '', 'T'], ['', 'O', 'R'], ['', '', '']]
+    assert encode_cells([['AB', '', ''], ['', '', ''], ['', '', '']], 3, 3) is None
+
+@pytest.mark.parametrize('progress', [
+    [['A', 1, ''], ['', '', ''], ['', '', '']],
+    [['A', '', ''], ['', ['B'], ''], ['', '', '']],
+])
+def test_non_string_cells_are_rejected(progress):
+    with pytest.raises(ValueError):
+        encode_cells(progress, 3, 3)
+
+def test_parse_cell_deltas_validates_and_sorts():
+    assert parse_cell_deltas([{'row': 2, 'col': 0, 'value': 'x'}, {'row': 0, 'col': 1, 'value': ''}], 3, 3) == [
+        (1, ' '), (6, 'X')
+    ]
+    for deltas in ([], [{'row': 3, 'col': 0, 'value': 'A'}], [{'row': 0, 'value': 'A'}],
+                   [{'row': 0, 'col': 0, 'value': 'AB'}], [{'row': 0, 'col': 0, 'value': 7}]):
+        with pytest.raises(ValueError):
+            parse_cell_deltas(deltas, 3, 3)
+
+def test_shape_cache_skips_unknown_puzzles(db, puzzles):
+    puzzle_id = puzzles(1)[0]
+    with get_db_session() as session:
+        assert get_puzzle_shape(session, puzzle_id) == (3, 3)
+        assert all(get_puzzle_shape(session, 10 ** 6 + n) is None for n in range(50))
+    assert progress._shapes == {puzzle_id: (3, 3)}
+
+def test_patch_splices_saved_cells(user, puzzles, monkeypatch):
+    puzzle_id = puzzles(1)[0]
+    with get_db_session() as session:
+        patch_progress(session, user, puzzle_id, [(0, 'C'), (8, 'D')], 9)
+    assert _saved(user, puzzle_id).cells == 'C       D'
+
+    with get_db_session() as session:
+        patch_progress(session, user, puzzle_id, [(1, 'A'), (2, 'T'), (8, ' ')], 9)
+    assert _saved(user, puzzle_id).cells == 'CAT      '
+
+    # Larger deltas take the read-modify-write path
+    monkeypatch.setattr(progress, 'MAX_SPLICED_CELLS', 2)
+    with get_db_session() as session:
+        patch_progress(session, user, puzzle_id, [(3, 'O'), (4, 'R'), (5, 'E')], 9)
+    assert _saved(user, puzzle_id).cells == 'CATORE   '
+
+def test_patch_converts_legacy_progress_and_keeps_rebus(user, puzzles):
+    puzzle_id = puzzles(1)[0]
+    legacy = [['C', 'A', ''], ['', '', ''], ['', '', '']]
+    with get_db_session() as session:
+        save_progress(session, user, puzzle_id, None, legacy)
+        patch_progress(session, user, puzzle_id, [(2, 'T')], 9)
+    assert _saved(user, puzzle_id) == ('CAT      ', None)
+
+    rebus = [['CAT', '', ''], ['', '', ''], ['', '', '']]
+    with get_db_session() as session:
+        save_progress(session, user, puzzle_id, None, rebus)
+    with pytest.raises(ValueError):
+        with get_db_session() as session:
+            patch_progress(session, user, puzzle_id, [(2, 'T')], 9)
+    assert _saved(user, puzzle_id) == (None, rebus)
+
+def test_progress_routes_reject_non_string_values(client, user, puzzles):
+    puzzle_id = puzzles(1)[0]
+    url = f'/api/users/{user}/puzzles/{puzzle_id}'
+
+    response = client.put(url, json={'progress': [['C', 5, ''], ['', '', ''], ['', '', '']]})
+    assert response.status_code == 400
+    response = client.patch(url, json={'cells': [{'row': 0, 'col': 0, 'value': 5}]})
+    assert response.status_code == 400
+    assert _saved(user, puzzle_id) is None
+
+    response = client.put(url, json={'progress': [['c', 'a', 't'], ['', '', ''], ['', '', '']]})
+    assert response.status_code == 200
+    assert response.get_json()['progress'][0] == ['C', 'A', 'T']
+    response = client.patch(url, json={'cells': [{'row': 1, 'col': 0, 'value': 'o'}], 'completed': False})
+    assert response.status_code == 200
+    assert _saved(user, puzzle_id).cells == 'CATO     '
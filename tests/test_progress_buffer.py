@@ -0,0 +1,123 @@
+import threading
+from contextlib import contextmanager
+import pytest
+from grid_wit.config.database import get_db_session
+from grid_wit.models.user import User, SavedPuzzle
+from grid_wit.utils import progress_buffer
+from grid_wit.utils.progress_buffer import ProgressWriteBuffer
+
+REBUS = [['CAT', '', ''], ['', '', ''], ['', '', '']]
+
+@pytest.fixture
+def buffer(db, monkeypatch):
+    # A long interval keeps the flush thread idle, so tests flush explicitly
+    buffer = ProgressWriteBuffer(interval=3600)
+    monkeypatch.setattr(progress_buffer, 'PROGRESS_WRITE_BEHIND', True)
+    monkeypatch.setattr(progress_buffer, '_buffer', buffer)
+    yield buffer
+    buffer.close()
+
+@pytest.fixture
+def user(db):
+    with get_db_session() as session:
+        user = User(username='solver', email='solver@example.com')
+        session.add(user)
+        session.flush()
+        return user.id
+
+def _saved(user_id, puzzle_id):
+    with get_db_session() as session:
+        return session.query(SavedPuzzle.cells, SavedPuzzle.progress, SavedPuzzle.completed).filter(
+            SavedPuzzle.user_id == user_id, SavedPuzzle.puzzle_id == puzzle_id
+        ).one_or_none()
+
+def test_writes_are_coalesced_until_flush(client, buffer, user, puzzles):
+    puzzle_id = puzzles(1)[0]
+    url = f'/api/users/{user}/puzzles/{puzzle_id}'
+
+    assert client.patch(url, json={'cells': [{'row': 0, 'col': 0, 'value': 'X'}]}).status_code == 202
+    assert client.put(url, json={'cells': 'CA       '}).status_code == 202
+    assert client.patch(url, json={'cells': [{'row': 0, 'col': 2, 'value': 't'}]}).status_code == 202
+    assert client.patch(url, json={'cells': [{'row': 2, 'col': 2, 'value': 'D'}]}).status_code == 202
+    assert buffer.pending_count() == 1
+    assert _saved(user, puzzle_id) is None
+
+    assert buffer.flush() == 1
+    assert _saved(user, puzzle_id) == ('CAT     D', None, False)
+
+def test_completion_writes_through(client, buffer, user, puzzles):
+    puzzle_id = puzzles(1)[0]
+    url = f'/api/users/{user}/puzzles/{puzzle_id}'
+
+    assert client.put(url, json={'cells': 'CATOREWE '}).status_code == 202
+    response = client.patch(url, json={'cells': [{'row': 2, 'col': 2, 'value': 'D'}], 'completed': True})
+    assert response.status_code == 200
+    assert buffer.pending_count() == 0
+    assert _saved(user, puzzle_id) == ('CATOREWED', None, True)
+
+def test_completion_waits_for_a_running_flush(buffer, user, puzzles, monkeypatch):
+    puzzle_id = puzzles(1)[0]
+    with get_db_session() as session:
+        buffer.save(session, user, puzzle_id, 'CAT      ')
+
+    # Hold the flush after it has taken the pending cells but before it commits them
+    taken, release = threading.Event(), threading.Event()
+
+    @contextmanager
+    def paused_session():
+        taken.set()
+        release.wait(5)
+        with get_db_session() as session:
+            yield session
+    monkeypatch.setattr(progress_buffer, 'get_db_session', paused_session)
+    flusher = threading.Thread(target=buffer.flush)
+    flusher.start()
+    assert taken.wait(5)
+
+    def complete():
+        with get_db_session() as session:
+            buffer.save(session, user, puzzle_id, 'CATOREWED', completed=True)
+    completer = threading.Thread(target=complete)
+    completer.start()
+    completer.join(0.2)
+    assert completer.is_alive()
+
+    release.set()
+    flusher.join(5)
+    completer.join(5)
+    assert _saved(user, puzzle_id) == ('CATOREWED', None, True)
+
+def test_library_reads_buffered_writes(client, buffer, user, puzzles):
+    puzzle_id = puzzles(1)[0]
+    client.put(f'/api/users/{user}/puzzles/{puzzle_id}', json={'cells': 'C        '})
+
+    library = client.get(f'/api/users/{user}/puzzles').get_json()
+    assert [entry['puzzle_id'] for entry in library['puzzles']] == [puzzle_id]
+    assert buffer.pending_count() == 0
+
+def test_patch_after_pending_rebus_save_is_rejected(client, buffer, user, puzzles):
+    puzzle_id = puzzles(1)[0]
+    url = f'/api/users/{user}/puzzles/{puzzle_id}'
+
+    assert client.put(url, json={'progress': REBUS}).status_code == 202
+    assert client.patch(url, json={'cells': [{'row': 0, 'col': 1, 'value': 'A'}]}).status_code == 400
+    completing = client.patch(url, json={'cells': [{'row': 0, 'col': 1, 'value': 'A'}], 'completed': True})
+    assert completing.status_code == 400
+
+    # The acknowledged rebus save survives and is written at the next flush
+    buffer.flush()
+    assert _saved(user, puzzle_id) == (None, REBUS, False)
+
+    # A full save replaces the pending rebus, after which deltas apply again
+    assert client.put(url, json={'progress': REBUS}).status_code == 202
+    assert client.put(url, json={'cells': 'C        '}).status_code == 202
+    assert client.patch(url, json={'cells': [{'row': 0, 'col': 1, 'value': 'A'}]}).status_code == 202
+    buffer.flush()
+    assert _saved(user, puzzle_id) == ('CA       ', None, False)
+
+def test_close_flushes_pending_writes(buffer, user, puzzles):
+    puzzle_id = puzzles(1)[0]
+    with get_db_session() as session:
+        buffer.patch(session, user, puzzle_id, [(4, 'R')], 9)
+    buffer.close()
+    assert _saved(user, puzzle_id) == ('    R    ', None, False)
@@ -0,0 +1,93 @@
+import pytest
+from grid_wit.api.pagination import encode_cursor
+
+def _pages(client, per_page, **params):
+    """Puzzle IDs page by page from /api/puzzles, following next_cursor to the end"""
+    pages, cursor = [], None
+    while True:
+        params.update(per_page=per_page, **({'cursor': cursor} if cursor else {}))
+        response = client.get('/api/puzzles', query_string=params)
+        assert response.status_code == 200
+        body = response.get_json()
+        pages.append([puzzle['id'] for puzzle in body['puzzles']])
+        cursor = body['next_cursor']
+        if cursor is None:
+            return pages
+        assert len(pages) <= 10, "cursor did not advance"
+
+def test_list_pages_by_date(client, puzzles):
+    puzzle_ids = puzzles(5)
+    newest_first = puzzle_ids[::-1]
+
+    assert _pages(client, 2) == [newest_first[0:2], newest_first[2:4], newest_first[4:]]
+    assert _pages(client, 5) == [newest_first]
+    assert _pages(client, 3, order='asc') == [puzzle_ids[0:3], puzzle_ids[3:]]
+
+def test_list_summaries(client, puzzles):
+    puzzle_ids = puzzles(2)
+    body = client.get('/api/puzzles', query_string={'order': 'asc'}).get_json()
+    assert body['puzzles'] == [
+        {'id': puzzle_ids[0], 'date_published': '2020-01-01', 'author': 'Ann Smith'},
+        {'id': puzzle_ids[1], 'date_published': '2020-01-02', 'author': 'Joel Fagliano'},
+    ]
+    assert body['next_cursor'] is None
+
+@pytest.mark.parametrize('cursor', [
+    'nonsense',
+    encode_cursor(['a']),
+    encode_cursor([[1], 2]),
+    encode_cursor(['2020-01-02', [2]]),
+    encode_cursor(['2020-01-02', '2']),
+    encode_cursor(['2020-01-02', True]),
+    encode_cursor(['2020-1-2', 2]),
+    encode_cursor([None, 2]),
+])
+def test_list_rejects_bad_cursors(client, puzzles, cursor):
+    puzzles(1)
+    assert client.get('/api/puzzles', query_string={'cursor': cursor}).status_code == 400
+
+def test_get_puzzle_with_clues(client, puzzles):
+    puzzle_id = puzzles(1)[0]
+    body = client.get(f'/api/puzzles/{puzzle_id}').get_json()
+
+    assert (body['id'], body['date_published'], body['rows'], body['cols']) == (puzzle_id, '2020-01-01', 3, 3)
+    assert [(clue['number'], clue['direction'], clue['answer']) for clue in body['clues']] == [
+        (1, 'across', 'CAT'), (4, 'across', 'ORE'), (5, 'across', 'WED'),
+        (1, 'down', 'COW'), (2, 'down', 'ARE'), (3, 'down', 'TED'),
+    ]
+    assert body['clues'][0]['text'] == 'Clue for cat'
+    assert (body['clues'][4]['row'], body['clues'][4]['column']) == (0, 1)
+
+def test_get_missing_puzzle(client, puzzles):
+    puzzles(1)
+    assert client.get('/api/puzzles/999').status_code == 404
+
+def _search(client, **params):
+    response = client.get('/api/puzzles/search', query_string=params)
+    assert response.status_code == 200
+    return response.get_json()
+
+def test_search_returns_each_puzzle_once(client, puzzles):
+    puzzle_ids = puzzles(4)
+
+    # ORE and ARE both match, in the first and last puzzles
+    body = _search(client, word='RE')
+    assert [puzzle['id'] for puzzle in body['puzzles']] == [puzzle_ids[3], puzzle_ids[0]]
+    assert (body['total'], body['total_exact'], body['total_pages']) == (2, True, 1)
+    assert [clue['answer'] for clue in body['puzzles'][0]['clues']] == ['BAT', 'ORE', 'WED', 'BOW', 'ARE', 'TED']
+
+    body = _search(client, clue='clue for', clue_mode='substring', author='fagliano')
+    assert [puzzle['id'] for puzzle in body['puzzles']] == [puzzle_ids[3], puzzle_ids[1]]
+
+def test_search_pages_and_count_modes(client, puzzles):
+    puzzle_ids = puzzles(4)
+
+    body = _search(client, per_page=3, page=2)
+    assert [puzzle['id'] for puzzle in body['puzzles']] == [puzzle_ids[0]]
+    assert (body['total'], body['total_pages']) == (4, 2)
+
+    assert _search(client, date='2020-01-02')['total'] == 1
+    body = _search(client, count='none')
+    assert (body['total'], body['total_pages'], len(body['puzzles'])) == (None, None, 4)
+    assert _search(client, count='capped')['total'] == 4
+    assert client.get('/api/puzzles/search', query_string={'count': 'bogus'}).status_code == 400
@@ -0,0 +1,34 @@
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+from grid_wit.models.puzzle import Clue, text_search_vector
+
+def _index_ddl(name):
+    index = next(index for index in Clue.__table__.indexes if index.name == name)
+    return str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+
+def test_postgres_search_indexes():
+    assert _index_ddl('idx_clue_answer_trgm') == 'CREATE INDEX idx_clue_answer_trgm ON clues USING gin (answer gin_trgm_ops)'
+    assert _index_ddl('idx_clue_text_trgm') == 'CREATE INDEX idx_clue_text_trgm ON clues USING gin (text gin_trgm_ops)'
+
+    # The search filter must compile to the indexed expression exactly
+    vector = str(text_search_vector(Clue.text).compile(dialect=postgresql.dialect())).replace('clues.', '')
+    assert _index_ddl('idx_clue_text_fts') == f'CREATE INDEX idx_clue_text_fts ON clues USING gin ({vector})'
+
+def test_other_dialects_skip_the_postgres_indexes(db):
+    names = {index['name'] for index in inspect(db.get_engine()).get_indexes('clues')}
+    assert {'idx_puzzle_direction', 'idx_clue_answer'} <= names
+    assert not names & {'idx_clue_answer_trgm', 'idx_clue_text_trgm', 'idx_clue_text_fts'}
+
+def test_fulltext_search_falls_back_to_substring(client, puzzles):
+    puzzle_ids = puzzles(4)
+    fulltext = client.get('/api/puzzles/search', query_string={'clue': 'for cow'}).get_json()
+    substring = client.get('/api/puzzles/search', query_string={'clue': 'for cow', 'clue_mode': 'substring'}).get_json()
+    assert [puzzle['id'] for puzzle in fulltext['puzzles']] == [puzzle_ids[0]]
+    assert fulltext == substring
+
+def test_unknown_clue_mode_is_rejected(client, puzzles):
+    puzzles(1)
+    response = client.get('/api/puzzles/search', query_string={'clue': 'for cow', 'clue_mode': 'fuzzy'})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'clue_mode must be one of fulltext, substring'}
@@ -0,0 +1,35 @@
+import json
+import os
+import pytest
+from grid_wit.config.database import get_db_session
+from grid_wit.models.puzzle import Puzzle
+from grid_wit.utils import serializers
+from grid_wit.utils.data_loader import load_puzzles_from_json, sync_puzzles_from_json
+from grid_wit.utils.serializers import dumps, load_puzzle, load_puzzle_body
+
+def test_dumps_is_compact_utf8():
+    assert dumps({'text': 'Café', 'n': [1, None]}) == '{"text":"Café","n":[1,null]}'.encode()
+
+def test_dumps_without_orjson(monkeypatch):
+    monkeypatch.setattr(serializers, 'orjson', None)
+    assert json.loads(dumps({'text': 'Café'})) == {'text': 'Café'}
+
+@pytest.mark.parametrize('grid_format', ['legacy', 'array', 'compact'])
+def test_prerendered_bodies_match_the_query(db, archive, grid_format):
+    for day, rows in (('2020-01-01', ('CAT', 'ORE', 'WED')), ('2020-01-02', ('AB.', 'CDE', '.FG'))):
+        archive(day, rows=rows)
+    load_puzzles_from_json(archive.root, bulk=True, workers=1, prerender=True)
+
+    # A changed file is re-rendered by sync
+    path = archive('2020-01-02', rows=('DOG', 'ONE', 'TEN'))
+    os.utime(path, (2e9, 2e9))
+    sync_puzzles_from_json(archive.root, prerender=True)
+
+    with get_db_session() as session:
+        rows = session.query(Puzzle.id, Puzzle.body).order_by(Puzzle.id).all()
+        assert all(body is not None for _, body in rows)
+        for puzzle_id, body in rows:
+            assert json.loads(body) == load_puzzle(session, puzzle_id)
+            assert json.loads(load_puzzle_body(session, puzzle_id, grid_format)) == load_puzzle(session, puzzle_id, grid_format)
+        assert load_puzzle_body(session, 999, grid_format) is None
+        assert json.loads(rows[-1].body)['clues'][0]['answer'] == 'DOG'
@@ -0,0 +1,63 @@
+import os
+from sqlalchemy import text
+from grid_wit.config.database import get_db_session
+from grid_wit.models.stats import AnswerStat, AnswerYearStat, AuthorStat
+from grid_wit.utils.data_loader import sync_puzzles_from_json
+from grid_wit.utils.stats import rebuild_stats
+
+def _snapshot(session):
+    return (
+        sorted(session.query(AnswerStat.answer, AnswerStat.length, AnswerStat.uses, AnswerStat.first_date, AnswerStat.last_date)),
+        sorted(session.query(AnswerYearStat.answer, AnswerYearStat.year, AnswerYearStat.length, AnswerYearStat.uses)),
+        sorted(session.query(AuthorStat.author, AuthorStat.puzzle_count, AuthorStat.first_date, AuthorStat.last_date))
+    )
+
+def test_incremental_refresh_matches_a_rebuild(db, puzzles, archive):
+    puzzles(4)
+    # Replace one puzzle's fill and author, and add a puzzle in a new year
+    path = archive('2020-01-02', rows=('CAT', 'ORE', 'WED'), author='New Author')
+    os.utime(path, (2e9, 2e9))
+    archive('2021-03-01', rows=('DOG', 'ONE', 'TEN'), author='Ann Smith')
+    sync_puzzles_from_json(archive.root)
+
+    with get_db_session() as session:
+        refreshed = _snapshot(session)
+        rebuild_stats(session)
+        assert _snapshot(session) == refreshed
+
+    answers, years, authors = refreshed
+    assert ('CAT', 3, 2, '2020-01-01', '2020-01-02') in answers
+    assert ('DOG', 3, 1, '2021-03-01', '2021-03-01') in answers
+    assert ('DOG', 2021, 3, 1) in years and ('DOG', 2020, 3, 1) not in years
+    assert ('Joel Fagliano', 1, '2020-01-04', '2020-01-04') in authors
+
+def test_year_and_length_filter_reads_an_index(db, puzzles):
+    puzzles(4)
+    with get_db_session() as session:
+        query = session.query(AnswerYearStat.answer, AnswerYearStat.uses).filter(
+            AnswerYearStat.year == 2020, AnswerYearStat.length == 3
+        ).order_by(AnswerYearStat.uses.desc(), AnswerYearStat.answer).limit(5)
+        sql = str(query.statement.compile(session.get_bind(), compile_kwargs={'literal_binds': True}))
+        plan = ' '.join(row[-1] for row in session.execute(text(f'EXPLAIN QUERY PLAN {sql}')))
+    assert 'idx_answer_year_stats_year_length_uses' in plan
+    assert 'TEMP B-TREE' not in plan
+
+def test_stats_routes(client, puzzles):
+    puzzles(4)
+
+    body = client.get('/api/stats/answers', query_string={'limit': 3}).get_json()
+    assert body['answers'] == [{'answer': 'ARE', 'uses': 2}, {'answer': 'ONE', 'uses': 2}, {'answer': 'ORE', 'uses': 2}]
+    body = client.get('/api/stats/answers', query_string={'length': 2, 'year': 2020, 'limit': 2}).get_json()
+    assert body['answers'] == [{'answer': 'AB', 'uses': 1}, {'answer': 'AC', 'uses': 1}]
+
+    body = client.get('/api/stats/answers/ore').get_json()
+    assert (body['answer'], body['uses'], body['first_date'], body['last_date']) == ('ORE', 2, '2020-01-01', '2020-01-04')
+    assert body['by_year'] == [{'year': 2020, 'uses': 2}]
+    assert body['clues'] == [{'text': 'Clue for ore', 'uses': 2, 'last_used': '2020-01-04'}]
+    assert client.get('/api/stats/answers/zzz').status_code == 404
+
+    body = client.get('/api/stats/authors').get_json()
+    assert body['authors'] == [
+        {'author': 'Ann Smith', 'puzzle_count': 2, 'first_date': '2020-01-01', 'last_date': '2020-01-03'},
+        {'author': 'Joel Fagliano', 'puzzle_count': 2, 'first_date': '2020-01-02', 'last_date': '2020-01-04'},
+    ]
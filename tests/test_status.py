@@ -0,0 +1,24 @@
+from grid_wit.utils.data_loader import sync_puzzles_from_json
+
+def test_status_before_any_import(client):
+    body = client.get('/api/status').get_json()
+    assert (body['status'], body['puzzle_count'], body['clue_count']) == ('healthy', None, None)
+
+def test_status_reports_the_recorded_counts(client, puzzles, archive):
+    puzzles(3)
+    body = client.get('/api/status').get_json()
+    assert (body['puzzle_count'], body['clue_count']) == (3, 18)
+
+    stats = client.get('/api/stats').get_json()
+    assert (stats['source'], stats['first_date'], stats['last_date']) == ('import', '2020-01-01', '2020-01-03')
+    version = stats['corpus_version']
+
+    archive('2020-02-01')
+    sync_puzzles_from_json(archive.root)
+    stats = client.get('/api/stats').get_json()
+    assert (stats['puzzle_count'], stats['last_date'], stats['corpus_version']) == (4, '2020-02-01', version + 1)
+    assert client.get('/api/status').get_json()['clue_count'] == 24
+
+def test_health_probes(client):
+    assert client.get('/api/health/live').get_json() == {'status': 'ok'}
+    assert client.get('/api/health/ready').get_json() == {'status': 'ready'}
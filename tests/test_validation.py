@@ -0,0 +1,80 @@
+import json
+from grid_wit.config.database import get_db_session
+from grid_wit.models.puzzle import Clue
+from grid_wit.utils.validation import PuzzleRecord, validate_records, validate_source, validate_database
+from conftest import source_puzzle
+
+def _kinds(issues):
+    return sorted((issue['puzzle'], issue['kind'], issue['direction'], issue['number']) for issue in issues)
+
+def _record(key, rows, clues, gridnums=None):
+    return PuzzleRecord(key, list(''.join(rows)), len(rows), len(rows[0]), gridnums, clues)
+
+CLUES = [
+    ('across', 1, 'CAT', 0, 0), ('across', 4, 'ORE', 1, 0), ('across', 5, 'WED', 2, 0),
+    ('down', 1, 'COW', 0, 0), ('down', 2, 'ARE', 0, 1), ('down', 3, 'TED', 0, 2),
+]
+
+def test_clean_puzzles_have_no_issues():
+    records = [_record(f"p{i}", ('CAT', 'ORE', 'WED'), CLUES, [1, 2, 3, 4, 0, 0, 5, 0, 0]) for i in range(3)]
+    assert validate_records(records) == []
+
+def test_each_fault_is_attributed_to_its_slot():
+    faulty = [
+        ('across', 1, 'CAT', 0, 0), ('across', 4, 'OAE', 1, 0), ('across', 5, 'WEDS', 2, 0),
+        ('across', 9, 'XYZ', None, None), ('down', 1, 'COW', 0, 0), ('down', 1, 'COW', 0, 0),
+        ('down', 2, 'ARE', 1, 1),
+    ]
+    records = [
+        _record('clean', ('CAT', 'ORE', 'WED'), CLUES),
+        _record('faulty', ('CAT', 'ORE', 'WED'), faulty, [1, 2, 3, 4, 0, 0, 6, 0, 0]),
+        _record('also clean', ('CAT', 'ORE', 'WED'), CLUES),
+        _record('bad grid', ('CAT', 'ORE'), CLUES)._replace(rows=3),
+    ]
+    assert _kinds(validate_records(records)) == [
+        ('bad grid', 'invalid_puzzle', None, None),
+        ('faulty', 'answer_mismatch', 'across', 4),
+        ('faulty', 'dropped_clue', 'across', 5),
+        ('faulty', 'dropped_clue', 'across', 9),
+        ('faulty', 'duplicate_clue', 'down', 1),
+        ('faulty', 'gridnums_mismatch', None, None),
+        ('faulty', 'missing_clue', 'across', 6),
+        ('faulty', 'missing_clue', 'down', 3),
+        ('faulty', 'position_mismatch', 'down', 2),
+    ]
+
+def test_wrong_length_and_rebus_cells():
+    rebus = PuzzleRecord('rebus', ['CAT', 'A', 'T', 'O', 'R', 'E', 'W', 'E', 'D'], 3, 3, None, [
+        ('across', 1, 'CATAT', None, None), ('across', 4, 'ORE', None, None), ('across', 5, 'WED', None, None),
+        ('down', 1, 'CATOW', None, None), ('down', 2, 'ARE', None, None), ('down', 3, 'TEN', None, None),
+    ])
+    short = _record('short', ('CAT', 'ORE', 'WED'), [clue if clue[1] != 5 else ('across', 5, 'WE', 2, 0) for clue in CLUES])
+    assert _kinds(validate_records([rebus, short])) == [
+        ('rebus', 'answer_mismatch', 'down', 3),
+        ('short', 'wrong_length', 'across', 5),
+    ]
+
+def test_validate_source_and_database(db, archive, puzzles):
+    puzzles(4)
+    broken = source_puzzle('2020-02-01')
+    broken['answers']['down'][1] = 'AXE'
+    broken['answers']['down'].append('XYZ')
+    broken['clues']['across'][0] = 'Clue without a number'
+    archive('2020-02-01', data=json.dumps(broken))
+    archive('2020-02-02', data='{')
+
+    report = validate_source(archive.root, workers=1, chunk_size=2)
+    assert (report['puzzles'], report['clues']) == (6, 29)
+    assert report['issue_counts'] == {
+        'answer_mismatch': 1, 'invalid_puzzle': 1, 'clue_count_mismatch': 1, 'unparsed_clue': 1, 'missing_clue': 1
+    }
+
+    report = validate_database(workers=1, chunk_size=2)
+    assert (report['puzzles'], report['clues'], report['issues']) == (4, 24, [])
+
+    with get_db_session() as session:
+        session.query(Clue).filter(Clue.answer == 'BDF').update({'answer': 'BDX'})
+    report = validate_database(workers=1, chunk_size=3)
+    assert [(issue['kind'], issue['direction'], issue['detail']) for issue in report['issues']] == [
+        ('answer_mismatch', 'down', 'BDX vs grid BDF')
+    ]